@@ -0,0 +1,32 @@
+"""添加章节大纲角色按项目的复合索引
+
+Revision ID: 3c9d7e21f4a6
+Revises: 8b2f5c7a9e3d
+Create Date: 2026-10-17 10:30:12.418302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9d7e21f4a6'
+down_revision: Union[str, None] = '8b2f5c7a9e3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_chapters_project_number', 'chapters', ['project_id', 'chapter_number'], unique=False)
+    op.create_index('idx_chapters_project_outline_sub', 'chapters', ['project_id', 'outline_id', 'sub_index'], unique=False)
+    op.create_index('idx_outlines_project_order', 'outlines', ['project_id', 'order_index'], unique=False)
+    op.create_index('idx_characters_project_created', 'characters', ['project_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_characters_project_created', table_name='characters')
+    op.drop_index('idx_outlines_project_order', table_name='outlines')
+    op.drop_index('idx_chapters_project_outline_sub', table_name='chapters')
+    op.drop_index('idx_chapters_project_number', table_name='chapters')
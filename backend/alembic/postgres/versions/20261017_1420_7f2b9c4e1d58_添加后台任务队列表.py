@@ -0,0 +1,51 @@
+"""添加后台任务队列表
+
+Revision ID: 7f2b9c4e1d58
+Revises: 3c9d7e21f4a6
+Create Date: 2026-10-17 14:20:05.213847
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f2b9c4e1d58'
+down_revision: Union[str, None] = '3c9d7e21f4a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('generation_jobs',
+    sa.Column('id', sa.String(length=36), nullable=False, comment='队列任务ID'),
+    sa.Column('job_type', sa.String(length=50), nullable=False, comment='任务类型: batch_generation/chapter_analysis'),
+    sa.Column('user_id', sa.String(length=100), nullable=False, comment='用户ID'),
+    sa.Column('project_id', sa.String(length=36), nullable=True, comment='项目ID'),
+    sa.Column('task_id', sa.String(length=36), nullable=False, comment='关联的业务任务ID（BatchGenerationTask/AnalysisTask）'),
+    sa.Column('payload', sa.JSON(), nullable=True, comment='执行参数'),
+    sa.Column('status', sa.String(length=20), nullable=False, comment='状态: queued/running/completed/failed'),
+    sa.Column('attempts', sa.Integer(), nullable=False, comment='已领取次数'),
+    sa.Column('max_attempts', sa.Integer(), nullable=False, comment='最大领取次数'),
+    sa.Column('available_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False, comment='最早可执行时间（失败重试退避）'),
+    sa.Column('worker_id', sa.String(length=100), nullable=True, comment='持有租约的worker'),
+    sa.Column('lease_expires_at', sa.DateTime(), nullable=True, comment='租约到期时间'),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=True, comment='最近心跳时间'),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True, comment='创建时间'),
+    sa.Column('started_at', sa.DateTime(), nullable=True, comment='最近一次开始执行时间'),
+    sa.Column('finished_at', sa.DateTime(), nullable=True, comment='结束时间'),
+    sa.Column('error_message', sa.Text(), nullable=True, comment='错误信息'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_generation_jobs_status_available', 'generation_jobs', ['status', 'available_at'], unique=False)
+    op.create_index('idx_generation_jobs_user_status', 'generation_jobs', ['user_id', 'status'], unique=False)
+    op.create_index('idx_generation_jobs_task', 'generation_jobs', ['task_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_generation_jobs_task', table_name='generation_jobs')
+    op.drop_index('idx_generation_jobs_user_status', table_name='generation_jobs')
+    op.drop_index('idx_generation_jobs_status_available', table_name='generation_jobs')
+    op.drop_table('generation_jobs')
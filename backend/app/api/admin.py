@@ -152,6 +152,7 @@ async def create_user(
                     db_user.is_admin = True
                     await session.commit()
                     new_user.is_admin = True
+            user_manager.invalidate_user(new_user.user_id)
         
         # 设置密码
         actual_password = await password_manager.set_password(
@@ -221,6 +222,7 @@ async def update_user(
             await session.commit()
             await session.refresh(db_user)
         
+        user_manager.invalidate_user(user_id)
         logger.info(f"管理员 {admin.user_id} 更新了用户 {user_id} 的信息")
         
         updated_user = await user_manager.get_user(user_id)
@@ -277,6 +279,9 @@ async def toggle_user_status(
             
             await session.commit()
         
+        # 立即失效缓存，禁用操作对下一个请求即生效
+        user_manager.invalidate_user(user_id)
+        
         status_text = "启用" if data.is_active else "禁用"
         logger.info(f"管理员 {admin.user_id} {status_text}了用户 {user_id}")
         
@@ -313,6 +318,7 @@ async def reset_password(
             username=target_user.username,
             password=data.new_password
         )
+        user_manager.invalidate_user(user_id)
         
         logger.info(f"管理员 {admin.user_id} 重置了用户 {user_id} 的密码")
         
@@ -374,6 +380,7 @@ async def delete_user(
             
             await session.commit()
         
+        user_manager.invalidate_user(user_id)
         logger.warning(f"管理员 {admin.user_id} 删除了用户 {user_id}")
         
         return {
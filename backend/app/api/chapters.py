@@ -1,15 +1,15 @@
 """章节管理API"""
 from fastapi import APIRouter, Depends, HTTPException, Request, Query, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, or_, and_
 from sqlalchemy.orm import selectinload
 import json
 import asyncio
+from contextlib import suppress
 from typing import Optional
 from datetime import datetime
-from asyncio import Queue, Lock
 
-from app.database import get_db
+from app.database import get_db, background_session
 from app.api.common import verify_project_access
 from app.services.chapter_context_service import (
     OneToManyContextBuilder,
@@ -26,11 +26,15 @@ from app.models.analysis_task import AnalysisTask
 from app.models.memory import PlotAnalysis, StoryMemory
 from app.models.batch_generation_task import BatchGenerationTask
 from app.models.regeneration_task import RegenerationTask
+from app.models.generation_job import GenerationJob
 from app.schemas.chapter import (
     ChapterCreate,
     ChapterUpdate,
     ChapterResponse,
     ChapterListResponse,
+    ChapterListItem,
+    ChapterPageResponse,
+    ChapterContentResponse,
     ChapterGenerateRequest,
     BatchGenerateRequest,
     BatchGenerateResponse,
@@ -49,25 +53,15 @@ from app.services.plot_analyzer import PlotAnalyzer
 from app.services.memory_service import memory_service
 from app.services.foreshadow_service import foreshadow_service
 from app.services.chapter_regenerator import ChapterRegenerator
+from app.services.job_queue import enqueue_job, JOB_BATCH_GENERATION, JOB_CHAPTER_ANALYSIS
 from app.logger import get_logger
-from app.api.settings import get_user_ai_service
+from app.api.settings import get_user_ai_service, load_user_ai_service
 from app.utils.sse_response import SSEResponse, create_sse_response
+from app.utils.project_lock import ProjectWriteLock, project_write_lock
 
 router = APIRouter(prefix="/chapters", tags=["章节管理"])
 logger = get_logger(__name__)
 
-# 全局数据库写入锁（每个用户一个锁，用于保护SQLite写入操作）
-db_write_locks: dict[str, Lock] = {}
-
-
-async def get_db_write_lock(user_id: str) -> Lock:
-    """获取或创建用户的数据库写入锁"""
-    if user_id not in db_write_locks:
-        db_write_locks[user_id] = Lock()
-        logger.debug(f"🔒 为用户 {user_id} 创建数据库写入锁")
-    return db_write_locks[user_id]
-
-
 @router.post("", response_model=ChapterResponse, summary="创建章节")
 async def create_chapter(
     chapter: ChapterCreate,
@@ -163,6 +157,124 @@ async def get_project_chapters(
     return ChapterListResponse(total=total, items=chapters_with_outline)
 
 
+# 轻量列表默认返回的字段（不含正文content和展开规划expansion_plan）
+CHAPTER_LIST_DEFAULT_FIELDS = (
+    "project_id", "title", "chapter_number", "summary", "word_count", "status",
+    "outline_id", "sub_index", "outline_title", "outline_order", "created_at", "updated_at"
+)
+# 可按列直接查询的字段
+CHAPTER_LIST_COLUMN_FIELDS = (
+    "project_id", "title", "chapter_number", "content", "summary", "word_count", "status",
+    "outline_id", "sub_index", "expansion_plan", "created_at", "updated_at"
+)
+# 从大纲表联查的字段
+CHAPTER_LIST_OUTLINE_FIELDS = ("outline_title", "outline_order")
+
+
+@router.get(
+    "/project/{project_id}/list",
+    response_model=ChapterPageResponse,
+    response_model_exclude_unset=True,
+    summary="获取项目章节轻量列表（分页，不含正文）"
+)
+async def list_project_chapters(
+    project_id: str,
+    request: Request,
+    fields: Optional[str] = Query(None, description="逗号分隔的返回字段，默认不含content和expansion_plan"),
+    after: Optional[str] = Query(None, description="游标：上一页返回的next_cursor（格式 章节序号:章节ID；只传章节序号时返回序号大于该值的章节）"),
+    limit: int = Query(200, ge=1, le=1000, description="每页数量"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    获取项目章节的轻量列表
+    
+    只查询所需列（默认不加载正文），按 (chapter_number, id) 做游标分页
+    （chapter_number 不唯一，序号相同的章节按ID排序，翻页时不会跳过），
+    用于侧边栏/目录等场景；正文通过 GET /chapters/{chapter_id}/content 单独获取。
+    """
+    user_id = getattr(request.state, 'user_id', None)
+    await verify_project_access(project_id, user_id, db)
+    
+    after_number, after_id = None, None
+    if after is not None:
+        number_part, _, id_part = after.partition(":")
+        try:
+            after_number = int(number_part)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"无效的游标: {after}")
+        after_id = id_part or None
+    
+    if fields:
+        requested_fields = [f.strip() for f in fields.split(",") if f.strip() and f.strip() != "id"]
+        invalid_fields = set(requested_fields) - set(CHAPTER_LIST_COLUMN_FIELDS) - set(CHAPTER_LIST_OUTLINE_FIELDS)
+        if invalid_fields:
+            raise HTTPException(status_code=400, detail=f"不支持的字段: {', '.join(sorted(invalid_fields))}")
+    else:
+        requested_fields = list(CHAPTER_LIST_DEFAULT_FIELDS)
+    
+    need_outline = any(f in CHAPTER_LIST_OUTLINE_FIELDS for f in requested_fields)
+    
+    # 只查询需要的列（chapter_number用于游标，outline_id用于联查大纲）
+    column_names = ["id", "chapter_number"]
+    column_names += [f for f in requested_fields if f in CHAPTER_LIST_COLUMN_FIELDS and f not in column_names]
+    if need_outline and "outline_id" not in column_names:
+        column_names.append("outline_id")
+    
+    count_result = await db.execute(
+        select(func.count(Chapter.id)).where(Chapter.project_id == project_id)
+    )
+    total = count_result.scalar_one()
+    
+    query = (
+        select(*[getattr(Chapter, name) for name in column_names])
+        .where(Chapter.project_id == project_id)
+        .order_by(Chapter.chapter_number, Chapter.id)
+        .limit(limit + 1)
+    )
+    if after_id is not None:
+        query = query.where(or_(
+            Chapter.chapter_number > after_number,
+            and_(Chapter.chapter_number == after_number, Chapter.id > after_id)
+        ))
+    elif after_number is not None:
+        query = query.where(Chapter.chapter_number > after_number)
+    
+    rows = (await db.execute(query)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    outlines_map = {}
+    if need_outline:
+        outline_ids = {row.outline_id for row in rows if row.outline_id}
+        if outline_ids:
+            outlines_result = await db.execute(
+                select(Outline.id, Outline.title, Outline.order_index)
+                .where(Outline.id.in_(outline_ids))
+            )
+            outlines_map = {o.id: o for o in outlines_result.all()}
+    
+    items = []
+    for row in rows:
+        row_map = row._mapping
+        item = {"id": row_map["id"]}
+        for field in requested_fields:
+            if field == "outline_title":
+                outline = outlines_map.get(row_map["outline_id"])
+                item["outline_title"] = outline.title if outline else None
+            elif field == "outline_order":
+                outline = outlines_map.get(row_map["outline_id"])
+                item["outline_order"] = outline.order_index if outline else None
+            else:
+                item[field] = row_map[field]
+        items.append(ChapterListItem(**item))
+    
+    return ChapterPageResponse(
+        total=total,
+        items=items,
+        next_cursor=f"{rows[-1].chapter_number}:{rows[-1].id}" if has_more else None
+    )
+
+
 @router.get("/{chapter_id}", response_model=ChapterResponse, summary="获取章节详情")
 async def get_chapter(
     chapter_id: str,
@@ -185,6 +297,41 @@ async def get_chapter(
     return chapter
 
 
+@router.get("/{chapter_id}/content", response_model=ChapterContentResponse, summary="获取章节正文")
+async def get_chapter_content(
+    chapter_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """只获取章节正文及展开规划（配合轻量列表按需加载）"""
+    result = await db.execute(
+        select(
+            Chapter.id,
+            Chapter.project_id,
+            Chapter.chapter_number,
+            Chapter.content,
+            Chapter.word_count,
+            Chapter.expansion_plan
+        ).where(Chapter.id == chapter_id)
+    )
+    chapter = result.first()
+    
+    if not chapter:
+        raise HTTPException(status_code=404, detail="章节不存在")
+    
+    # 验证用户权限
+    user_id = getattr(request.state, 'user_id', None)
+    await verify_project_access(chapter.project_id, user_id, db)
+    
+    return ChapterContentResponse(
+        id=chapter.id,
+        chapter_number=chapter.chapter_number,
+        content=chapter.content,
+        word_count=chapter.word_count or 0,
+        expansion_plan=chapter.expansion_plan
+    )
+
+
 @router.get("/{chapter_id}/navigation", summary="获取章节导航信息")
 async def get_chapter_navigation(
     chapter_id: str,
@@ -491,6 +638,8 @@ async def build_smart_chapter_context(
     3. 近期概要：最近30章的简要摘要（200字/章）
     4. 最近完整：最近3章的完整内容
     
+    摘要、章节信息和完整内容均按集合批量查询，数据库查询次数固定（至多5次），与章节数无关。
+    
     Args:
         db: 数据库会话
         project_id: 项目ID
@@ -528,24 +677,30 @@ async def build_smart_chapter_context(
         
         logger.info(f"📚 开始构建智能上下文：共{total_previous}章前置内容")
         
+        # 确定需要摘要的章节（故事骨架采样 + 近期概要），一次性批量查询chapter_summary记忆
+        skeleton_infos = all_chapters_info[::50] if total_previous > 50 else []
+        recent_summary_count = min(30, total_previous)
+        recent_for_summary = all_chapters_info[-recent_summary_count:] if total_previous > 3 else []
+        summary_infos = recent_for_summary[:-3] if len(recent_for_summary) > 3 else []  # 排除最后3章（它们会完整展示）
+        
+        summary_chapter_ids = {info.id for info in skeleton_infos} | {info.id for info in summary_infos}
+        summary_map = {}
+        if summary_chapter_ids:
+            summary_result = await db.execute(
+                select(StoryMemory.chapter_id, StoryMemory.content)
+                .where(StoryMemory.project_id == project_id)
+                .where(StoryMemory.chapter_id.in_(summary_chapter_ids))
+                .where(StoryMemory.memory_type == 'chapter_summary')
+            )
+            for chapter_id, content in summary_result.all():
+                summary_map.setdefault(chapter_id, content)
+        
         # 2. 构建故事骨架（每50章采样）
         skeleton_chapters = []
-        if total_previous > 50:
-            sample_interval = 50
-            skeleton_indices = list(range(0, total_previous, sample_interval))
-            
-            for idx in skeleton_indices:
-                chapter_info = all_chapters_info[idx]
+        if skeleton_infos:
+            for chapter_info in skeleton_infos:
                 # 获取章节摘要（优先从chapter_summary记忆获取）
-                summary_result = await db.execute(
-                    select(StoryMemory.content)
-                    .where(StoryMemory.project_id == project_id)
-                    .where(StoryMemory.chapter_id == chapter_info.id)
-                    .where(StoryMemory.memory_type == 'chapter_summary')
-                    .limit(1)
-                )
-                summary_row = summary_result.scalar_one_or_none()
-                summary = summary_row if summary_row else "（无摘要）"
+                summary = summary_map.get(chapter_info.id) or "（无摘要）"
                 
                 skeleton_chapters.append({
                     'number': chapter_info.chapter_number,
@@ -580,14 +735,22 @@ async def build_smart_chapter_context(
             )
             
             if relevant_memories:
-                relevant_chapters_text = []
-                for mem in relevant_memories:
-                    # 获取章节信息
+                # 一次性获取所有相关章节信息
+                relevant_chapter_ids = {
+                    mem['metadata'].get('chapter_id') for mem in relevant_memories
+                    if mem['metadata'].get('chapter_id')
+                }
+                relevant_chapter_map = {}
+                if relevant_chapter_ids:
                     chapter_result = await db.execute(
-                        select(Chapter.chapter_number, Chapter.title)
-                        .where(Chapter.id == mem['metadata'].get('chapter_id'))
+                        select(Chapter.id, Chapter.chapter_number, Chapter.title)
+                        .where(Chapter.id.in_(relevant_chapter_ids))
                     )
-                    chapter_info = chapter_result.first()
+                    relevant_chapter_map = {row.id: row for row in chapter_result.all()}
+                
+                relevant_chapters_text = []
+                for mem in relevant_memories:
+                    chapter_info = relevant_chapter_map.get(mem['metadata'].get('chapter_id'))
                     if chapter_info:
                         relevant_chapters_text.append(
                             f"第{chapter_info.chapter_number}章《{chapter_info.title}》：{mem['content']} "
@@ -598,21 +761,11 @@ async def build_smart_chapter_context(
                 logger.info(f"  ✅ 相关历史：语义检索到{len(relevant_chapters_text)}章")
         
         # 4. 近期概要（最近30章，每章200字摘要）
-        recent_summary_count = min(30, total_previous)
-        recent_for_summary = all_chapters_info[-recent_summary_count:] if total_previous > 3 else []
-        
         if recent_for_summary and len(recent_for_summary) > 3:  # 至少要有3章才做摘要
             recent_summaries = []
-            for chapter_info in recent_for_summary[:-3]:  # 排除最后3章（它们会完整展示）
+            for chapter_info in summary_infos:
                 # 优先获取chapter_summary记忆
-                summary_result = await db.execute(
-                    select(StoryMemory.content)
-                    .where(StoryMemory.project_id == project_id)
-                    .where(StoryMemory.chapter_id == chapter_info.id)
-                    .where(StoryMemory.memory_type == 'chapter_summary')
-                    .limit(1)
-                )
-                summary = summary_result.scalar_one_or_none()
+                summary = summary_map.get(chapter_info.id)
                 
                 if summary:
                     recent_summaries.append(
@@ -627,14 +780,16 @@ async def build_smart_chapter_context(
         recent_full_count = min(3, total_previous)
         recent_full_chapters = all_chapters_info[-recent_full_count:]
         
-        # 获取完整内容
+        # 一次性获取完整内容
+        content_result = await db.execute(
+            select(Chapter.id, Chapter.content)
+            .where(Chapter.id.in_([info.id for info in recent_full_chapters]))
+        )
+        content_map = {row.id: row.content for row in content_result.all()}
+        
         recent_full_texts = []
         for chapter_info in recent_full_chapters:
-            chapter_result = await db.execute(
-                select(Chapter.content)
-                .where(Chapter.id == chapter_info.id)
-            )
-            content = chapter_result.scalar_one_or_none()
+            content = content_map.get(chapter_info.id)
             if content:
                 recent_full_texts.append(
                     f"=== 第{chapter_info.chapter_number}章：{chapter_info.title} ===\n{content}"
@@ -843,21 +998,16 @@ async def analyze_chapter_background(
         bool: True表示分析成功，False表示分析失败
     """
     db_session = None
-    write_lock = await get_db_write_lock(user_id)
+    task = None
+    write_lock = project_write_lock(project_id)
     
     try:
         logger.info(f"🔍 开始分析章节: {chapter_id}, 任务ID: {task_id}")
         
         # 创建独立数据库会话
-        from app.database import get_engine
-        from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
-        
-        engine = await get_engine(user_id)
-        AsyncSessionLocal = async_sessionmaker(
-            engine,
-            class_=AsyncSession,
-            expire_on_commit=False
-        )
+        from app.database import get_session_factory
+        
+        AsyncSessionLocal = await get_session_factory(user_id)
         db_session = AsyncSessionLocal()
         
         # 1. 获取任务（读操作）
@@ -870,6 +1020,11 @@ async def analyze_chapter_background(
             logger.error(f"❌ 任务不存在: {task_id}")
             return False
         
+        if task.status == 'completed':
+            # 任务队列重新执行时，已完成的任务不再重复分析（被中断的任务重新分析）
+            logger.info(f"⏭️ 分析任务已完成，跳过: {task_id}")
+            return True
+        
         # 更新任务状态（写操作，需要锁）
         async with write_lock:
             task.status = 'running'
@@ -1184,6 +1339,19 @@ async def analyze_chapter_background(
         # 返回成功状态
         return True
         
+    except asyncio.CancelledError:
+        # 被取消（批量任务中断、worker停止）时不留下 running 状态的分析任务
+        if db_session and task:
+            try:
+                await db_session.rollback()
+                task.status = 'failed'
+                task.error_message = "分析被中断"
+                task.completed_at = datetime.now()
+                await db_session.commit()
+            except Exception as update_error:
+                logger.error(f"❌ 更新中断的分析任务状态失败: {task_id}: {str(update_error)}")
+        raise
+        
     except Exception as e:
         logger.error(f"❌ 后台分析异常: {str(e)}", exc_info=True)
         # 确保任务状态被更新为failed（写操作，需要锁）
@@ -1227,7 +1395,6 @@ async def analyze_chapter_background(
 async def generate_chapter_content_stream(
     chapter_id: str,
     request: Request,
-    background_tasks: BackgroundTasks,
     generate_request: ChapterGenerateRequest = ChapterGenerateRequest(),
     user_ai_service: AIService = Depends(get_user_ai_service)
 ):
@@ -1623,24 +1790,21 @@ async def generate_chapter_content_stream(
                     progress=0
                 )
                 db_session.add(analysis_task)
-                await db_session.commit()
-                await db_session.refresh(analysis_task)
+                await db_session.flush()
                 
-                task_id = analysis_task.id
-                logger.info(f"📋 已创建分析任务: {task_id}")
-                
-                # 短暂延迟确保SQLite WAL完成写入
-                await asyncio.sleep(0.05)
-                
-                # 直接启动后台分析（并发执行）
-                background_tasks.add_task(
-                    analyze_chapter_background,
-                    chapter_id=chapter_id,
+                # 分析任务与队列任务一同提交，由任务队列worker执行（进程重启后可继续）
+                await enqueue_job(
+                    db_session,
+                    JOB_CHAPTER_ANALYSIS,
                     user_id=current_user_id,
+                    task_id=analysis_task.id,
                     project_id=project.id,
-                    task_id=task_id,
-                    ai_service=user_ai_service
+                    payload={'chapter_id': chapter_id}
                 )
+                await db_session.refresh(analysis_task)
+                
+                task_id = analysis_task.id
+                logger.info(f"📋 已创建分析任务: {task_id}")
                 
                 yield await tracker.saving("章节保存完成", 0.8)
                 
@@ -2038,9 +2202,7 @@ async def get_chapter_annotations(
 async def trigger_chapter_analysis(
     chapter_id: str,
     request: Request,
-    background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db),
-    user_ai_service: AIService = Depends(get_user_ai_service)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     手动触发章节分析(用于重新分析或分析旧章节)
@@ -2080,32 +2242,26 @@ async def trigger_chapter_analysis(
         progress=0
     )
     db.add(analysis_task)
-    await db.commit()
-    
-    task_id = analysis_task.id
-    logger.info(f"📋 创建分析任务: {task_id}, 章节: {chapter_id}")
+    await db.flush()
     
-    # 刷新数据库会话，确保其他会话可以看到新任务
-    await db.refresh(analysis_task)
-    
-    # 短暂延迟确保SQLite WAL完成写入（让其他会话可见）
-    await asyncio.sleep(3)
-    
-    # 直接启动后台分析（并发执行）
-    background_tasks.add_task(
-        analyze_chapter_background,
-        chapter_id=chapter_id,
+    # 分析任务与队列任务一同提交，由任务队列worker执行
+    await enqueue_job(
+        db,
+        JOB_CHAPTER_ANALYSIS,
         user_id=user_id,
+        task_id=analysis_task.id,
         project_id=project.id,
-        task_id=task_id,
-        ai_service=user_ai_service
+        payload={'chapter_id': chapter_id}
     )
     
+    task_id = analysis_task.id
+    logger.info(f"📋 创建分析任务: {task_id}, 章节: {chapter_id}")
+    
     return {
         "task_id": task_id,
         "chapter_id": chapter_id,
         "status": "pending",
-        "message": "分析任务已创建并开始执行"
+        "message": "分析任务已创建并加入执行队列"
     }
 
 
@@ -2113,7 +2269,8 @@ async def trigger_chapter_analysis(
 def calculate_estimated_time(
     chapter_count: int,
     target_word_count: int,
-    enable_analysis: bool
+    enable_analysis: bool,
+    pipeline_analysis: bool = False
 ) -> int:
     """
     计算预估耗时（分钟）
@@ -2121,11 +2278,15 @@ def calculate_estimated_time(
     基准：
     - 生成3000字约需2分钟
     - 分析约需1分钟
+    - 流水线模式下分析与下一章生成重叠，每章取两者较大值，另加最后一章的分析
     """
     generation_time_per_chapter = (target_word_count / 3000) * 2
     analysis_time_per_chapter = 1 if enable_analysis else 0
     
-    total_time = chapter_count * (generation_time_per_chapter + analysis_time_per_chapter)
+    if enable_analysis and pipeline_analysis:
+        total_time = chapter_count * max(generation_time_per_chapter, analysis_time_per_chapter) + analysis_time_per_chapter
+    else:
+        total_time = chapter_count * (generation_time_per_chapter + analysis_time_per_chapter)
     
     return max(1, int(total_time))
 
@@ -2135,9 +2296,7 @@ async def batch_generate_chapters_in_order(
     project_id: str,
     batch_request: BatchGenerateRequest,
     request: Request,
-    background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db),
-    user_ai_service: AIService = Depends(get_user_ai_service)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     从指定章节开始，按顺序批量生成指定数量的章节
@@ -2145,7 +2304,7 @@ async def batch_generate_chapters_in_order(
     特性：
     1. 严格按章节序号顺序生成（不可跳过）
     2. 自动检测起始章节是否可生成
-    3. 可选同步分析（影响耗时和质量）
+    3. 可选同步分析（影响耗时和质量），可选流水线方式（pipeline_analysis）与下一章生成并行
     4. 失败后终止，不继续后续章节
     """
     user_id = getattr(request.state, "user_id", None)
@@ -2203,7 +2362,20 @@ async def batch_generate_chapters_in_order(
         current_retry_count=0
     )
     db.add(batch_task)
-    await db.commit()
+    await db.flush()
+    
+    # 批量任务与队列任务一同提交，由任务队列worker执行（中断后从最后完成的章节恢复）
+    await enqueue_job(
+        db,
+        JOB_BATCH_GENERATION,
+        user_id=user_id,
+        task_id=batch_task.id,
+        project_id=project_id,
+        payload={
+            'custom_model': batch_request.model,
+            'pipeline_analysis': batch_request.pipeline_analysis
+        }
+    )
     await db.refresh(batch_task)
     
     batch_id = batch_task.id
@@ -2212,20 +2384,12 @@ async def batch_generate_chapters_in_order(
     estimated_time = calculate_estimated_time(
         chapter_count=len(chapters_to_generate),
         target_word_count=batch_request.target_word_count,
-        enable_analysis=batch_request.enable_analysis
+        enable_analysis=batch_request.enable_analysis,
+        pipeline_analysis=batch_request.pipeline_analysis
     )
     
     logger.info(f"📦 创建批量生成任务: {batch_id}, 章节: 第{start_number}-{end_number}章, 预估耗时: {estimated_time}分钟")
     
-    # 启动后台批量生成任务，传递model参数
-    background_tasks.add_task(
-        execute_batch_generation_in_order,
-        batch_id=batch_id,
-        user_id=user_id,
-        ai_service=user_ai_service,
-        custom_model=batch_request.model
-    )
-    
     return BatchGenerateResponse(
         batch_id=batch_id,
         message=f"批量生成任务已创建，将生成 {len(chapters_to_generate)} 个章节",
@@ -2347,34 +2511,99 @@ async def cancel_batch_generation(
     }
 
 
+async def run_batch_chapter_analysis(
+    chapter_id: str,
+    chapter_number: int,
+    user_id: str,
+    project_id: str,
+    ai_service: AIService,
+    write_lock: ProjectWriteLock
+) -> Optional[str]:
+    """
+    批量生成中同步分析单个章节（最多重试3次）
+    
+    分析任务记录使用独立数据库会话创建，因此可以与下一章的生成并发执行。
+    
+    Returns:
+        None 表示分析成功，否则为最后一次失败的原因
+    """
+    last_analysis_error = None
+    for analysis_retry_count in range(3):
+        try:
+            if analysis_retry_count > 0:
+                logger.info(f"🔄 重试分析章节 (第{analysis_retry_count}次): 第{chapter_number}章")
+            
+            async with write_lock:
+                async with background_session(user_id) as session:
+                    analysis_task = AnalysisTask(
+                        chapter_id=chapter_id,
+                        user_id=user_id,
+                        project_id=project_id,
+                        status='pending',
+                        progress=0
+                    )
+                    session.add(analysis_task)
+                    await session.commit()
+                    await session.refresh(analysis_task)
+            
+            # 同步执行分析，直接使用返回值判断成功/失败
+            analysis_result = await analyze_chapter_background(
+                chapter_id=chapter_id,
+                user_id=user_id,
+                project_id=project_id,
+                task_id=analysis_task.id,
+                ai_service=ai_service
+            )
+            
+            if not analysis_result:
+                logger.error(f"❌ 章节分析失败: 第{chapter_number}章")
+                raise Exception("章节分析失败")
+            
+            logger.info(f"✅ 章节分析成功: 第{chapter_number}章")
+            return None
+        
+        except Exception as analysis_error:
+            last_analysis_error = str(analysis_error)
+            if analysis_retry_count < 2:
+                # 还有重试机会，等待后重试
+                wait_time = min(2 ** (analysis_retry_count + 1), 10)
+                logger.warning(f"⏳ 分析失败，等待 {wait_time} 秒后重试...")
+                await asyncio.sleep(wait_time)
+    
+    logger.error(f"❌ 章节分析失败，已达最大重试次数(3次): 第{chapter_number}章")
+    return last_analysis_error or "分析失败"
+
+
 async def execute_batch_generation_in_order(
     batch_id: str,
     user_id: str,
     ai_service: AIService,
-    custom_model: Optional[str] = None
+    custom_model: Optional[str] = None,
+    pipeline_analysis: bool = False
 ):
     """
-    按顺序执行批量生成任务（后台任务）
+    按顺序执行批量生成任务（由任务队列worker执行）
     - 严格按章节序号顺序
     - 任一章节失败则终止后续生成
+    - 中断后重新执行时跳过已完成的章节，从下一章继续
     - 可选同步分析
+    - 流水线模式（pipeline_analysis）：分析第N章与生成第N+1章并发执行。
+      第N+1章所需的衔接内容（第N章正文与摘要）在生成完成时即可用；
+      第N章分析产生的记忆/伏笔/职业更新只是软依赖，在生成第N+2章之前必须完成，
+      因此后续章节看到的分析数据最多滞后一章。
     """
     db_session = None
-    write_lock = await get_db_write_lock(user_id)
+    task = None
+    # 流水线模式下正在后台分析的上一章：(分析任务, 章节ID, 章节序号, 章节标题)
+    pending_analysis = None
     
     try:
         logger.info(f"📦 开始执行顺序批量生成任务: {batch_id}")
         
         # 创建独立数据库会话
-        from app.database import get_engine
-        from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
-        
-        engine = await get_engine(user_id)
-        AsyncSessionLocal = async_sessionmaker(
-            engine,
-            class_=AsyncSession,
-            expire_on_commit=False
-        )
+        from app.database import get_session_factory
+        
+        AsyncSessionLocal = await get_session_factory(user_id)
         db_session = AsyncSessionLocal()
         
         # 获取任务
@@ -2387,21 +2616,95 @@ async def execute_batch_generation_in_order(
             logger.error(f"❌ 批量生成任务不存在: {batch_id}")
             return
         
+        if task.status in ('completed', 'failed', 'cancelled'):
+            logger.info(f"⏭️ 批量生成任务已结束({task.status})，跳过: {batch_id}")
+            return
+        
+        # 按项目加锁，其他项目的生成与分析不受影响
+        write_lock = project_write_lock(task.project_id)
+        
+        # 已完成的章节（含分析）不再重新生成；生成完成但分析未完成的章节会重新生成
+        resume_from = min(task.completed_chapters or 0, len(task.chapter_ids))
+        if resume_from:
+            logger.info(f"♻️ 恢复批量生成任务: {batch_id}，跳过已完成的 {resume_from} 章")
+        
         # 更新任务状态为运行中
         async with write_lock:
             task.status = 'running'
-            task.started_at = datetime.now()
+            if not task.started_at:
+                task.started_at = datetime.now()
             await db_session.commit()
         
         # 维护上一章的摘要，用于传递给下一章（防重复上下文）
         last_generated_summary = None
+        
+        async def record_analysis_result(
+            analyzed_id: str,
+            analyzed_number: int,
+            analyzed_title: str,
+            analysis_error: Optional[str]
+        ) -> bool:
+            """
+            记录章节分析结果：成功计入完成数，失败则标记整个任务失败
+            
+            Returns:
+                False 表示分析失败，批量任务应立即终止
+            """
+            if analysis_error is not None:
+                async with write_lock:
+                    if task.failed_chapters is None:
+                        task.failed_chapters = []
+                    task.failed_chapters.append({
+                        'chapter_id': analyzed_id,
+                        'chapter_number': analyzed_number,
+                        'title': analyzed_title,
+                        'error': f"分析失败(重试3次): {analysis_error}",
+                        'retry_count': 3
+                    })
+                    
+                    # 标记任务失败并终止
+                    task.status = 'failed'
+                    task.error_message = f"第{analyzed_number}章分析失败(重试3次): {analysis_error}"[:500]
+                    task.completed_at = datetime.now()
+                    task.current_retry_count = 0
+                    await db_session.commit()
+                
+                logger.error(f"🛑 批量生成中断: 第{analyzed_number}章分析失败")
+                return False
+            
+            async with write_lock:
+                task.completed_chapters += 1
+                await db_session.commit()
+            logger.info(f"✅ 进度: {task.completed_chapters}/{task.total_chapters}")
+            return True
+        
+        async def finish_pending_analysis() -> bool:
+            """等待后台分析中的上一章完成（依赖屏障）并记录结果"""
+            nonlocal pending_analysis
+            if pending_analysis is None:
+                return True
+            analysis_future, analyzed_id, analyzed_number, analyzed_title = pending_analysis
+            # 等待结束后再清除，期间被中断时由 finally 取消该分析
+            analysis_error = await analysis_future
+            pending_analysis = None
+            return await record_analysis_result(
+                analyzed_id, analyzed_number, analyzed_title, analysis_error
+            )
+        
+        if task.enable_analysis and pipeline_analysis:
+            # 分析与生成并发使用同一个AI服务，预先加载MCP工具，避免并发访问其数据库会话
+            await ai_service.preload_mcp_tools()
+            logger.info(f"⚡ 批量生成启用流水线模式: 分析第N章与生成第N+1章并行")
 
         # 按顺序生成每个章节
-        for idx, chapter_id in enumerate(task.chapter_ids, 1):
+        for idx, chapter_id in enumerate(task.chapter_ids[resume_from:], resume_from + 1):
             # 检查任务是否被取消
             await db_session.refresh(task)
             if task.status == 'cancelled':
                 logger.info(f"🛑 批量生成任务已被取消: {batch_id}")
+                if pending_analysis:
+                    # 上一章已生成，让其分析正常结束（不再改变已取消的任务状态）
+                    await pending_analysis[0]
                 return
             
             # 更新当前章节
@@ -2466,96 +2769,47 @@ async def execute_batch_generation_in_order(
                     
                     # 如果启用同步分析
                     if task.enable_analysis:
-                        logger.info(f"🔍 开始同步分析章节: 第{chapter.chapter_number}章")
+                        # 依赖屏障：上一章的分析必须在本章分析开始前（即下一章生成前）完成
+                        if not await finish_pending_analysis():
+                            return
                         
-                        # 分析重试机制（最多3次）
-                        analysis_retry_count = 0
-                        analysis_success = False
-                        last_analysis_error = None
+                        analysis_coro = run_batch_chapter_analysis(
+                            chapter_id=chapter_id,
+                            chapter_number=chapter.chapter_number,
+                            user_id=user_id,
+                            project_id=task.project_id,
+                            ai_service=ai_service,
+                            write_lock=write_lock
+                        )
                         
-                        while analysis_retry_count < 3 and not analysis_success:
-                            try:
-                                if analysis_retry_count > 0:
-                                    logger.info(f"🔄 重试分析章节 (第{analysis_retry_count}次): 第{chapter.chapter_number}章")
-                                
-                                async with write_lock:
-                                    analysis_task = AnalysisTask(
-                                        chapter_id=chapter_id,
-                                        user_id=user_id,
-                                        project_id=task.project_id,
-                                        status='pending',
-                                        progress=0
-                                    )
-                                    db_session.add(analysis_task)
-                                    await db_session.commit()
-                                    await db_session.refresh(analysis_task)
-                                
-                                # 同步执行分析，直接使用返回值判断成功/失败
-                                analysis_result = await analyze_chapter_background(
-                                    chapter_id=chapter_id,
-                                    user_id=user_id,
-                                    project_id=task.project_id,
-                                    task_id=analysis_task.id,
-                                    ai_service=ai_service
-                                )
-                                
-                                # 直接根据返回值判断
-                                if not analysis_result:
-                                    last_analysis_error = "分析函数返回失败"
-                                    logger.error(f"❌ 章节分析失败: 第{chapter.chapter_number}章")
-                                    raise Exception(f"章节分析失败")
-                                
-                                # 分析成功
-                                analysis_success = True
-                                logger.info(f"✅ 章节分析成功: 第{chapter.chapter_number}章")
-                                
-                            except Exception as analysis_error:
-                                last_analysis_error = str(analysis_error)
-                                analysis_retry_count += 1
-                                
-                                if analysis_retry_count < 3:
-                                    # 还有重试机会，等待后重试
-                                    wait_time = min(2 ** analysis_retry_count, 10)
-                                    logger.warning(f"⏳ 分析失败，等待 {wait_time} 秒后重试...")
-                                    await asyncio.sleep(wait_time)
-                                else:
-                                    # 达到最大重试次数，必须终止整个批量任务
-                                    logger.error(f"❌ 章节分析失败，已达最大重试次数(3次): 第{chapter.chapter_number}章")
-                                    
-                                    # 记录失败信息
-                                    failed_info = {
-                                        'chapter_id': chapter_id,
-                                        'chapter_number': chapter.chapter_number,
-                                        'title': chapter.title,
-                                        'error': f"分析失败(重试3次): {last_analysis_error}",
-                                        'retry_count': 3
-                                    }
-                                    
-                                    async with write_lock:
-                                        if task.failed_chapters is None:
-                                            task.failed_chapters = []
-                                        task.failed_chapters.append(failed_info)
-                                        
-                                        # 标记任务失败并终止
-                                        task.status = 'failed'
-                                        task.error_message = f"第{chapter.chapter_number}章分析失败(重试3次): {last_analysis_error}"[:500]
-                                        task.completed_at = datetime.now()
-                                        task.current_retry_count = 0
-                                        await db_session.commit()
-                                    
-                                    logger.error(f"🛑 批量生成中断: 第{chapter.chapter_number}章分析失败")
-                                    return  # 立即终止整个批量生成任务
+                        if pipeline_analysis:
+                            # 流水线模式：后台分析本章，立即开始生成下一章
+                            logger.info(f"🔍 开始后台分析章节: 第{chapter.chapter_number}章（与下一章生成并行）")
+                            pending_analysis = (
+                                asyncio.create_task(analysis_coro),
+                                chapter_id,
+                                chapter.chapter_number,
+                                chapter.title
+                            )
+                        else:
+                            logger.info(f"🔍 开始同步分析章节: 第{chapter.chapter_number}章")
+                            if not await record_analysis_result(
+                                chapter_id, chapter.chapter_number, chapter.title, await analysis_coro
+                            ):
+                                return  # 立即终止整个批量生成任务
                     
                     # 标记成功
                     chapter_success = True
                     
-                    # 更新完成数
+                    # 更新完成数（启用分析时在分析成功后计数）
                     async with write_lock:
-                        task.completed_chapters += 1
+                        if not task.enable_analysis:
+                            task.completed_chapters += 1
                         task.current_retry_count = 0  # 重置重试计数
                         await db_session.commit()
                     
-                    logger.info(f"✅ 进度: {task.completed_chapters}/{task.total_chapters}")
+                    if not task.enable_analysis:
+                        logger.info(f"✅ 进度: {task.completed_chapters}/{task.total_chapters}")
                     
                 except Exception as e:
                     last_error = str(e)
@@ -2573,6 +2827,10 @@ async def execute_batch_generation_in_order(
                         # 达到最大重试次数，记录失败信息
                         logger.error(f"❌ 章节生成失败，已达最大重试次数({task.max_retries}): 第{chapter.chapter_number if chapter else '?'}章")
                         
+                        # 先收尾后台分析中的上一章（其失败同样会终止任务）
+                        if not await finish_pending_analysis():
+                            return
+                        
                         failed_info = {
                             'chapter_id': chapter_id,
                             'chapter_number': chapter.chapter_number if chapter else -1,
@@ -2602,6 +2860,10 @@ async def execute_batch_generation_in_order(
                         
                         return
         
+        # 等待最后一章的分析完成
+        if not await finish_pending_analysis():
+            return
+        
         # 全部完成
         async with write_lock:
             task.status = 'completed'
@@ -2624,10 +2886,46 @@ async def execute_batch_generation_in_order(
             except Exception as commit_error:
                 logger.error(f"❌ 更新任务失败状态失败: {str(commit_error)}")
     finally:
+        # 异常或被任务队列中断（租约失效/worker停止）时，不能留下仍在写入的后台分析：
+        # 重新执行会从该章重新生成并再次分析
+        if pending_analysis and not pending_analysis[0].done():
+            logger.warning(f"🛑 取消后台分析中的章节: 第{pending_analysis[2]}章")
+            pending_analysis[0].cancel()
+            with suppress(asyncio.CancelledError):
+                await pending_analysis[0]
         if db_session:
             await db_session.close()
 
 
+async def run_batch_generation_job(job: GenerationJob) -> None:
+    """任务队列执行入口：批量生成章节（重新执行时从最后完成的章节继续）"""
+    payload = job.payload or {}
+    # AI服务绑定独立会话（用于加载MCP工具），生命周期覆盖整个批量任务
+    async with background_session(job.user_id) as ai_db:
+        ai_service = await load_user_ai_service(job.user_id, ai_db)
+        await execute_batch_generation_in_order(
+            batch_id=job.task_id,
+            user_id=job.user_id,
+            ai_service=ai_service,
+            custom_model=payload.get('custom_model'),
+            pipeline_analysis=payload.get('pipeline_analysis', False)
+        )
+
+
+async def run_chapter_analysis_job(job: GenerationJob) -> None:
+    """任务队列执行入口：章节分析"""
+    payload = job.payload or {}
+    async with background_session(job.user_id) as ai_db:
+        ai_service = await load_user_ai_service(job.user_id, ai_db)
+        await analyze_chapter_background(
+            chapter_id=payload['chapter_id'],
+            user_id=job.user_id,
+            project_id=job.project_id,
+            task_id=job.task_id,
+            ai_service=ai_service
+        )
+
+
 async def generate_single_chapter_for_batch(
     db_session: AsyncSession,
     chapter: Chapter,
@@ -2635,7 +2933,7 @@ async def generate_single_chapter_for_batch(
     style_id: Optional[int],
     target_word_count: int,
     ai_service: AIService,
-    write_lock: Lock,
+    write_lock: ProjectWriteLock,
     custom_model: Optional[str] = None,
     previous_summary_context: Optional[str] = None
 ) -> Optional[str]:
@@ -4,12 +4,12 @@
 """
 import asyncio
 from fastapi import APIRouter, HTTPException, Depends, Query, Request, BackgroundTasks
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 from typing import List, Optional
 from datetime import datetime
 
-from app.database import get_db, get_engine
+from app.database import get_db, background_session
 from app.models.mcp_plugin import MCPPlugin
 from app.schemas.mcp_plugin import (
     MCPPluginCreate,
@@ -23,6 +23,7 @@ import json
 from app.user_manager import User
 from app.mcp import mcp_client, MCPPluginConfig, PluginStatus
 from app.services.mcp_test_service import mcp_test_service
+from app.services.ai_service import invalidate_user_ai_service
 from app.logger import get_logger
 
 logger = get_logger(__name__)
@@ -66,10 +67,7 @@ async def _register_plugin_background(
             success = False
 
         # 更新数据库状态
-        engine = await get_engine(user_id)
-        AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-        async with AsyncSessionLocal() as db:
+        async with background_session(user_id) as db:
             stmt = (
                 update(MCPPlugin)
                 .where(MCPPlugin.user_id == user_id, MCPPlugin.plugin_name == plugin_name)
@@ -89,9 +87,7 @@ async def _register_plugin_background(
     except Exception as e:
         logger.error(f"后台注册MCP插件异常: {plugin_name}, 错误: {e}")
         try:
-            engine = await get_engine(user_id)
-            AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-            async with AsyncSessionLocal() as db:
+            async with background_session(user_id) as db:
                 stmt = (
                     update(MCPPlugin)
                     .where(MCPPlugin.user_id == user_id, MCPPlugin.plugin_name == plugin_name)
@@ -201,6 +197,7 @@ async def create_plugin(
     db.add(plugin)
     await db.commit()
     await db.refresh(plugin)
+    invalidate_user_ai_service(user.user_id)
     
     # 如果启用，注册到统一门面
     if plugin.enabled:
@@ -312,6 +309,7 @@ async def create_plugin_simple(
             plugin = existing
             await db.commit()
             await db.refresh(plugin)
+            invalidate_user_ai_service(user.user_id)
 
             # 后台执行MCP操作（不阻塞请求）
             if old_enabled:
@@ -344,6 +342,7 @@ async def create_plugin_simple(
             db.add(plugin)
             await db.commit()
             await db.refresh(plugin)
+            invalidate_user_ai_service(user.user_id)
 
             # 后台执行MCP注册（不阻塞请求）
             if plugin.enabled:
@@ -420,6 +419,7 @@ async def update_plugin(
     
     await db.commit()
     await db.refresh(plugin)
+    invalidate_user_ai_service(user.user_id)
     
     # 如果插件已启用，重新注册
     if plugin.enabled:
@@ -456,6 +456,7 @@ async def delete_plugin(
     # 删除数据库记录
     await db.delete(plugin)
     await db.commit()
+    invalidate_user_ai_service(user.user_id)
     
     logger.info(f"用户 {user.user_id} 删除插件: {plugin.plugin_name}")
     return {"message": "插件已删除", "plugin_name": plugin.plugin_name}
@@ -496,6 +497,7 @@ async def toggle_plugin(
     
     await db.commit()
     await db.refresh(plugin)
+    invalidate_user_ai_service(user.user_id)
     
     # 数据库操作完成后，再进行MCP操作
     if enabled:
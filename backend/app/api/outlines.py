@@ -2561,73 +2561,123 @@ async def batch_expand_outlines_generator(
         total_chapters_created = 0
         skipped_outlines = []
         
-        for idx, outline in enumerate(outlines):
-            try:
-                # 计算当前子进度 (0.0-1.0)，用于generating阶段
-                sub_progress = idx / max(total_outlines, 1)
-                
+        # 一次查询已经展开过的大纲并跳过
+        expanded_result = await db.execute(
+            select(Chapter.outline_id)
+            .where(Chapter.outline_id.in_([outline.id for outline in outlines]))
+            .distinct()
+        )
+        expanded_outline_ids = set(expanded_result.scalars().all())
+        pending_outlines = []
+        for outline in outlines:
+            if outline.id in expanded_outline_ids:
+                logger.info(f"大纲 {outline.title} (ID: {outline.id}) 已经展开过，跳过")
+                skipped_outlines.append({
+                    "outline_id": outline.id,
+                    "outline_title": outline.title,
+                    "reason": "已展开"
+                })
+            else:
+                pending_outlines.append(outline)
+        
+        estimated_total = max(len(pending_outlines), 1) * chapters_per_outline * 500
+        if skipped_outlines:
+            yield await tracker.generating(
+                current_chars=0,
+                estimated_total=estimated_total,
+                message=f"⏭️ 跳过 {len(skipped_outlines)} 个已展开的大纲"
+            )
+        
+        # 大纲并发展开（按完成顺序推送进度），章节按大纲顺序依次保存，保证章节序号确定
+        finished = {}
+        next_to_save = 0
+        completed = 0
+        
+        async for outcome in expansion_service.iter_expand_outlines(
+            outlines=pending_outlines,
+            project=project,
+            db=db,
+            target_chapter_count=chapters_per_outline,
+            expansion_strategy=expansion_strategy,
+            enable_scene_analysis=data.get("enable_scene_analysis", True),
+            provider=data.get("provider"),
+            model=data.get("model"),
+            concurrency=int(data["concurrency"]) if data.get("concurrency") else None
+        ):
+            completed += 1
+            outline = pending_outlines[outcome.index]
+            if outcome.ok:
+                message = f"✅ {outline.title} 规划生成完成 ({len(outcome.result)} 章) [{completed}/{len(pending_outlines)}]"
+            else:
+                logger.error(f"展开大纲 {outline.id} 失败: {str(outcome.error)}")
+                message = f"❌ {outline.title} 展开失败: {str(outcome.error)}"
+            yield await SSEResponse.send_event("outline_progress", {
+                "type": "outline_progress",
+                "outline_id": outline.id,
+                "outline_title": outline.title,
+                "index": outcome.index,
+                "completed": completed,
+                "total": len(pending_outlines),
+                "chapter_count": len(outcome.result) if outcome.ok else 0,
+                "error": None if outcome.ok else str(outcome.error)
+            })
+            if outcome.ok:
                 yield await tracker.generating(
-                    current_chars=idx * chapters_per_outline * 500,
-                    estimated_total=total_outlines * chapters_per_outline * 500,
-                    message=f"📝 处理第 {idx + 1}/{total_outlines} 个大纲: {outline.title}"
-                )
-                
-                # 检查大纲是否已经展开过
-                existing_chapters_result = await db.execute(
-                    select(Chapter)
-                    .where(Chapter.outline_id == outline.id)
-                    .limit(1)
+                    current_chars=completed * chapters_per_outline * 500,
+                    estimated_total=estimated_total,
+                    message=message
                 )
-                existing_chapter = existing_chapters_result.scalar_one_or_none()
+            else:
+                yield await tracker.warning(message)
+            
+            finished[outcome.index] = outcome
+            while next_to_save in finished:
+                saved = finished.pop(next_to_save)
+                outline = pending_outlines[next_to_save]
+                next_to_save += 1
                 
-                if existing_chapter:
-                    logger.info(f"大纲 {outline.title} (ID: {outline.id}) 已经展开过，跳过")
-                    skipped_outlines.append({
+                if not saved.ok:
+                    expansion_results.append({
                         "outline_id": outline.id,
                         "outline_title": outline.title,
-                        "reason": "已展开"
+                        "target_chapter_count": chapters_per_outline,
+                        "actual_chapter_count": 0,
+                        "expansion_strategy": expansion_strategy,
+                        "chapter_plans": [],
+                        "created_chapters": None,
+                        "error": str(saved.error)
                     })
-                    yield await tracker.generating(
-                        current_chars=(idx + 1) * chapters_per_outline * 500,
-                        estimated_total=total_outlines * chapters_per_outline * 500,
-                        message=f"⏭️ {outline.title} 已展开过，跳过"
-                    )
                     continue
                 
-                # 分析大纲生成章节规划
-                yield await tracker.generating(
-                    current_chars=idx * chapters_per_outline * 500,
-                    estimated_total=total_outlines * chapters_per_outline * 500,
-                    message=f"🤖 AI分析大纲: {outline.title}"
-                )
-                
-                chapter_plans = await expansion_service.analyze_outline_for_chapters(
-                    outline=outline,
-                    project=project,
-                    db=db,
-                    target_chapter_count=chapters_per_outline,
-                    expansion_strategy=expansion_strategy,
-                    enable_scene_analysis=data.get("enable_scene_analysis", True),
-                    provider=data.get("provider"),
-                    model=data.get("model")
-                )
-                
-                yield await tracker.generating(
-                    current_chars=(idx + 0.5) * chapters_per_outline * 500,
-                    estimated_total=total_outlines * chapters_per_outline * 500,
-                    message=f"✅ {outline.title} 规划生成完成 ({len(chapter_plans)} 章)"
-                )
-                
+                chapter_plans = saved.result
                 created_chapters = None
                 if auto_create_chapters:
-                    # 创建章节记录
-                    chapters = await expansion_service.create_chapters_from_plans(
-                        outline_id=outline.id,
-                        chapter_plans=chapter_plans,
-                        project_id=outline.project_id,
-                        db=db,
-                        start_chapter_number=None  # 自动计算章节序号
-                    )
+                    try:
+                        # 创建章节记录
+                        chapters = await expansion_service.create_chapters_from_plans(
+                            outline_id=outline.id,
+                            chapter_plans=chapter_plans,
+                            project_id=outline.project_id,
+                            db=db,
+                            start_chapter_number=None  # 自动计算章节序号
+                        )
+                    except Exception as e:
+                        logger.error(f"创建大纲 {outline.id} 的章节失败: {str(e)}", exc_info=True)
+                        if db.in_transaction():
+                            await db.rollback()
+                        yield await tracker.warning(f"❌ {outline.title} 章节创建失败: {str(e)}")
+                        expansion_results.append({
+                            "outline_id": outline.id,
+                            "outline_title": outline.title,
+                            "target_chapter_count": chapters_per_outline,
+                            "actual_chapter_count": len(chapter_plans),
+                            "expansion_strategy": expansion_strategy,
+                            "chapter_plans": chapter_plans,
+                            "created_chapters": None,
+                            "error": str(e)
+                        })
+                        continue
+                    
                     created_chapters = [
                         {
                             "id": ch.id,
@@ -2643,8 +2693,8 @@ async def batch_expand_outlines_generator(
                     total_chapters_created += len(chapters)
                     
                     yield await tracker.generating(
-                        current_chars=(idx + 1) * chapters_per_outline * 500,
-                        estimated_total=total_outlines * chapters_per_outline * 500,
+                        current_chars=completed * chapters_per_outline * 500,
+                        estimated_total=estimated_total,
                         message=f"💾 {outline.title} 章节创建完成 ({len(chapters)} 章)"
                     )
                 
@@ -2659,22 +2709,6 @@ async def batch_expand_outlines_generator(
                 })
                 
                 logger.info(f"大纲 {outline.title} 展开完成，生成 {len(chapter_plans)} 个章节规划")
-                
-            except Exception as e:
-                logger.error(f"展开大纲 {outline.id} 失败: {str(e)}", exc_info=True)
-                yield await tracker.warning(
-                    f"❌ {outline.title} 展开失败: {str(e)}"
-                )
-                expansion_results.append({
-                    "outline_id": outline.id,
-                    "outline_title": outline.title,
-                    "target_chapter_count": chapters_per_outline,
-                    "actual_chapter_count": 0,
-                    "expansion_strategy": expansion_strategy,
-                    "chapter_plans": [],
-                    "created_chapters": None,
-                    "error": str(e)
-                })
         
         yield await tracker.parsing("整理结果数据...")
         
@@ -2739,6 +2773,7 @@ async def batch_expand_outlines_stream(
         "expansion_strategy": "balanced",  // balanced/climax/detail
         "auto_create_chapters": false,  // 是否自动创建章节
         "enable_scene_analysis": true,  // 是否启用场景分析
+        "concurrency": 3,  // 可选，同时展开的大纲数（不超过服务端上限）
         "provider": "openai",  // 可选
         "model": "gpt-4"  // 可选
     }
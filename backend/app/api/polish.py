@@ -1,12 +1,17 @@
 """AI去味API - 核心特色功能"""
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.generation_history import GenerationHistory
-from app.schemas.polish import PolishRequest, PolishResponse
+from app.schemas.polish import PolishRequest, PolishResponse, PolishBatchRequest
 from app.services.ai_service import AIService
 from app.services.prompt_service import prompt_service, PromptService
+from app.utils.concurrency import bounded_map
+from app.utils.sse_response import SSEResponse, create_sse_response
+from app.config import settings as app_settings
 from app.logger import get_logger
 from app.api.settings import get_user_ai_service
 
@@ -86,6 +91,60 @@ async def polish_text(
         raise HTTPException(status_code=500, detail=f"AI去味失败: {str(e)}")
 
 
+def _batch_concurrency(requested: Optional[int] = None) -> int:
+    """批量去味并发数（不超过服务端上限）"""
+    limit = max(1, app_settings.polish_batch_max_concurrency)
+    return min(requested, limit) if requested else limit
+
+
+async def _polish_items(
+    texts: List[str],
+    template: str,
+    user_ai_service: AIService,
+    provider: Optional[str],
+    model: Optional[str],
+    temperature: Optional[float],
+    concurrency: int,
+    ordered: bool,
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    以有限并发对多个文本去味，每完成一个产出一个结果
+    
+    模板只获取一次；实际请求速率另由 AI 请求限流器按提供商/密钥控制。
+    单个文本失败时产出带 error 的结果，不影响其他文本。
+    """
+    # MCP工具加载会使用数据库会话，并发前预加载一次
+    await user_ai_service.preload_mcp_tools()
+    
+    async def polish_one(index: int, text: str) -> str:
+        logger.info(f"处理第 {index+1}/{len(texts)} 个文本")
+        prompt = PromptService.format_prompt(template, original_text=text)
+        response = await user_ai_service.generate_text(
+            prompt=prompt,
+            provider=provider,
+            model=model,
+            temperature=temperature
+        )
+        return response if isinstance(response, str) else response.get("content", "")
+    
+    async for outcome in bounded_map(texts, polish_one, concurrency, ordered=ordered):
+        text = texts[outcome.index]
+        if outcome.ok:
+            yield {
+                "index": outcome.index,
+                "original": text,
+                "polished": outcome.result,
+                "word_count_before": len(text),
+                "word_count_after": len(outcome.result)
+            }
+        else:
+            yield {
+                "index": outcome.index,
+                "original": text,
+                "error": str(outcome.error)
+            }
+
+
 @router.post("/batch", summary="批量AI去味")
 async def polish_batch(
     texts: list[str],
@@ -99,43 +158,90 @@ async def polish_batch(
     """
     批量处理多个文本的AI去味
     
-    适用于一次性处理多个章节或段落
+    适用于一次性处理多个章节或段落。文本以有限并发处理，结果按输入顺序返回；
+    单个文本失败时该条结果带 error 字段并计入 failed，不影响其他文本。
+    需要逐条获取结果时使用 /polish/batch/stream。
     """
     try:
         # 获取用户ID
         user_id = getattr(http_request.state, 'user_id', None) if http_request else None
         
-        results = []
+        # 获取自定义提示词模板（整批只获取一次）
+        template = await PromptService.get_template("AI_DENOISING", user_id, db)
         
-        for idx, text in enumerate(texts):
-            logger.info(f"处理第 {idx+1}/{len(texts)} 个文本")
-            
-            # 获取自定义提示词模板
-            template = await PromptService.get_template("AI_DENOISING", user_id, db)
-            # 格式化提示词
-            prompt = PromptService.format_prompt(template, original_text=text)
-            
-            polished_text = await user_ai_service.generate_text(
-                prompt=prompt,
-                provider=provider,
-                model=model
+        results = [
+            item async for item in _polish_items(
+                texts, template, user_ai_service, provider, model, None,
+                _batch_concurrency(), ordered=True
             )
-            
-            results.append({
-                "index": idx,
-                "original": text,
-                "polished": polished_text,
-                "word_count_before": len(text),
-                "word_count_after": len(polished_text)
-            })
+        ]
+        failed = sum(1 for item in results if "error" in item)
         
-        logger.info(f"批量AI去味完成，共处理 {len(results)} 个文本")
+        logger.info(f"批量AI去味完成，共处理 {len(results)} 个文本，失败 {failed} 个")
         
         return {
             "total": len(results),
+            "failed": failed,
             "results": results
         }
         
     except Exception as e:
         logger.error(f"批量AI去味失败: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"批量AI去味失败: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"批量AI去味失败: {str(e)}")
+
+
+@router.post("/batch/stream", summary="批量AI去味（流式）")
+async def polish_batch_stream(
+    request: PolishBatchRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_db),
+    user_ai_service: AIService = Depends(get_user_ai_service)
+):
+    """
+    批量AI去味，通过SSE逐条推送结果
+    
+    事件：
+    - polish_item: 单个文本的结果（index 为输入中的位置，失败时带 error）
+    - progress: 整体进度
+    - result: 汇总（total / succeeded / failed）
+    
+    order=completion 时先完成先推送，order=input 时按输入顺序推送。
+    """
+    user_id = getattr(http_request.state, 'user_id', None)
+    
+    async def generate():
+        try:
+            total = len(request.texts)
+            concurrency = _batch_concurrency(request.concurrency)
+            yield await SSEResponse.send_progress(f"开始批量去味，共 {total} 个文本（并发 {concurrency}）", 0)
+            
+            template = await PromptService.get_template("AI_DENOISING", user_id, db)
+            
+            completed = 0
+            failed = 0
+            async for item in _polish_items(
+                request.texts, template, user_ai_service, request.provider, request.model,
+                request.temperature, concurrency, ordered=request.order == "input"
+            ):
+                completed += 1
+                if "error" in item:
+                    failed += 1
+                yield await SSEResponse.send_event("polish_item", {"type": "polish_item", **item})
+                yield await SSEResponse.send_progress(
+                    f"已完成 {completed}/{total}",
+                    int(completed / total * 100)
+                )
+            
+            logger.info(f"批量AI去味完成，共处理 {total} 个文本，失败 {failed} 个")
+            yield await SSEResponse.send_result({
+                "total": total,
+                "succeeded": total - failed,
+                "failed": failed
+            })
+            yield await SSEResponse.send_done()
+        
+        except Exception as e:
+            logger.error(f"批量AI去味失败: {str(e)}")
+            yield await SSEResponse.send_error(f"批量AI去味失败: {str(e)}")
+    
+    return create_sse_response(generate())
@@ -1,6 +1,6 @@
 """项目管理API"""
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Request
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, delete
 from typing import List
@@ -37,6 +37,34 @@ from app.utils.data_consistency import (
 logger = get_logger(__name__)
 router = APIRouter(prefix="/projects", tags=["项目管理"])
 
+# TXT导出时每批从数据库读取的章节数
+TXT_EXPORT_BATCH_SIZE = 20
+
+# 项目数据导入的文件大小限制：JSON需整体解析，NDJSON逐行流式处理
+JSON_IMPORT_MAX_SIZE = 50 * 1024 * 1024  # 50MB
+NDJSON_IMPORT_MAX_SIZE = 1024 * 1024 * 1024  # 1GB
+NDJSON_READ_CHUNK_SIZE = 64 * 1024
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+
+
+async def _iter_upload_lines(file: UploadFile, max_size: int):
+    """按块读取上传文件并逐行产出（bytes），累计超过 max_size 时抛出 ValueError"""
+    total = 0
+    pending = b""
+    while True:
+        chunk = await file.read(NDJSON_READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_size:
+            raise ValueError(f"文件大小超过{max_size // (1024 * 1024)}MB限制")
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
 
 @router.post("", response_model=ProjectResponse, summary="创建项目")
 async def create_project(
@@ -323,57 +351,63 @@ async def export_project_chapters(
             logger.warning(f"项目不存在或无权访问: project_id={project_id}, user_id={user_id}")
             raise HTTPException(status_code=404, detail="项目不存在")
         
-        chapters_result = await db.execute(
-            select(Chapter)
-            .where(Chapter.project_id == project_id)
-            .order_by(Chapter.chapter_number)
+        count_result = await db.execute(
+            select(func.count(Chapter.id)).where(Chapter.project_id == project_id)
         )
-        chapters = chapters_result.scalars().all()
+        chapter_count = count_result.scalar_one()
         
-        if not chapters:
+        if not chapter_count:
             logger.warning(f"项目没有章节: {project_id}")
             raise HTTPException(status_code=404, detail="项目没有任何章节")
         
-        txt_content = []
+        header_lines = []
         
-        txt_content.append("=" * 80)
-        txt_content.append(f"项目标题: {project.title}")
-        txt_content.append("=" * 80)
+        header_lines.append("=" * 80)
+        header_lines.append(f"项目标题: {project.title}")
+        header_lines.append("=" * 80)
         
         if project.description:
-            txt_content.append(f"\n简介: {project.description}\n")
+            header_lines.append(f"\n简介: {project.description}\n")
         
         if project.theme:
-            txt_content.append(f"主题: {project.theme}")
+            header_lines.append(f"主题: {project.theme}")
         
         if project.genre:
-            txt_content.append(f"类型: {project.genre}")
+            header_lines.append(f"类型: {project.genre}")
         
-        txt_content.append(f"总章节数: {len(chapters)}")
-        txt_content.append(f"总字数: {project.current_words}")
-        txt_content.append("\n" + "=" * 80 + "\n\n")
+        header_lines.append(f"总章节数: {chapter_count}")
+        header_lines.append(f"总字数: {project.current_words}")
+        header_lines.append("\n" + "=" * 80 + "\n\n")
         
-        for chapter in chapters:
-            # 只显示主章节号，不显示子索引
-            txt_content.append(f"第 {chapter.chapter_number} 章  {chapter.title}")
-            txt_content.append("-" * 80)
-            txt_content.append("")  # 空行
+        async def generate_txt():
+            """逐章流式输出，服务端游标分批读取章节，内存占用与小说长度无关"""
+            yield ("\n".join(header_lines) + "\n").encode('utf-8')
             
-            if chapter.content:
-                txt_content.append(chapter.content)
-            else:
-                txt_content.append("（本章暂无内容）")
+            exported_count = 0
+            chapters_stream = await db.stream(
+                select(Chapter.chapter_number, Chapter.title, Chapter.content)
+                .where(Chapter.project_id == project_id)
+                .order_by(Chapter.chapter_number)
+                .execution_options(yield_per=TXT_EXPORT_BATCH_SIZE)
+            )
+            async for chapter in chapters_stream:
+                # 只显示主章节号，不显示子索引
+                chapter_lines = [
+                    f"第 {chapter.chapter_number} 章  {chapter.title}",
+                    "-" * 80,
+                    "",  # 空行
+                    chapter.content if chapter.content else "（本章暂无内容）",
+                    "\n\n" + "=" * 80 + "\n\n"
+                ]
+                yield ("\n".join(chapter_lines) + "\n").encode('utf-8')
+                exported_count += 1
             
-            txt_content.append("\n\n" + "=" * 80 + "\n\n")
-        
-        txt_content.append(f"--- 全文完 ---")
-        
-        # 获取当前时间
-        from datetime import datetime
-        export_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        txt_content.append(f"\n导出时间: {export_time}")
-        
-        final_content = "\n".join(txt_content)
+            # 获取当前时间
+            from datetime import datetime
+            export_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            yield f"--- 全文完 ---\n\n导出时间: {export_time}".encode('utf-8')
+            
+            logger.info(f"导出成功: {filename}, 共{exported_count}章")
         
         safe_title = "".join(c for c in project.title if c.isalnum() or c in (' ', '-', '_', '，', '。', '、'))
         filename = f"{safe_title}.txt"
@@ -381,10 +415,10 @@ async def export_project_chapters(
         from urllib.parse import quote
         encoded_filename = quote(filename)
         
-        logger.info(f"导出成功: {filename}, 共{len(chapters)}章, {len(final_content)}字符")
+        logger.info(f"开始流式导出: {filename}, 共{chapter_count}章")
         
-        return Response(
-            content=final_content.encode('utf-8'),
+        return StreamingResponse(
+            generate_txt(),
             media_type="text/plain; charset=utf-8",
             headers={
                 "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}",
@@ -551,7 +585,7 @@ async def fix_project_member_counts(
         raise HTTPException(status_code=500, detail=f"修复失败: {str(e)}")
 
 
-@router.post("/{project_id}/export-data", summary="导出项目数据为JSON")
+@router.post("/{project_id}/export-data", summary="导出项目数据为JSON/NDJSON")
 async def export_project_data(
     project_id: str,
     request: Request,
@@ -569,9 +603,10 @@ async def export_project_data(
             - include_careers: 是否包含职业系统
             - include_memories: 是否包含故事记忆
             - include_plot_analysis: 是否包含剧情分析
+            - format: json（默认）或 ndjson（逐行流式输出）
     
     Returns:
-        JSON文件下载
+        JSON/NDJSON文件下载
     """
     try:
         # 从认证中间件获取用户ID
@@ -595,6 +630,38 @@ async def export_project_data(
             logger.warning(f"项目不存在或无权访问: project_id={project_id}, user_id={user_id}")
             raise HTTPException(status_code=404, detail="项目不存在")
         
+        # 生成文件名
+        safe_title = "".join(c for c in project.title if c.isalnum() or c in (' ', '-', '_'))
+        from datetime import datetime
+        date_str = datetime.now().strftime("%Y%m%d")
+        
+        # NDJSON：逐行流式输出，大项目不需要在内存中拼出整个文档
+        if options.format == "ndjson":
+            filename = f"project_{safe_title}_{date_str}.ndjson"
+            encoded_filename = quote(filename)
+            
+            async def generate_ndjson():
+                async for line in ImportExportService.stream_export_project_ndjson(
+                    project_id=project_id,
+                    db=db,
+                    include_generation_history=options.include_generation_history,
+                    include_writing_styles=options.include_writing_styles,
+                    include_careers=options.include_careers,
+                    include_memories=options.include_memories,
+                    include_plot_analysis=options.include_plot_analysis
+                ):
+                    yield line.encode('utf-8')
+                logger.info(f"项目数据导出成功: {filename}")
+            
+            return StreamingResponse(
+                generate_ndjson(),
+                media_type="application/x-ndjson; charset=utf-8",
+                headers={
+                    "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}",
+                    "Content-Type": "application/x-ndjson; charset=utf-8"
+                }
+            )
+        
         # 导出数据（使用所有选项）
         export_data = await ImportExportService.export_project(
             project_id=project_id,
@@ -609,10 +676,6 @@ async def export_project_data(
         # 转换为JSON
         json_content = export_data.model_dump_json(indent=2, exclude_none=True, by_alias=True)
         
-        # 生成文件名
-        safe_title = "".join(c for c in project.title if c.isalnum() or c in (' ', '-', '_'))
-        from datetime import datetime
-        date_str = datetime.now().strftime("%Y%m%d")
         filename = f"project_{safe_title}_{date_str}.json"
         encoded_filename = quote(filename)
         
@@ -642,7 +705,7 @@ async def validate_import_file(
     验证导入文件的格式和内容
     
     Args:
-        file: 上传的JSON文件
+        file: 上传的JSON或NDJSON(.ndjson/.jsonl)文件
     
     Returns:
         验证结果
@@ -650,16 +713,23 @@ async def validate_import_file(
     try:
         logger.info(f"验证导入文件: {file.filename}")
         
+        # NDJSON：逐行校验，不整体加载
+        if file.filename.endswith(NDJSON_EXTENSIONS):
+            validation_result = await ImportExportService.validate_import_ndjson(
+                _iter_upload_lines(file, NDJSON_IMPORT_MAX_SIZE)
+            )
+            logger.info(f"文件验证完成: valid={validation_result.valid}")
+            return validation_result
+        
         # 检查文件类型
         if not file.filename.endswith('.json'):
-            raise HTTPException(status_code=400, detail="只支持JSON格式文件")
+            raise HTTPException(status_code=400, detail="只支持JSON或NDJSON格式文件")
         
         # 读取文件内容
         content = await file.read()
         
         # 检查文件大小（50MB限制）
-        max_size = 50 * 1024 * 1024  # 50MB
-        if len(content) > max_size:
+        if len(content) > JSON_IMPORT_MAX_SIZE:
             raise HTTPException(status_code=413, detail="文件大小超过50MB限制")
         
         # 解析JSON
@@ -691,7 +761,7 @@ async def import_project(
     导入项目数据（创建新项目）
     
     Args:
-        file: 上传的JSON文件
+        file: 上传的JSON或NDJSON(.ndjson/.jsonl)文件
     
     Returns:
         导入结果
@@ -705,26 +775,31 @@ async def import_project(
         
         logger.info(f"开始导入项目: {file.filename}, user_id={user_id}")
         
-        # 检查文件类型
-        if not file.filename.endswith('.json'):
-            raise HTTPException(status_code=400, detail="只支持JSON格式文件")
-        
-        # 读取文件内容
-        content = await file.read()
-        
-        # 检查文件大小
-        max_size = 50 * 1024 * 1024  # 50MB
-        if len(content) > max_size:
-            raise HTTPException(status_code=413, detail="文件大小超过50MB限制")
-        
-        # 解析JSON
-        try:
-            data = json.loads(content.decode('utf-8'))
-        except json.JSONDecodeError as e:
-            raise HTTPException(status_code=400, detail=f"无效的JSON格式: {str(e)}")
-        
-        # 导入数据（传入user_id）
-        import_result = await ImportExportService.import_project(data, db, user_id)
+        if file.filename.endswith(NDJSON_EXTENSIONS):
+            # NDJSON：逐行读取并分批写入
+            import_result = await ImportExportService.import_project_ndjson(
+                _iter_upload_lines(file, NDJSON_IMPORT_MAX_SIZE), db, user_id
+            )
+        else:
+            # 检查文件类型
+            if not file.filename.endswith('.json'):
+                raise HTTPException(status_code=400, detail="只支持JSON或NDJSON格式文件")
+            
+            # 读取文件内容
+            content = await file.read()
+            
+            # 检查文件大小
+            if len(content) > JSON_IMPORT_MAX_SIZE:
+                raise HTTPException(status_code=413, detail="文件大小超过50MB限制")
+            
+            # 解析JSON
+            try:
+                data = json.loads(content.decode('utf-8'))
+            except json.JSONDecodeError as e:
+                raise HTTPException(status_code=400, detail=f"无效的JSON格式: {str(e)}")
+            
+            # 导入数据（传入user_id）
+            import_result = await ImportExportService.import_project(data, db, user_id)
         
         if import_result.success:
             logger.info(f"项目导入成功: {import_result.project_id}")
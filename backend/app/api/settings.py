@@ -22,7 +22,15 @@ from app.schemas.settings import (
 from app.user_manager import User
 from app.logger import get_logger
 from app.config import settings as app_settings, PROJECT_ROOT
-from app.services.ai_service import AIService, create_user_ai_service, create_user_ai_service_with_mcp
+from app.services.ai_service import (
+    AIService,
+    create_user_ai_service,
+    create_user_ai_service_with_mcp,
+    get_user_ai_service_version,
+    get_cached_user_ai_service,
+    cache_user_ai_service,
+    invalidate_user_ai_service,
+)
 
 logger = get_logger(__name__)
 
@@ -58,11 +66,30 @@ async def get_user_ai_service(
     从数据库读取用户设置并创建对应的AI服务。
     自动传递 user_id 和 db_session，使得 AIService 能够加载用户配置的MCP工具。
     根据用户的所有MCP插件状态决定是否启用MCP：如果有启用的插件则启用，否则禁用。
+    
+    实例按用户缓存（设置或MCP插件变更时失效），命中时不查询数据库，
+    并复用已建立的客户端连接；每次返回的都是绑定当前会话的独立副本。
+    """
+    return await load_user_ai_service(user.user_id, db)
+
+
+async def load_user_ai_service(user_id: str, db: AsyncSession) -> AIService:
+    """
+    按用户ID加载AI服务实例（不依赖请求上下文，供后台任务队列worker使用）
+    
+    Args:
+        user_id: 用户ID
+        db: AI服务绑定的数据库会话（用于加载MCP工具），调用方负责其生命周期
     """
     from app.models.mcp_plugin import MCPPlugin
     
+    cached_service = get_cached_user_ai_service(user_id, db)
+    if cached_service is not None:
+        return cached_service
+    version = get_user_ai_service_version(user_id)
+    
     result = await db.execute(
-        select(Settings).where(Settings.user_id == user.user_id)
+        select(Settings).where(Settings.user_id == user_id)
     )
     settings = result.scalar_one_or_none()
     
@@ -70,17 +97,17 @@ async def get_user_ai_service(
         # 如果用户没有设置，从.env读取并保存
         env_defaults = read_env_defaults()
         settings = Settings(
-            user_id=user.user_id,
+            user_id=user_id,
             **env_defaults
         )
         db.add(settings)
         await db.commit()
         await db.refresh(settings)
-        logger.info(f"用户 {user.user_id} 首次使用AI服务，已从.env同步设置到数据库")
+        logger.info(f"用户 {user_id} 首次使用AI服务，已从.env同步设置到数据库")
     
     # 查询用户的所有MCP插件状态
     mcp_result = await db.execute(
-        select(MCPPlugin).where(MCPPlugin.user_id == user.user_id)
+        select(MCPPlugin).where(MCPPlugin.user_id == user_id)
     )
     mcp_plugins = mcp_result.scalars().all()
     
@@ -89,24 +116,26 @@ async def get_user_ai_service(
     
     if mcp_plugins:
         enabled_count = sum(1 for p in mcp_plugins if p.enabled)
-        logger.info(f"用户 {user.user_id} 有 {len(mcp_plugins)} 个MCP插件，{enabled_count} 个启用，{enable_mcp} 决定使用MCP")
+        logger.info(f"用户 {user_id} 有 {len(mcp_plugins)} 个MCP插件，{enabled_count} 个启用，{enable_mcp} 决定使用MCP")
     else:
-        logger.debug(f"用户 {user.user_id} 没有配置MCP插件，禁用MCP")
+        logger.debug(f"用户 {user_id} 没有配置MCP插件，禁用MCP")
     
     # ✅ 使用支持MCP的工厂函数创建AI服务实例
     # 传递 user_id 和 db_session，使得 AIService 能够自动加载用户配置的MCP工具
-    return create_user_ai_service_with_mcp(
+    ai_service = create_user_ai_service_with_mcp(
         api_provider=settings.api_provider,
         api_key=settings.api_key,
         api_base_url=settings.api_base_url or "",
         model_name=settings.llm_model,
         temperature=settings.temperature,
         max_tokens=settings.max_tokens,
-        user_id=user.user_id,          # ✅ 传递 user_id
+        user_id=user_id,               # ✅ 传递 user_id
         db_session=db,                 # ✅ 传递 db_session
         system_prompt=settings.system_prompt,
         enable_mcp=enable_mcp,         # 根据MCP插件状态动态决定
     )
+    cache_user_ai_service(user_id, version, ai_service)
+    return ai_service
 
 
 @router.get("", response_model=SettingsResponse)
@@ -202,6 +231,7 @@ async def save_settings(
         
         await db.commit()
         await db.refresh(settings)
+        invalidate_user_ai_service(user.user_id)
         logger.info(f"用户 {user.user_id} 更新设置")
     else:
         # 创建新设置
@@ -212,6 +242,7 @@ async def save_settings(
         db.add(settings)
         await db.commit()
         await db.refresh(settings)
+        invalidate_user_ai_service(user.user_id)
         logger.info(f"用户 {user.user_id} 创建设置")
     
     return settings
@@ -242,6 +273,7 @@ async def update_settings(
     
     await db.commit()
     await db.refresh(settings)
+    invalidate_user_ai_service(user.user_id)
     logger.info(f"用户 {user.user_id} 更新设置")
     
     return settings
@@ -265,6 +297,7 @@ async def delete_settings(
     
     await db.delete(settings)
     await db.commit()
+    invalidate_user_ai_service(user.user_id)
     logger.info(f"用户 {user.user_id} 删除设置")
     
     return {"message": "设置已删除", "user_id": user.user_id}
@@ -1017,6 +1050,7 @@ async def activate_preset(
     settings.preferences = json.dumps(prefs, ensure_ascii=False)
     
     await db.commit()
+    invalidate_user_ai_service(user.user_id)
     
     logger.info(f"用户 {user.user_id} 激活预设: {target_preset['name']}")
     return {
@@ -167,6 +167,7 @@ async def reset_user_password(
             target_user.username,
             data.new_password
         )
+        user_manager.invalidate_user(target_user.user_id)
         
         # 如果使用了默认密码，返回密码供管理员告知用户
         message = "密码重置成功"
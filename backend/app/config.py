@@ -78,6 +78,38 @@ class Settings(BaseSettings):
     default_temperature: float = 0.7
     default_max_tokens: int = 32000
     
+    # AI请求限流（按 提供商+地址+密钥 独立计算，排队请求按用户轮转）
+    ai_max_concurrent_requests: int = 5  # 每个密钥的最大并发请求数（收到429时自动降低，成功后逐步恢复）
+    ai_requests_per_minute: int = 0  # 每个密钥每分钟请求数上限，0表示不限制
+    ai_tokens_per_minute: int = 0  # 每个密钥每分钟令牌数上限，0表示不限制
+    
+    # 向量记忆（Embedding）配置
+    embedding_executor_workers: int = 2  # Embedding推理专用线程池大小（推理不在事件循环中执行）
+    embedding_batch_size: int = 32  # 批量编码时每次前向推理的文本数
+    embedding_query_cache_size: int = 1024  # 查询向量LRU缓存条数（0表示禁用）
+    embedding_preload: bool = True  # 启动后在后台预热Embedding模型（False则首次使用时加载）
+    embedding_backend: str = "torch"  # Embedding推理后端：torch / onnx / openvino（后两者需安装 optimum）
+    embedding_model_file: Optional[str] = None  # 非torch后端使用的模型文件（相对模型目录），如 onnx/model_qint8_avx2.onnx
+    
+    # 用户AI服务缓存（设置/MCP插件变更时立即失效；多进程部署时其他进程最多延迟一个有效期）
+    ai_service_cache_ttl: int = 300  # 用户AI服务实例缓存有效期（秒），0表示禁用
+    ai_service_cache_size: int = 512  # 最多缓存的用户数（LRU淘汰）
+    
+    # 批量AI去味
+    polish_batch_max_concurrency: int = 4  # 批量去味的最大并发数（同时受AI请求限流约束）
+    
+    # 批量大纲展开
+    outline_expand_max_concurrency: int = 3  # 同时展开的大纲数上限（同时受AI请求限流约束）
+    
+    # 后台任务队列（批量生成、章节分析）
+    job_worker_embedded: bool = True  # Web进程内是否运行worker（独立部署worker时可关闭）
+    job_worker_concurrency: int = 4  # 单个worker同时执行的任务数
+    job_max_running_per_user: int = 2  # 每个用户同时执行的任务数上限（跨所有worker）
+    job_poll_interval: float = 2.0  # 空闲时轮询队列的间隔（秒）
+    job_lease_seconds: int = 60  # 任务租约时长（秒），worker失联超过该时长后任务被重新领取
+    job_heartbeat_interval: int = 15  # 心跳续约间隔（秒）
+    job_max_attempts: int = 3  # 任务最大领取次数（含因worker中断的重新执行）
+    
     # MCP配置
     mcp_max_rounds: int = 3  # MCP工具调用最大轮数（全局统一控制）
     
@@ -106,6 +138,8 @@ class Settings(BaseSettings):
     # 会话配置
     SESSION_EXPIRE_MINUTES: int = 120  # 会话过期时间（分钟），默认2小时
     SESSION_REFRESH_THRESHOLD_MINUTES: int = 30  # 会话刷新阈值（分钟），剩余时间少于此值时可刷新
+    USER_CACHE_TTL_SECONDS: int = 60  # 认证用户信息缓存有效期（秒），0表示禁用缓存
+    USER_CACHE_MAX_SIZE: int = 2048  # 认证用户信息缓存最大条数（LRU淘汰）
     
     # 提示词工坊配置
     WORKSHOP_MODE: str = "client"  # client: 本地部署实例, server: 云端中央服务器
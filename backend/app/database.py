@@ -1,6 +1,7 @@
 """数据库连接和会话管理 - PostgreSQL 多用户数据隔离"""
 import asyncio
-from typing import Dict, Any
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator
 from datetime import datetime
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
@@ -27,6 +28,9 @@ from app.models import (
 # 引擎缓存：每个用户一个引擎
 _engine_cache: Dict[str, Any] = {}
 
+# 会话工厂缓存：每个引擎一个 async_sessionmaker（避免每次获取会话都重新构建工厂）
+_session_factory_cache: Dict[Any, async_sessionmaker] = {}
+
 # 锁管理：用于保护引擎创建过程
 _engine_locks: Dict[str, asyncio.Lock] = {}
 _cache_lock = asyncio.Lock()
@@ -142,6 +146,44 @@ async def get_engine(user_id: str):
         return _engine_cache[cache_key]
 
 
+async def get_session_factory(user_id: str) -> async_sessionmaker:
+    """获取引擎对应的会话工厂（按引擎缓存，全局复用）
+    
+    Args:
+        user_id: 用户ID（用于定位引擎）
+        
+    Returns:
+        async_sessionmaker: 会话工厂（expire_on_commit=False）
+    """
+    engine = await get_engine(user_id)
+    factory = _session_factory_cache.get(engine)
+    if factory is None:
+        factory = async_sessionmaker(
+            engine,
+            class_=AsyncSession,
+            expire_on_commit=False
+        )
+        _session_factory_cache[engine] = factory
+    return factory
+
+
+@asynccontextmanager
+async def background_session(user_id: str) -> AsyncIterator[AsyncSession]:
+    """后台任务使用的独立数据库会话
+    
+    用于不在请求生命周期内的任务（后台分析、批量生成、MCP状态同步等），
+    退出时自动关闭会话（未提交的事务随之回滚）。
+    
+    用法:
+        async with background_session(user_id) as db:
+            ...
+            await db.commit()
+    """
+    factory = await get_session_factory(user_id)
+    async with factory() as session:
+        yield session
+
+
 async def get_db(request: Request):
     """获取数据库会话的依赖函数
     
@@ -152,13 +194,7 @@ async def get_db(request: Request):
     if not user_id:
         raise HTTPException(status_code=401, detail="未登录或用户ID缺失")
     
-    engine = await get_engine(user_id)
-    
-    AsyncSessionLocal = async_sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False
-    )
+    AsyncSessionLocal = await get_session_factory(user_id)
     
     session = AsyncSessionLocal()
     session_id = id(session)
@@ -252,6 +288,7 @@ async def close_db():
             await engine.dispose()
             logger.info(f"用户 {user_id} 的数据库连接已关闭")
         _engine_cache.clear()
+        _session_factory_cache.clear()
         logger.info("所有数据库连接已关闭")
     except Exception as e:
         logger.error(f"关闭数据库连接失败: {str(e)}", exc_info=True)
@@ -378,13 +415,7 @@ async def check_database_health(user_id: str = None) -> dict:
             engine = _engine_cache[cache_key]
         
         # 测试数据库连接
-        AsyncSessionLocal = async_sessionmaker(
-            engine,
-            class_=AsyncSession,
-            expire_on_commit=False
-        )
-        
-        async with AsyncSessionLocal() as session:
+        async with AsyncSession(engine) as session:
             # 执行简单查询测试连接
             await session.execute(text("SELECT 1"))
             result["checks"]["connection"] = {"status": "ok", "healthy": True}
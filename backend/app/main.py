@@ -5,6 +5,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse, FileResponse
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
+import asyncio
 from pathlib import Path
 
 from app.config import settings as config_settings
@@ -30,10 +31,27 @@ async def lifespan(app: FastAPI):
     # 注册MCP状态同步服务
     register_status_sync()
     
+    # 后台预热Embedding模型（不阻塞启动，/health 可立即响应）
+    from app.services.memory_service import memory_service
+    if config_settings.embedding_preload:
+        app.state.embedding_warmup_task = asyncio.create_task(memory_service.warmup())
+    
+    # 进程内任务队列worker（独立部署worker时可通过 JOB_WORKER_EMBEDDED=false 关闭）
+    job_worker = None
+    if config_settings.job_worker_embedded:
+        from app.services.job_queue import JobWorker
+        job_worker = JobWorker()
+        app.state.job_worker_task = asyncio.create_task(job_worker.run())
+    
     logger.info("应用启动完成")
     
     yield
     
+    # 停止任务队列worker，执行中的任务归还队列，重启后继续执行
+    if job_worker:
+        await job_worker.stop()
+        await app.state.job_worker_task
+    
     # 清理MCP插件
     await mcp_client.cleanup()
     
@@ -41,6 +59,9 @@ async def lifespan(app: FastAPI):
     from app.services.ai_service import cleanup_http_clients
     await cleanup_http_clients()
     
+    # 关闭Embedding线程池
+    memory_service.shutdown_executor()
+    
     # 关闭数据库连接
     await close_db()
     
@@ -125,6 +146,93 @@ async def db_session_stats():
     }
 
 
+@app.get("/health/ready")
+async def readiness_check():
+    """
+    就绪检查（包含Embedding模型加载状态）
+    
+    Embedding模型在后台加载，加载完成前记忆相关功能会在首次调用时等待模型就绪。
+    """
+    from app.services.memory_service import memory_service
+    model_status = memory_service.get_model_status()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if model_status["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if model_status["ready"] else "not_ready",
+            "embedding_model": model_status
+        }
+    )
+
+
+@app.get("/health/embedding")
+async def embedding_stats():
+    """
+    Embedding执行器统计（监控向量推理排队与耗时）
+    
+    返回：
+    - queued: 排队等待推理的任务数
+    - running: 正在推理的任务数
+    - avg_encode_seconds / max_encode_seconds: 推理耗时
+    - avg_wait_seconds: 平均排队等待时间
+    """
+    from app.services.memory_service import memory_service
+    return {
+        "status": "ok",
+        "embedding_stats": memory_service.get_embedding_stats()
+    }
+
+
+@app.get("/health/user-cache")
+async def user_cache_stats():
+    """
+    认证用户缓存统计
+    
+    返回：
+    - size / max_size: 当前/最大缓存条数
+    - ttl_seconds: 缓存有效期
+    - hits / misses / hit_rate: 命中情况（未命中时才查询数据库）
+    """
+    from app.user_manager import user_manager
+    return {
+        "status": "ok",
+        "user_cache": user_manager.get_cache_stats()
+    }
+
+
+@app.get("/health/ai-limiter")
+async def ai_limiter_stats():
+    """
+    AI请求限流器统计（每个 提供商+地址+密钥 一项）
+    
+    返回：
+    - concurrency_limit / max_concurrency: 当前（AIMD调整后）/最大并发上限
+    - in_flight / queued / queued_users: 进行中、排队中的请求数及排队用户数
+    - paused_seconds: 因429暂停派发的剩余秒数
+    - throttled: 收到限流响应的次数
+    - avg_wait_ms / max_wait_ms: 请求排队等待时间
+    """
+    from app.services.ai_clients.rate_limiter import get_limiter_stats
+    return {
+        "status": "ok",
+        "limiters": get_limiter_stats()
+    }
+
+
+@app.get("/health/job-queue")
+async def job_queue_stats():
+    """
+    后台任务队列统计
+    
+    返回：
+    - jobs: 各状态（queued/running/completed/failed）的任务数
+    """
+    from app.services.job_queue import get_queue_stats
+    return {
+        "status": "ok",
+        "jobs": await get_queue_stats()
+    }
+
+
 from app.api import (
     projects, outlines, characters, chapters,
     wizard_stream, relationships, organizations,
@@ -6,7 +6,6 @@
 import asyncio
 from typing import Dict, Any
 from sqlalchemy import update
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.models.mcp_plugin import MCPPlugin
 from app.logger import get_logger
@@ -44,12 +43,9 @@ async def _do_sync_status(event: Dict[str, Any]):
     reason = event.get("reason", "")
 
     try:
-        from app.database import get_engine
+        from app.database import background_session
 
-        engine = await get_engine(user_id)
-        AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-        async with AsyncSessionLocal() as db:
+        async with background_session(user_id) as db:
             stmt = (
                 update(MCPPlugin)
                 .where(MCPPlugin.user_id == user_id, MCPPlugin.plugin_name == plugin_name)
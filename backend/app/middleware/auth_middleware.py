@@ -2,20 +2,44 @@
 认证中间件 - 从 Cookie 中提取用户信息并注入到 request.state
 支持来自其他实例的代理请求（提示词工坊功能）
 """
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Receive, Scope, Send
 from app.user_manager import user_manager
+from app.services.ai_clients.rate_limiter import set_current_user_id, reset_current_user_id
 from app.logger import get_logger
 
 logger = get_logger(__name__)
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    """认证中间件"""
+class AuthMiddleware:
+    """
+    认证中间件（纯ASGI实现）
     
-    async def dispatch(self, request: Request, call_next):
+    只在请求进入时写入 request.state，不包装 receive/send，
+    因此不会影响 StreamingResponse/SSE 的流式输出。
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request = HTTPConnection(scope)
+        await self._authenticate(request)
+        
+        # 记录当前用户，AI请求限流器据此在用户间公平排队（后台任务随上下文继承）
+        token = set_current_user_id(request.state.user_id)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_current_user_id(token)
+    
+    async def _authenticate(self, request: HTTPConnection) -> None:
         """
-        处理请求，从 Cookie 或 Header 中提取用户 ID 并注入到 request.state
+        从 Cookie 或 Header 中提取用户 ID 并注入到 request.state
         
         对于提示词工坊相关的代理请求（带有 X-Instance-ID Header），
         从 Header 中读取用户标识而不是 Cookie。
@@ -50,6 +74,7 @@ class AuthMiddleware(BaseHTTPMiddleware):
             user_id = request.cookies.get("user_id")
             
             if user_id:
+                # get_user 带TTL+LRU缓存，热路径上通常不访问数据库
                 user = await user_manager.get_user(user_id)
                 if user:
                     # 检查用户是否被禁用 (trust_level = -1)
@@ -74,7 +99,3 @@ class AuthMiddleware(BaseHTTPMiddleware):
                 request.state.user_id = None
                 request.state.user = None
                 request.state.is_admin = False
-        
-        # 继续处理请求
-        response = await call_next(request)
-        return response
\ No newline at end of file
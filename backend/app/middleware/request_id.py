@@ -1,65 +1,75 @@
 """请求追踪ID中间件"""
 import uuid
 import logging
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-from typing import Callable
+from contextvars import ContextVar
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
+# 当前请求的追踪ID（按请求上下文隔离，并发请求互不影响）
+_request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    """获取当前请求的追踪ID（不在请求上下文中时返回None）"""
+    return _request_id_var.get()
+
+
+class RequestIDMiddleware:
     """
-    请求追踪ID中间件
+    请求追踪ID中间件（纯ASGI实现）
     
-    为每个请求生成唯一ID，并添加到日志上下文中
+    为每个请求生成唯一ID，并添加到日志上下文中。
+    直接包装 ASGI 调用，不像 BaseHTTPMiddleware 那样为每个请求创建额外的任务和
+    内存流，StreamingResponse/SSE 的数据块原样透传。
     """
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        _install_log_filter()
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         处理请求，添加追踪ID
         
         Args:
-            request: 请求对象
-            call_next: 下一个处理器
-            
-        Returns:
-            响应对象
+            scope: ASGI连接信息
+            receive: 接收消息的可调用对象
+            send: 发送消息的可调用对象
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         # 从请求头获取追踪ID，或生成新的
-        request_id = request.headers.get('X-Request-ID') or str(uuid.uuid4())
+        request_id = Headers(scope=scope).get('X-Request-ID') or str(uuid.uuid4())
         
         # 将请求ID存储到request.state中，方便后续访问
-        request.state.request_id = request_id
+        scope.setdefault("state", {})["request_id"] = request_id
         
-        # 创建日志过滤器，自动添加request_id到日志记录
-        log_filter = RequestIDFilter(request_id)
-        
-        # 获取根日志器并添加过滤器
-        root_logger = logging.getLogger()
-        root_logger.addFilter(log_filter)
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # 将请求ID添加到响应头
+                MutableHeaders(scope=message)['X-Request-ID'] = request_id
+            await send(message)
         
+        token = _request_id_var.set(request_id)
         try:
-            # 处理请求
-            response = await call_next(request)
-            
-            # 将请求ID添加到响应头
-            response.headers['X-Request-ID'] = request_id
-            
-            return response
+            await self.app(scope, receive, send_with_request_id)
         finally:
-            # 移除过滤器，避免影响其他请求
-            root_logger.removeFilter(log_filter)
+            _request_id_var.reset(token)
 
 
 class RequestIDFilter(logging.Filter):
     """日志过滤器，为日志记录添加request_id属性"""
     
-    def __init__(self, request_id: str):
+    def __init__(self, request_id: Optional[str] = None):
         """
         初始化过滤器
         
         Args:
-            request_id: 请求追踪ID
+            request_id: 固定的请求追踪ID；为None时读取当前请求上下文中的ID
         """
         super().__init__()
         self.request_id = request_id
@@ -70,9 +80,23 @@ class RequestIDFilter(logging.Filter):
         
         Args:
             record: 日志记录
-            
+        
         Returns:
             True（不过滤任何日志）
         """
-        record.request_id = self.request_id
-        return True
\ No newline at end of file
+        request_id = self.request_id or _request_id_var.get()
+        if request_id:
+            record.request_id = request_id
+        return True
+
+
+_log_filter_installed = False
+
+
+def _install_log_filter() -> None:
+    """在根日志器上安装一次上下文过滤器（代替每个请求添加/移除过滤器）"""
+    global _log_filter_installed
+    if _log_filter_installed:
+        return
+    logging.getLogger().addFilter(RequestIDFilter())
+    _log_filter_installed = True
@@ -1,5 +1,5 @@
 """章节数据模型"""
-from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.database import Base
 import uuid
@@ -28,5 +28,10 @@ class Chapter(Base):
     created_at = Column(DateTime, server_default=func.now(), comment="创建时间")
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment="更新时间")
     
+    __table_args__ = (
+        Index('idx_chapters_project_number', 'project_id', 'chapter_number'),
+        Index('idx_chapters_project_outline_sub', 'project_id', 'outline_id', 'sub_index'),
+    )
+    
     def __repr__(self):
         return f"<Chapter(id={self.id}, chapter_number={self.chapter_number}, title={self.title}, outline_id={self.outline_id})>"
\ No newline at end of file
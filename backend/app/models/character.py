@@ -1,5 +1,5 @@
 """角色数据模型"""
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Boolean, Integer
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Boolean, Integer, Index
 from sqlalchemy.sql import func
 from app.database import Base
 import uuid
@@ -44,6 +44,10 @@ class Character(Base):
     created_at = Column(DateTime, server_default=func.now(), comment="创建时间")
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment="更新时间")
     
+    __table_args__ = (
+        Index('idx_characters_project_created', 'project_id', 'created_at'),
+    )
+    
     def __repr__(self):
         entity_type = "组织" if self.is_organization else "角色"
         return f"<Character(id={self.id}, name={self.name}, type={entity_type})>"
\ No newline at end of file
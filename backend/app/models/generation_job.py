@@ -0,0 +1,49 @@
+"""后台生成任务队列模型"""
+from sqlalchemy import Column, String, Text, Integer, DateTime, JSON, Index
+from sqlalchemy.sql import func
+from app.database import Base
+import uuid
+
+
+class GenerationJob(Base):
+    """
+    后台任务队列表 - 持久化批量生成/章节分析等长任务，进程重启后可由任意worker继续执行
+
+    状态流转: queued -> running -> completed/failed
+    worker 领取任务后持有租约（lease_expires_at），执行期间定期心跳续约；
+    租约过期（worker崩溃/重启）的任务重新入队，由其他worker接手。
+    """
+    __tablename__ = "generation_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()), comment="队列任务ID")
+    job_type = Column(String(50), nullable=False, comment="任务类型: batch_generation/chapter_analysis")
+    user_id = Column(String(100), nullable=False, comment="用户ID")
+    project_id = Column(String(36), nullable=True, comment="项目ID")
+    task_id = Column(String(36), nullable=False, comment="关联的业务任务ID（BatchGenerationTask/AnalysisTask）")
+    payload = Column(JSON, nullable=True, comment="执行参数")
+
+    # 队列状态
+    status = Column(String(20), nullable=False, default="queued", comment="状态: queued/running/completed/failed")
+    attempts = Column(Integer, nullable=False, default=0, comment="已领取次数")
+    max_attempts = Column(Integer, nullable=False, default=3, comment="最大领取次数")
+    available_at = Column(DateTime, nullable=False, server_default=func.now(), comment="最早可执行时间（失败重试退避）")
+
+    # 租约
+    worker_id = Column(String(100), nullable=True, comment="持有租约的worker")
+    lease_expires_at = Column(DateTime, nullable=True, comment="租约到期时间")
+    heartbeat_at = Column(DateTime, nullable=True, comment="最近心跳时间")
+
+    # 时间与错误
+    created_at = Column(DateTime, server_default=func.now(), comment="创建时间")
+    started_at = Column(DateTime, nullable=True, comment="最近一次开始执行时间")
+    finished_at = Column(DateTime, nullable=True, comment="结束时间")
+    error_message = Column(Text, nullable=True, comment="错误信息")
+
+    __table_args__ = (
+        Index('idx_generation_jobs_status_available', 'status', 'available_at'),
+        Index('idx_generation_jobs_user_status', 'user_id', 'status'),
+        Index('idx_generation_jobs_task', 'task_id'),
+    )
+
+    def __repr__(self):
+        return f"<GenerationJob(id={self.id[:8]}..., type={self.job_type}, status={self.status}, attempts={self.attempts})>"
@@ -1,5 +1,5 @@
 """大纲数据模型"""
-from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.database import Base
 import uuid
@@ -18,5 +18,9 @@ class Outline(Base):
     created_at = Column(DateTime, server_default=func.now(), comment="创建时间")
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment="更新时间")
     
+    __table_args__ = (
+        Index('idx_outlines_project_order', 'project_id', 'order_index'),
+    )
+    
     def __repr__(self):
         return f"<Outline(id={self.id}, title={self.title})>"
\ No newline at end of file
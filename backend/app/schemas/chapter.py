@@ -67,6 +67,41 @@ class ChapterListResponse(BaseModel):
     items: list[ChapterResponse]
 
 
+class ChapterListItem(BaseModel):
+    """章节列表项（轻量列表，只包含请求的字段）"""
+    id: str
+    project_id: Optional[str] = None
+    title: Optional[str] = None
+    chapter_number: Optional[int] = None
+    content: Optional[str] = None
+    summary: Optional[str] = None
+    word_count: Optional[int] = None
+    status: Optional[str] = None
+    outline_id: Optional[str] = None
+    sub_index: Optional[int] = None
+    expansion_plan: Optional[str] = None
+    outline_title: Optional[str] = None
+    outline_order: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class ChapterPageResponse(BaseModel):
+    """章节轻量列表分页响应模型（基于 (chapter_number, id) 的游标分页）"""
+    total: int
+    items: list[ChapterListItem]
+    next_cursor: Optional[str] = Field(None, description="下一页游标（格式 章节序号:章节ID，传给after参数），无更多数据时为空")
+
+
+class ChapterContentResponse(BaseModel):
+    """章节正文响应模型"""
+    id: str
+    chapter_number: int
+    content: Optional[str] = None
+    word_count: int = 0
+    expansion_plan: Optional[str] = None
+
+
 class ChapterGenerateRequest(BaseModel):
     """AI生成章节内容的请求模型"""
     style_id: Optional[int] = Field(None, description="写作风格ID，不提供则不使用任何风格")
@@ -93,6 +128,10 @@ class BatchGenerateRequest(BaseModel):
         le=10000
     )
     enable_analysis: bool = Field(False, description="是否启用同步分析")
+    pipeline_analysis: bool = Field(
+        False,
+        description="启用同步分析时，分析第N章与生成第N+1章并行执行（后续章节可用的记忆/伏笔/职业信息最多滞后一章）"
+    )
     enable_mcp: bool = Field(True, description="是否启用MCP工具增强（搜索参考资料）")
     max_retries: int = Field(3, description="每个章节的最大重试次数", ge=0, le=5)
     model: Optional[str] = Field(None, description="指定使用的AI模型，不提供则使用用户默认模型")
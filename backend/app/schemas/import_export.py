@@ -1,6 +1,6 @@
 """导入导出相关的Pydantic模型"""
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 
 
@@ -11,6 +11,7 @@ class ExportOptions(BaseModel):
     include_careers: bool = Field(True, description="是否包含职业系统")
     include_memories: bool = Field(False, description="是否包含故事记忆（数据量可能较大）")
     include_plot_analysis: bool = Field(False, description="是否包含剧情分析")
+    format: Literal["json", "ndjson"] = Field("json", description="导出格式：json（单个文档）或 ndjson（逐行流式，适合大项目）")
 
 
 class ChapterExportData(BaseModel):
@@ -1,6 +1,6 @@
 """AI去味相关的Pydantic模型"""
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Literal, Optional
 
 
 class PolishRequest(BaseModel):
@@ -17,4 +17,14 @@ class PolishResponse(BaseModel):
     original_text: str = Field(..., description="原始文本")
     polished_text: str = Field(..., description="去味后的文本")
     word_count_before: int = Field(..., description="处理前字数")
-    word_count_after: int = Field(..., description="处理后字数")
\ No newline at end of file
+    word_count_after: int = Field(..., description="处理后字数")
+
+
+class PolishBatchRequest(BaseModel):
+    """批量AI去味请求模型"""
+    texts: List[str] = Field(..., min_length=1, description="待处理的文本列表")
+    provider: Optional[str] = Field(None, description="AI提供商")
+    model: Optional[str] = Field(None, description="AI模型")
+    temperature: Optional[float] = Field(0.8, description="温度参数，建议0.7-0.9")
+    concurrency: Optional[int] = Field(None, ge=1, description="并发数（不超过服务端上限，默认使用服务端上限）")
+    order: Literal["input", "completion"] = Field("completion", description="流式结果的返回顺序：input 按输入顺序，completion 按完成顺序")
@@ -1,23 +1,54 @@
 """Anthropic 客户端"""
-from typing import Any, AsyncGenerator, Dict, Optional
+from typing import Any, AsyncGenerator, Dict, Optional, Tuple
 
+import httpx
 from anthropic import AsyncAnthropic
 
 from app.logger import get_logger
 from app.services.ai_config import AIClientConfig, default_config
+from app.services.ai_clients.base_client import build_timeout, get_pooled_http_client, make_client_key
+from app.services.ai_clients.rate_limiter import estimate_tokens, get_limiter
 
 logger = get_logger(__name__)
 
+# Anthropic SDK 客户端池（底层 HTTP 客户端来自全局 HTTP 客户端池，由 cleanup_all_clients 统一关闭）
+_anthropic_client_pool: Dict[str, Tuple[httpx.AsyncClient, AsyncAnthropic]] = {}
+
+
+def _get_or_create_sdk_client(api_key: str, base_url: Optional[str], config: AIClientConfig) -> AsyncAnthropic:
+    """获取或创建池化的 AsyncAnthropic 客户端"""
+    client_key = make_client_key("AnthropicClient", base_url or "", api_key)
+    http_client = get_pooled_http_client(client_key, config)
+
+    # HTTP 客户端被关闭重建后，SDK 客户端也需要重建
+    entry = _anthropic_client_pool.get(client_key)
+    if entry is not None and entry[0] is http_client:
+        return entry[1]
+
+    kwargs = {
+        "api_key": api_key,
+        "http_client": http_client,
+        "timeout": build_timeout(config),
+    }
+    if base_url:
+        kwargs["base_url"] = base_url
+    client = AsyncAnthropic(**kwargs)
+    _anthropic_client_pool[client_key] = (http_client, client)
+    return client
+
+
+def clear_anthropic_client_pool():
+    """清空 Anthropic SDK 客户端池（底层 HTTP 客户端由 cleanup_all_clients 关闭）"""
+    _anthropic_client_pool.clear()
+
 
 class AnthropicClient:
     """Anthropic API 客户端"""
 
     def __init__(self, api_key: str, base_url: Optional[str] = None, config: Optional[AIClientConfig] = None):
         self.config = config or default_config
-        kwargs = {"api_key": api_key}
-        if base_url:
-            kwargs["base_url"] = base_url
-        self.client = AsyncAnthropic(**kwargs)
+        self.client = _get_or_create_sdk_client(api_key, base_url, self.config)
+        self.limiter = get_limiter(make_client_key("AnthropicClient", base_url or "", api_key), self.config.rate_limit)
 
     async def chat_completion(
         self,
@@ -44,7 +75,8 @@ class AnthropicClient:
             elif tool_choice == "auto":
                 kwargs["tool_choice"] = {"type": "auto"}
 
-        response = await self.client.messages.create(**kwargs)
+        async with self.limiter.slot(estimate_tokens(messages, max_tokens, system_prompt)):
+            response = await self.client.messages.create(**kwargs)
 
         tool_calls = []
         content = ""
@@ -98,10 +130,13 @@ class AnthropicClient:
             elif tool_choice == "auto":
                 kwargs["tool_choice"] = {"type": "auto"}
 
+        tool_calls = []
+        stop_reason = None
+        
         try:
-            async with self.client.messages.stream(**kwargs) as stream:
+            tokens = estimate_tokens(messages, max_tokens, system_prompt)
+            async with self.limiter.slot(tokens), self.client.messages.stream(**kwargs) as stream:
                 try:
-                    tool_calls = []
                     async for chunk in stream:
                         # 处理不同类型的块
                         if chunk.type == "text_delta":
@@ -124,9 +159,7 @@ class AnthropicClient:
                         elif chunk.type == "message_delta":
                             if chunk.stop_reason:
                                 # 流结束
-                                if tool_calls:
-                                    yield {"tool_calls": tool_calls}
-                                yield {"done": True, "finish_reason": chunk.stop_reason}
+                                stop_reason = chunk.stop_reason
                 except GeneratorExit:
                     # 生成器被关闭，这是正常的清理过程
                     logger.debug("Anthropic 流式响应生成器被关闭(GeneratorExit)")
@@ -134,6 +167,12 @@ class AnthropicClient:
                 except Exception as iter_error:
                     logger.error(f"Anthropic 流式响应迭代出错: {str(iter_error)}")
                     raise
+            
+            # 流结束后（已归还限流额度）再交出工具调用，调用方随后发起的下一轮请求不会与本轮互相等待
+            if stop_reason:
+                if tool_calls:
+                    yield {"tool_calls": tool_calls}
+                yield {"done": True, "finish_reason": stop_reason}
         except GeneratorExit:
             # 重新抛出GeneratorExit，让调用方处理
             raise
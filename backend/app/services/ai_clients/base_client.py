@@ -2,26 +2,59 @@
 import asyncio
 import hashlib
 from abc import ABC, abstractmethod
-from typing import Any, AsyncGenerator, Dict, Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, Optional
 
 import httpx
 
 from app.logger import get_logger
 from app.services.ai_config import AIClientConfig, default_config
+from app.services.ai_clients.rate_limiter import estimate_tokens, get_limiter
 
 logger = get_logger(__name__)
 
 # 全局 HTTP 客户端池
 _http_client_pool: Dict[str, httpx.AsyncClient] = {}
-_global_semaphore: Optional[asyncio.Semaphore] = None
 
 
-def _get_semaphore(max_concurrent: int) -> asyncio.Semaphore:
-    """获取全局信号量"""
-    global _global_semaphore
-    if _global_semaphore is None:
-        _global_semaphore = asyncio.Semaphore(max_concurrent)
-    return _global_semaphore
+def build_timeout(config: AIClientConfig) -> httpx.Timeout:
+    """根据配置构建超时设置"""
+    http_cfg = config.http
+    return httpx.Timeout(
+        connect=http_cfg.connect_timeout,
+        read=http_cfg.read_timeout,
+        write=http_cfg.write_timeout,
+        pool=http_cfg.pool_timeout,
+    )
+
+
+def make_client_key(client_name: str, base_url: str, api_key: str) -> str:
+    """生成客户端唯一键（提供商 + 地址 + 密钥摘要）"""
+    key_hash = hashlib.md5(api_key.encode()).hexdigest()[:8]
+    return f"{client_name}_{base_url}_{key_hash}"
+
+
+def get_pooled_http_client(client_key: str, config: Optional[AIClientConfig] = None) -> httpx.AsyncClient:
+    """从全局池获取或创建 HTTP 客户端（同一键复用连接池与TLS连接）"""
+    if client_key in _http_client_pool:
+        client = _http_client_pool[client_key]
+        if not client.is_closed:
+            return client
+        del _http_client_pool[client_key]
+
+    config = config or default_config
+    http_cfg = config.http
+    client = httpx.AsyncClient(
+        timeout=build_timeout(config),
+        limits=httpx.Limits(
+            max_keepalive_connections=http_cfg.max_keepalive_connections,
+            max_connections=http_cfg.max_connections,
+            keepalive_expiry=http_cfg.keepalive_expiry,
+        ),
+    )
+    _http_client_pool[client_key] = client
+    logger.info(f"✅ 创建 HTTP 客户端: {client_key}")
+    return client
 
 
 class BaseAIClient(ABC):
@@ -37,39 +70,15 @@ class BaseAIClient(ABC):
         self.base_url = base_url.rstrip("/")
         self.config = config or default_config
         self.http_client = self._get_or_create_client()
+        self.limiter = get_limiter(self._get_client_key(), self.config.rate_limit)
 
     def _get_client_key(self) -> str:
         """生成客户端唯一键"""
-        key_hash = hashlib.md5(self.api_key.encode()).hexdigest()[:8]
-        return f"{self.__class__.__name__}_{self.base_url}_{key_hash}"
+        return make_client_key(self.__class__.__name__, self.base_url, self.api_key)
 
     def _get_or_create_client(self) -> httpx.AsyncClient:
         """获取或创建 HTTP 客户端"""
-        client_key = self._get_client_key()
-
-        if client_key in _http_client_pool:
-            client = _http_client_pool[client_key]
-            if not client.is_closed:
-                return client
-            del _http_client_pool[client_key]
-
-        http_cfg = self.config.http
-        client = httpx.AsyncClient(
-            timeout=httpx.Timeout(
-                connect=http_cfg.connect_timeout,
-                read=http_cfg.read_timeout,
-                write=http_cfg.write_timeout,
-                pool=http_cfg.pool_timeout,
-            ),
-            limits=httpx.Limits(
-                max_keepalive_connections=http_cfg.max_keepalive_connections,
-                max_connections=http_cfg.max_connections,
-                keepalive_expiry=http_cfg.keepalive_expiry,
-            ),
-        )
-        _http_client_pool[client_key] = client
-        logger.info(f"✅ 创建 HTTP 客户端: {client_key}")
-        return client
+        return get_pooled_http_client(self._get_client_key(), self.config)
 
     @abstractmethod
     def _build_headers(self) -> Dict[str, str]:
@@ -83,42 +92,57 @@ class BaseAIClient(ABC):
         payload: Dict[str, Any],
         stream: bool = False,
     ) -> Any:
-        """带重试的 HTTP 请求"""
+        """
+        带重试与限流的 HTTP 请求
+
+        stream=True 时返回异步上下文管理器，整个流式响应期间占用限流额度。
+        """
         url = f"{self.base_url}{endpoint}"
         headers = self._build_headers()
         retry_cfg = self.config.retry
-        rate_cfg = self.config.rate_limit
-
-        semaphore = _get_semaphore(rate_cfg.max_concurrent_requests)
-
-        async with semaphore:
-            await asyncio.sleep(rate_cfg.request_delay)
-
-            for attempt in range(retry_cfg.max_retries):
-                try:
-                    if attempt > 0:
-                        delay = min(
-                            retry_cfg.base_delay * (retry_cfg.exponential_base ** attempt),
-                            retry_cfg.max_delay,
-                        )
-                        logger.warning(f"⚠️ 重试 {attempt + 1}/{retry_cfg.max_retries}，等待 {delay}s")
-                        await asyncio.sleep(delay)
-
-                    if stream:
-                        return self.http_client.stream(method, url, headers=headers, json=payload)
-
+        tokens = estimate_tokens(payload.get("messages", []), payload.get("max_tokens", 0))
+
+        if stream:
+            return self._stream_with_limit(method, url, headers, payload, tokens)
+
+        for attempt in range(retry_cfg.max_retries):
+            try:
+                if attempt > 0:
+                    delay = min(
+                        retry_cfg.base_delay * (retry_cfg.exponential_base ** attempt),
+                        retry_cfg.max_delay,
+                    )
+                    logger.warning(f"⚠️ 重试 {attempt + 1}/{retry_cfg.max_retries}，等待 {delay}s")
+                    await asyncio.sleep(delay)
+
+                # 退避等待期间不占用额度；429 由限流器识别并暂停该密钥的派发
+                async with self.limiter.slot(tokens):
                     response = await self.http_client.request(method, url, headers=headers, json=payload)
                     response.raise_for_status()
-                    return response.json()
-
-                except httpx.HTTPStatusError as e:
-                    if e.response.status_code in retry_cfg.non_retryable_status_codes:
-                        raise
-                    if attempt == retry_cfg.max_retries - 1:
-                        raise
-                except (httpx.ConnectError, httpx.TimeoutException):
-                    if attempt == retry_cfg.max_retries - 1:
-                        raise
+                return response.json()
+
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code in retry_cfg.non_retryable_status_codes:
+                    raise
+                if attempt == retry_cfg.max_retries - 1:
+                    raise
+            except (httpx.ConnectError, httpx.TimeoutException):
+                if attempt == retry_cfg.max_retries - 1:
+                    raise
+
+    @asynccontextmanager
+    async def _stream_with_limit(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        payload: Dict[str, Any],
+        tokens: int,
+    ) -> AsyncIterator[httpx.Response]:
+        """在限流额度内打开流式响应"""
+        async with self.limiter.slot(tokens):
+            async with self.http_client.stream(method, url, headers=headers, json=payload) as response:
+                yield response
 
     @abstractmethod
     async def chat_completion(
@@ -146,9 +170,12 @@ class BaseAIClient(ABC):
 
 
 async def cleanup_all_clients():
-    """清理所有 HTTP 客户端"""
+    """清理所有 HTTP 客户端（包括 Gemini 与 Anthropic SDK 使用的池化客户端）"""
     for key, client in list(_http_client_pool.items()):
         if not client.is_closed:
             await client.aclose()
     _http_client_pool.clear()
-    logger.info("✅ HTTP 客户端池已清理")
\ No newline at end of file
+
+    from app.services.ai_clients.anthropic_client import clear_anthropic_client_pool
+    clear_anthropic_client_pool()
+    logger.info("✅ HTTP 客户端池已清理")
@@ -1,7 +1,8 @@
 """Gemini 客户端"""
 from typing import Any, AsyncGenerator, Dict, List, Optional
-import httpx
 from app.services.ai_config import AIClientConfig, default_config
+from app.services.ai_clients.base_client import get_pooled_http_client, make_client_key
+from app.services.ai_clients.rate_limiter import estimate_tokens, get_limiter
 from app.logger import get_logger
 
 logger = get_logger(__name__)
@@ -14,15 +15,10 @@ class GeminiClient:
         self.api_key = api_key
         self.base_url = (base_url or "https://generativelanguage.googleapis.com/v1beta").rstrip("/")
         self.config = config or default_config
-        http_cfg = self.config.http
-        self.client = httpx.AsyncClient(
-            timeout=httpx.Timeout(
-                connect=http_cfg.connect_timeout,
-                read=http_cfg.read_timeout,
-                write=http_cfg.write_timeout,
-                pool=http_cfg.pool_timeout
-            )
-        )
+        # 使用全局池中的 HTTP 客户端，同一地址与密钥复用连接并共享限流额度
+        client_key = make_client_key(self.__class__.__name__, self.base_url, api_key)
+        self.client = get_pooled_http_client(client_key, self.config)
+        self.limiter = get_limiter(client_key, self.config.rate_limit)
 
     def _convert_tools_to_gemini(self, tools: list) -> list:
         """将 OpenAI 格式工具转换为 Gemini 格式"""
@@ -70,8 +66,9 @@ class GeminiClient:
         if tools:
             payload["tools"] = self._convert_tools_to_gemini(tools)
 
-        response = await self.client.post(url, json=payload)
-        response.raise_for_status()
+        async with self.limiter.slot(estimate_tokens(messages, max_tokens, system_prompt)):
+            response = await self.client.post(url, json=payload)
+            response.raise_for_status()
         data = response.json()
         
         candidates = data.get("candidates", [])
@@ -139,8 +136,11 @@ class GeminiClient:
         if tools:
             payload["tools"] = self._convert_tools_to_gemini(tools)
 
+        function_calls = []
+        
         try:
-            async with self.client.stream("POST", url, json=payload) as response:
+            tokens = estimate_tokens(messages, max_tokens, system_prompt)
+            async with self.limiter.slot(tokens), self.client.stream("POST", url, json=payload) as response:
                 response.raise_for_status()
                 try:
                     async for line in response.aiter_lines():
@@ -153,7 +153,6 @@ class GeminiClient:
                                     parts = candidates[0].get("content", {}).get("parts", [])
                                     if parts and len(parts) > 0:
                                         text = ""
-                                        function_calls = []
                                         for part in parts:
                                             if "text" in part:
                                                 text += part["text"]
@@ -170,8 +169,6 @@ class GeminiClient:
                                         
                                         if text:
                                             yield {"content": text}
-                                        if function_calls:
-                                            yield {"tool_calls": function_calls}
                             except json.JSONDecodeError:
                                 continue
                 except GeneratorExit:
@@ -181,6 +178,10 @@ class GeminiClient:
                 except Exception as iter_error:
                     logger.error(f"Gemini 流式响应迭代出错: {str(iter_error)}")
                     raise
+            
+            # 流结束后（已归还限流额度）再交出工具调用，调用方随后发起的下一轮请求不会与本轮互相等待
+            if function_calls:
+                yield {"tool_calls": function_calls}
         except GeneratorExit:
             # 重新抛出GeneratorExit，让调用方处理
             raise
@@ -101,6 +101,7 @@ class OpenAIClient(BaseAIClient):
         payload = self._build_payload(messages, model, temperature, max_tokens, tools, tool_choice, stream=True)
         
         tool_calls_buffer = {}  # 收集工具调用块
+        stream_finished = False
         
         try:
             async with await self._request_with_retry("POST", "/chat/completions", payload, stream=True) as response:
@@ -110,10 +111,7 @@ class OpenAIClient(BaseAIClient):
                         if line.startswith("data: "):
                             data_str = line[6:]
                             if data_str.strip() == "[DONE]":
-                                # 流结束，检查是否有工具调用需要处理
-                                if tool_calls_buffer:
-                                    yield {"tool_calls": list(tool_calls_buffer.values()), "done": True}
-                                yield {"done": True}
+                                stream_finished = True
                                 break
                             try:
                                 data = json.loads(data_str)
@@ -151,6 +149,13 @@ class OpenAIClient(BaseAIClient):
                 except Exception as iter_error:
                     logger.error(f"流式响应迭代出错: {str(iter_error)}")
                     raise
+            
+            # 流结束后（已归还限流额度）再交出工具调用：调用方处理工具后会发起下一轮请求，
+            # 若仍持有本轮额度，并发上限为1或已占满时会互相等待而死锁
+            if stream_finished:
+                if tool_calls_buffer:
+                    yield {"tool_calls": list(tool_calls_buffer.values()), "done": True}
+                yield {"done": True}
         except GeneratorExit:
             # 重新抛出GeneratorExit，让调用方处理
             raise
@@ -0,0 +1,274 @@
+"""AI 请求自适应限流器
+
+按 (提供商, 地址, 密钥摘要) 独立限流，不同用户/提供商的配额互不影响：
+- 并发上限按 AIMD 调整：请求成功时线性增加，收到 429 时乘性减少并按 Retry-After 暂停派发
+- RPM/TPM 令牌桶控制每分钟请求数与令牌数（0 表示不限制）
+- 排队中的请求按用户轮转派发，单个用户的批量任务不会饿死其他用户
+"""
+import asyncio
+import time
+import weakref
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, Token
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from app.logger import get_logger
+from app.services.ai_config import RateLimitConfig
+
+logger = get_logger(__name__)
+
+# 未关联用户的调用（脚本、启动任务等）共用的排队标识
+ANONYMOUS_USER = "_anonymous_"
+
+# 当前请求所属用户（由 AuthMiddleware 设置，后台任务创建时随上下文继承）
+_current_user_var: ContextVar[Optional[str]] = ContextVar("ai_user_id", default=None)
+
+
+def get_current_user_id() -> Optional[str]:
+    """获取当前上下文中的用户ID"""
+    return _current_user_var.get()
+
+
+def set_current_user_id(user_id: Optional[str]) -> Token:
+    """设置当前上下文中的用户ID，返回用于恢复的令牌"""
+    return _current_user_var.set(user_id)
+
+
+def reset_current_user_id(token: Token) -> None:
+    """恢复设置前的用户ID"""
+    _current_user_var.reset(token)
+
+
+def estimate_tokens(messages: list, max_tokens: int, system_prompt: Optional[str] = None) -> int:
+    """
+    粗略估算一次请求消耗的令牌数（用于TPM预算）
+
+    与多数提供商的计费口径一致，输出按 max_tokens 预留；
+    输入按字符数估算（中文约1字1令牌，英文约4字符1令牌，取折中值）。
+    """
+    chars = len(system_prompt or "")
+    for msg in messages:
+        content = msg.get("content") if isinstance(msg, dict) else msg
+        chars += len(content) if isinstance(content, str) else len(str(content))
+    return chars // 2 + max(max_tokens, 0)
+
+
+def parse_retry_after(headers: Any) -> Optional[float]:
+    """解析 Retry-After 响应头（秒数或HTTP日期），无法解析时返回None"""
+    if headers is None:
+        return None
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """按分钟额度匀速回补的令牌桶（预留式：允许透支，调用方按返回的时长等待）"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.fill_rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float) -> float:
+        """预留令牌，返回需要等待的秒数"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+        self.updated = now
+        # 单次请求超过整桶容量时按整桶计，避免永远无法满足
+        self.tokens -= min(amount, self.capacity)
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.fill_rate
+
+
+class AdaptiveLimiter:
+    """单个 (提供商, 地址, 密钥) 的自适应限流器"""
+
+    def __init__(self, key: str, config: RateLimitConfig):
+        self.key = key
+        self.config = config
+        self.max_limit = max(config.max_concurrent_requests, 1)
+        self.min_limit = min(max(config.min_concurrent_requests, 1), self.max_limit)
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._rpm = TokenBucket(config.requests_per_minute) if config.requests_per_minute > 0 else None
+        self._tpm = TokenBucket(config.tokens_per_minute) if config.tokens_per_minute > 0 else None
+        self._paused_until = 0.0
+
+        # 统计
+        self.total_requests = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._waiters.values())
+
+    def _can_dispatch(self) -> bool:
+        return self.in_flight < int(self.limit) and time.monotonic() >= self._paused_until
+
+    def _dispatch(self) -> None:
+        """按用户轮转唤醒排队的请求，直到并发额度用尽"""
+        while self._waiters and self._can_dispatch():
+            user_id, queue = next(iter(self._waiters.items()))
+            future = queue.popleft()
+            if queue:
+                self._waiters.move_to_end(user_id)
+            else:
+                del self._waiters[user_id]
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    def _remove_waiter(self, user_id: str, future: asyncio.Future) -> None:
+        queue = self._waiters.get(user_id)
+        if queue is None:
+            return
+        try:
+            queue.remove(future)
+        except ValueError:
+            return
+        if not queue:
+            del self._waiters[user_id]
+
+    async def acquire(self, user_id: str, tokens: int = 0) -> None:
+        """获取并发额度并扣减RPM/TPM预算（额度不足时排队）"""
+        start = time.monotonic()
+        if not self._waiters and self._can_dispatch():
+            self.in_flight += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.setdefault(user_id, deque()).append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # 已分配到额度但调用方被取消，归还额度
+                    self.release()
+                else:
+                    self._remove_waiter(user_id, future)
+                raise
+
+        delay = 0.0
+        if self._rpm:
+            delay = max(delay, self._rpm.reserve(1))
+        if self._tpm and tokens:
+            delay = max(delay, self._tpm.reserve(tokens))
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.release()
+                raise
+
+        waited = time.monotonic() - start
+        self.total_requests += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def release(self) -> None:
+        """归还并发额度"""
+        self.in_flight -= 1
+        self._dispatch()
+
+    def record_success(self) -> None:
+        """请求成功：加性增加并发上限（每成功约 limit 次增加 increase_step）"""
+        if self.limit < self.max_limit:
+            self.limit = min(self.max_limit, self.limit + self.config.increase_step / self.limit)
+            self._dispatch()
+
+    def record_throttle(self, retry_after: Optional[float] = None) -> None:
+        """收到限流响应：乘性减少并发上限，并在冷却期内暂停派发"""
+        self.throttled += 1
+        now = time.monotonic()
+        # 同一波并发请求连续收到429时只降一次
+        if now >= self._paused_until:
+            self.limit = max(self.min_limit, self.limit * self.config.backoff_factor)
+            logger.warning(f"⚠️ AI请求被限流 {self.key}，并发上限降至 {int(self.limit)}")
+        cooldown = retry_after if retry_after is not None else self.config.default_cooldown
+        self._paused_until = max(self._paused_until, now + min(cooldown, self.config.max_cooldown))
+        asyncio.get_running_loop().call_later(self._paused_until - now, self._dispatch)
+
+    def _observe_exception(self, exc: BaseException) -> None:
+        """识别限流异常（httpx.HTTPStatusError / Anthropic APIStatusError 均带 response）"""
+        response = getattr(exc, "response", None)
+        status_code = getattr(response, "status_code", None)
+        if status_code in self.config.throttle_status_codes:
+            self.record_throttle(parse_retry_after(getattr(response, "headers", None)))
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0) -> AsyncIterator["AdaptiveLimiter"]:
+        """
+        在限流额度内执行一次请求
+
+        正常退出视为成功；抛出带429响应的异常时触发退避。
+        流式请求应在整个流的生命周期内持有该上下文。
+        """
+        await self.acquire(get_current_user_id() or ANONYMOUS_USER, tokens)
+        try:
+            yield self
+        except BaseException as e:
+            self._observe_exception(e)
+            raise
+        else:
+            self.record_success()
+        finally:
+            self.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "concurrency_limit": int(self.limit),
+            "max_concurrency": self.max_limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "queued_users": len(self._waiters),
+            "paused_seconds": round(max(self._paused_until - time.monotonic(), 0.0), 2),
+            "total_requests": self.total_requests,
+            "throttled": self.throttled,
+            "avg_wait_ms": round(self.total_wait / self.total_requests * 1000, 2) if self.total_requests else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+        }
+
+
+# 全局限流器注册表（键与 HTTP 客户端池一致）
+# 弱引用：仍被客户端实例引用的限流器不会被替换，同一密钥始终共用一个限流器；
+# 不再被引用且不在最近使用列表中的限流器（密钥轮换、已删除的自定义地址）随之回收
+_limiters: "weakref.WeakValueDictionary[str, AdaptiveLimiter]" = weakref.WeakValueDictionary()
+
+# 最近使用的限流器保持强引用，客户端实例短暂释放期间不丢失 AIMD 上限与429冷却状态
+_RECENT_LIMITERS_SIZE = 256
+_recent_limiters: "OrderedDict[str, AdaptiveLimiter]" = OrderedDict()
+
+
+def get_limiter(client_key: str, config: RateLimitConfig) -> AdaptiveLimiter:
+    """获取或创建指定客户端键的限流器（首次创建时的配置生效）"""
+    limiter = _limiters.get(client_key)
+    if limiter is None:
+        limiter = AdaptiveLimiter(client_key, config)
+        _limiters[client_key] = limiter
+    _recent_limiters[client_key] = limiter
+    _recent_limiters.move_to_end(client_key)
+    while len(_recent_limiters) > _RECENT_LIMITERS_SIZE:
+        _recent_limiters.popitem(last=False)
+    return limiter
+
+
+def get_limiter_stats() -> List[Dict[str, Any]]:
+    """获取当前存活的限流器的统计信息"""
+    return [limiter.get_stats() for limiter in list(_limiters.values())]
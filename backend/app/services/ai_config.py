@@ -2,6 +2,8 @@
 from dataclasses import dataclass, field
 from typing import Optional
 
+from app.config import settings
+
 
 @dataclass
 class HTTPClientConfig:
@@ -27,9 +29,16 @@ class RetryConfig:
 
 @dataclass
 class RateLimitConfig:
-    """限流配置"""
-    max_concurrent_requests: int = 5
-    request_delay: float = 0.2
+    """限流配置（按 提供商+地址+密钥 独立生效）"""
+    max_concurrent_requests: int = 5  # 并发上限（AIMD 调整的上界）
+    min_concurrent_requests: int = 1  # 被限流后并发上限的下界
+    requests_per_minute: int = 0  # 每分钟请求数预算，0表示不限制
+    tokens_per_minute: int = 0  # 每分钟令牌数预算（输入估算+max_tokens），0表示不限制
+    increase_step: float = 1.0  # 每成功约"当前上限"次请求，并发上限增加的量
+    backoff_factor: float = 0.5  # 收到限流响应时并发上限的乘数
+    default_cooldown: float = 2.0  # 限流响应未携带 Retry-After 时暂停派发的秒数
+    max_cooldown: float = 60.0  # 暂停派发的最长秒数
+    throttle_status_codes: tuple = field(default_factory=lambda: (429,))
 
 
 @dataclass
@@ -41,4 +50,10 @@ class AIClientConfig:
 
 
 # 全局默认配置
-default_config = AIClientConfig()
\ No newline at end of file
+default_config = AIClientConfig(
+    rate_limit=RateLimitConfig(
+        max_concurrent_requests=settings.ai_max_concurrent_requests,
+        requests_per_minute=settings.ai_requests_per_minute,
+        tokens_per_minute=settings.ai_tokens_per_minute,
+    )
+)
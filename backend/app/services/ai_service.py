@@ -5,7 +5,10 @@
 - 如果有启用的MCP插件且有可用工具，自动发送tools
 - 通过 auto_mcp 参数控制是否启用自动工具加载
 """
-from typing import Optional, AsyncGenerator, List, Dict, Any, Union
+import copy
+import time
+from collections import OrderedDict
+from typing import Optional, AsyncGenerator, List, Dict, Any, Union, Tuple
 
 from app.config import settings as app_settings
 from app.logger import get_logger
@@ -115,6 +118,19 @@ class AIService:
             client = GeminiClient(api_key, api_base_url, self.config)
             self._gemini_provider = GeminiProvider(client)
 
+    def bind_session(self, db_session: Optional[Any]) -> "AIService":
+        """
+        创建绑定到指定数据库会话的轻量副本
+        
+        副本与原实例共享 Provider/Client（连接池得以跨请求复用），
+        但拥有独立的 db_session 和 MCP 工具缓存状态，调用方可以随意修改。
+        """
+        clone = copy.copy(self)
+        clone.db_session = db_session
+        clone._cached_tools = None
+        clone._tools_loaded = False
+        return clone
+
     @property
     def enable_mcp(self) -> bool:
         """是否启用MCP工具"""
@@ -224,6 +240,15 @@ class AIService:
             self._cached_tools = None
             return None
 
+    async def preload_mcp_tools(self) -> Optional[List[Dict]]:
+        """
+        预加载MCP工具
+        
+        在同一实例上并发调用 generate_text 之前调用：工具加载会使用 db_session，
+        预先加载后并发任务只读取缓存，不会同时操作同一个数据库会话。
+        """
+        return await self._prepare_mcp_tools()
+
     async def _handle_tool_calls(
         self,
         original_prompt: str,
@@ -572,4 +597,61 @@ def create_user_ai_service_with_mcp(
         user_id=user_id,
         db_session=db_session,
         enable_mcp=enable_mcp,
-    )
\ No newline at end of file
+    )
+
+
+# ==================== 用户AI服务缓存 ====================
+# 按用户缓存由设置与MCP插件状态构建的 AIService 原型（不持有数据库会话），
+# 每个请求通过 bind_session 获得共享 Provider/Client 的副本，避免重复查询设置和重建客户端。
+# 设置或MCP插件变更时调用 invalidate_user_ai_service 使缓存失效；
+# 版本号用于丢弃失效前已开始构建、失效后才写入的旧实例。
+
+_user_ai_service_cache: "OrderedDict[str, Tuple[int, float, AIService]]" = OrderedDict()
+_user_ai_service_versions: Dict[str, int] = {}
+
+
+def get_user_ai_service_version(user_id: str) -> int:
+    """获取用户AI服务配置的当前版本号（构建实例前读取）"""
+    return _user_ai_service_versions.get(user_id, 0)
+
+
+def get_cached_user_ai_service(user_id: str, db_session) -> Optional[AIService]:
+    """
+    获取缓存的用户AI服务（绑定到当前请求的数据库会话）
+    
+    Returns:
+        命中时返回新的绑定副本，未命中或已过期返回 None
+    """
+    entry = _user_ai_service_cache.get(user_id)
+    if entry is None:
+        return None
+    version, expires_at, prototype = entry
+    if version != get_user_ai_service_version(user_id) or expires_at < time.monotonic():
+        _user_ai_service_cache.pop(user_id, None)
+        return None
+    _user_ai_service_cache.move_to_end(user_id)
+    return prototype.bind_session(db_session)
+
+
+def cache_user_ai_service(user_id: str, version: int, service: AIService) -> None:
+    """
+    缓存用户AI服务（构建期间配置已变更则不缓存）
+    
+    Args:
+        user_id: 用户ID
+        version: 构建前通过 get_user_ai_service_version 读取的版本号
+        service: 构建好的AI服务实例
+    """
+    ttl = app_settings.ai_service_cache_ttl
+    if ttl <= 0 or version != get_user_ai_service_version(user_id):
+        return
+    _user_ai_service_cache[user_id] = (version, time.monotonic() + ttl, service.bind_session(None))
+    _user_ai_service_cache.move_to_end(user_id)
+    while len(_user_ai_service_cache) > app_settings.ai_service_cache_size:
+        _user_ai_service_cache.popitem(last=False)
+
+
+def invalidate_user_ai_service(user_id: str) -> None:
+    """使用户AI服务缓存失效（AI设置或MCP插件变更后调用）"""
+    _user_ai_service_versions[user_id] = get_user_ai_service_version(user_id) + 1
+    _user_ai_service_cache.pop(user_id, None)
@@ -1,9 +1,10 @@
 """导入导出服务"""
 import json
+import uuid
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, AsyncGenerator, AsyncIterator
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import select, insert, update, or_
 from app.models.project import Project
 from app.models.chapter import Chapter
 from app.models.character import Character
@@ -44,6 +45,29 @@ class ImportExportService:
     SUPPORTED_VERSIONS = ["1.0.0", "1.1.0"]  # 支持的版本列表
     CURRENT_VERSION = "1.1.0"  # 当前导出版本
     
+    # NDJSON 流式导入导出：每行一条记录，按依赖顺序排列（导入时据此重建关联）
+    NDJSON_BATCH_SIZE = 200  # 流式读取/批量写入的批大小
+    NDJSON_SECTIONS = [
+        "characters",
+        "outlines",
+        "chapters",
+        "relationships",
+        "organizations",
+        "organization_members",
+        "writing_styles",
+        "generation_history",
+        "careers",
+        "character_careers",
+        "story_memories",
+        "plot_analysis",
+        "project_default_style",
+    ]
+    # 数据量可能很大的分段：导入时按批写入并释放内存，其余分段整段缓冲后写入
+    NDJSON_STREAMED_SECTIONS = {"chapters", "story_memories", "plot_analysis"}
+    
+    # 批量导入：每条 INSERT 语句携带的最大行数
+    IMPORT_BATCH_SIZE = 500
+    
     @staticmethod
     async def export_project(
         project_id: str,
@@ -78,25 +102,7 @@ class ImportExportService:
             raise ValueError(f"项目不存在: {project_id}")
         
         # 项目基本信息
-        project_data = {
-            "title": project.title,
-            "description": project.description,
-            "theme": project.theme,
-            "genre": project.genre,
-            "target_words": project.target_words,
-            "current_words": project.current_words,
-            "status": project.status,
-            "world_time_period": project.world_time_period,
-            "world_location": project.world_location,
-            "world_atmosphere": project.world_atmosphere,
-            "world_rules": project.world_rules,
-            "chapter_count": project.chapter_count,
-            "narrative_perspective": project.narrative_perspective,
-            "character_count": project.character_count,
-            "outline_mode": project.outline_mode,
-            "user_id": project.user_id,
-            "created_at": project.created_at.isoformat() if project.created_at else None,
-        }
+        project_data = ImportExportService._export_project_info(project)
         
         # 导出章节
         chapters = await ImportExportService._export_chapters(project_id, db)
@@ -182,6 +188,165 @@ class ImportExportService:
         logger.info(f"项目导出完成: {project_id}")
         return export_data
     
+    @staticmethod
+    def _ndjson_line(record: Dict[str, Any]) -> str:
+        """序列化一行NDJSON记录"""
+        return json.dumps(record, ensure_ascii=False) + "\n"
+    
+    @staticmethod
+    def _ndjson_item(section: str, item: Any) -> str:
+        """序列化一条分段数据记录"""
+        return ImportExportService._ndjson_line({
+            "type": section,
+            "data": item.model_dump(exclude_none=True, by_alias=True)
+        })
+    
+    @staticmethod
+    async def stream_export_project_ndjson(
+        project_id: str,
+        db: AsyncSession,
+        include_generation_history: bool = False,
+        include_writing_styles: bool = True,
+        include_careers: bool = True,
+        include_memories: bool = False,
+        include_plot_analysis: bool = False
+    ) -> AsyncGenerator[str, None]:
+        """
+        以NDJSON格式流式导出项目数据
+        
+        第一行为 header（版本、导出时间、项目信息），之后每行一条
+        {"type": 分段名, "data": 记录}，分段按 NDJSON_SECTIONS 的依赖顺序输出。
+        章节、故事记忆、剧情分析按批从数据库流式读取，内存占用与项目大小无关。
+        
+        Args:
+            与 export_project 相同
+            
+        Yields:
+            str: NDJSON 行（包含换行符）
+        """
+        logger.info(f"开始流式导出项目(NDJSON): {project_id}")
+        
+        result = await db.execute(select(Project).where(Project.id == project_id))
+        project = result.scalar_one_or_none()
+        if not project:
+            raise ValueError(f"项目不存在: {project_id}")
+        
+        yield ImportExportService._ndjson_line({
+            "type": "header",
+            "version": ImportExportService.CURRENT_VERSION,
+            "export_time": datetime.utcnow().isoformat(),
+            "project": ImportExportService._export_project_info(project)
+        })
+        
+        batch_size = ImportExportService.NDJSON_BATCH_SIZE
+        
+        # 角色、大纲（体量小，整段查询）
+        for item in await ImportExportService._export_characters(project_id, db):
+            yield ImportExportService._ndjson_item("characters", item)
+        for item in await ImportExportService._export_outlines(project_id, db):
+            yield ImportExportService._ndjson_item("outlines", item)
+        
+        # 章节：按批流式读取，避免一次性加载全部正文
+        outline_mapping = await ImportExportService._get_outline_title_mapping(project_id, db)
+        chapter_stream = await db.stream_scalars(
+            select(Chapter)
+            .where(Chapter.project_id == project_id)
+            .order_by(Chapter.chapter_number)
+            .execution_options(yield_per=batch_size)
+        )
+        chapter_count = 0
+        async for ch in chapter_stream:
+            yield ImportExportService._ndjson_item(
+                "chapters", ImportExportService._chapter_to_export(ch, outline_mapping)
+            )
+            chapter_count += 1
+        logger.info(f"导出章节数: {chapter_count}")
+        
+        for item in await ImportExportService._export_relationships(project_id, db):
+            yield ImportExportService._ndjson_item("relationships", item)
+        for item in await ImportExportService._export_organizations(project_id, db):
+            yield ImportExportService._ndjson_item("organizations", item)
+        for item in await ImportExportService._export_organization_members(project_id, db):
+            yield ImportExportService._ndjson_item("organization_members", item)
+        
+        if include_writing_styles:
+            for item in await ImportExportService._export_writing_styles(project_id, db):
+                yield ImportExportService._ndjson_item("writing_styles", item)
+        
+        if include_generation_history:
+            for item in await ImportExportService._export_generation_history(project_id, db):
+                yield ImportExportService._ndjson_item("generation_history", item)
+        
+        if include_careers:
+            for item in await ImportExportService._export_careers(project_id, db):
+                yield ImportExportService._ndjson_item("careers", item)
+            for item in await ImportExportService._export_character_careers(project_id, db):
+                yield ImportExportService._ndjson_item("character_careers", item)
+        
+        chapter_mapping = None
+        if include_memories or include_plot_analysis:
+            chapter_mapping = await ImportExportService._get_chapter_title_mapping(project_id, db)
+        
+        # 故事记忆：按批流式读取
+        if include_memories:
+            char_mapping = await ImportExportService._get_character_name_mapping(project_id, db)
+            memory_stream = await db.stream_scalars(
+                select(StoryMemory)
+                .where(StoryMemory.project_id == project_id)
+                .order_by(StoryMemory.story_timeline, StoryMemory.chapter_position)
+                .execution_options(yield_per=batch_size)
+            )
+            async for mem in memory_stream:
+                yield ImportExportService._ndjson_item(
+                    "story_memories",
+                    ImportExportService._memory_to_export(mem, chapter_mapping, char_mapping)
+                )
+        
+        # 剧情分析：按批流式读取
+        if include_plot_analysis:
+            analysis_stream = await db.stream_scalars(
+                select(PlotAnalysis)
+                .where(PlotAnalysis.project_id == project_id)
+                .execution_options(yield_per=batch_size)
+            )
+            async for analysis in analysis_stream:
+                chapter_title = chapter_mapping.get(analysis.chapter_id)
+                if not chapter_title:
+                    continue  # 跳过没有关联章节的分析
+                yield ImportExportService._ndjson_item(
+                    "plot_analysis",
+                    ImportExportService._analysis_to_export(analysis, chapter_title)
+                )
+        
+        project_default_style = await ImportExportService._export_project_default_style(project_id, db)
+        if project_default_style:
+            yield ImportExportService._ndjson_item("project_default_style", project_default_style)
+        
+        logger.info(f"项目流式导出完成: {project_id}")
+    
+    @staticmethod
+    def _export_project_info(project: Project) -> Dict[str, Any]:
+        """导出项目基本信息"""
+        return {
+            "title": project.title,
+            "description": project.description,
+            "theme": project.theme,
+            "genre": project.genre,
+            "target_words": project.target_words,
+            "current_words": project.current_words,
+            "status": project.status,
+            "world_time_period": project.world_time_period,
+            "world_location": project.world_location,
+            "world_atmosphere": project.world_atmosphere,
+            "world_rules": project.world_rules,
+            "chapter_count": project.chapter_count,
+            "narrative_perspective": project.narrative_perspective,
+            "character_count": project.character_count,
+            "outline_mode": project.outline_mode,
+            "user_id": project.user_id,
+            "created_at": project.created_at.isoformat() if project.created_at else None,
+        }
+    
     @staticmethod
     async def _export_chapters(project_id: str, db: AsyncSession) -> List[ChapterExportData]:
         """导出章节"""
@@ -195,38 +360,41 @@ class ImportExportService:
         # 构建大纲ID到标题的映射
         outline_mapping = {}
         if chapters:
-            outline_ids = [ch.outline_id for ch in chapters if ch.outline_id]
-            if outline_ids:
-                outline_result = await db.execute(
-                    select(Outline).where(Outline.id.in_(outline_ids))
-                )
-                outlines = outline_result.scalars().all()
-                outline_mapping = {ol.id: ol.title for ol in outlines}
-        
-        exported_chapters = []
-        for ch in chapters:
-            # 解析expansion_plan JSON
-            expansion_plan = None
-            if ch.expansion_plan:
-                try:
-                    expansion_plan = json.loads(ch.expansion_plan) if isinstance(ch.expansion_plan, str) else ch.expansion_plan
-                except:
-                    expansion_plan = None
-            
-            exported_chapters.append(ChapterExportData(
-                title=ch.title,
-                content=ch.content,
-                summary=ch.summary,
-                chapter_number=ch.chapter_number,
-                word_count=ch.word_count or 0,
-                status=ch.status,
-                created_at=ch.created_at.isoformat() if ch.created_at else None,
-                outline_title=outline_mapping.get(ch.outline_id) if ch.outline_id else None,
-                sub_index=ch.sub_index,
-                expansion_plan=expansion_plan
-            ))
+            outline_mapping = await ImportExportService._get_outline_title_mapping(project_id, db)
         
-        return exported_chapters
+        return [ImportExportService._chapter_to_export(ch, outline_mapping) for ch in chapters]
+    
+    @staticmethod
+    async def _get_outline_title_mapping(project_id: str, db: AsyncSession) -> Dict[str, str]:
+        """构建大纲ID到标题的映射（只查询所需列）"""
+        outline_result = await db.execute(
+            select(Outline.id, Outline.title).where(Outline.project_id == project_id)
+        )
+        return {row.id: row.title for row in outline_result.all()}
+    
+    @staticmethod
+    def _chapter_to_export(ch: Chapter, outline_mapping: Dict[str, str]) -> ChapterExportData:
+        """将章节转换为导出数据"""
+        # 解析expansion_plan JSON
+        expansion_plan = None
+        if ch.expansion_plan:
+            try:
+                expansion_plan = json.loads(ch.expansion_plan) if isinstance(ch.expansion_plan, str) else ch.expansion_plan
+            except:
+                expansion_plan = None
+        
+        return ChapterExportData(
+            title=ch.title,
+            content=ch.content,
+            summary=ch.summary,
+            chapter_number=ch.chapter_number,
+            word_count=ch.word_count or 0,
+            status=ch.status,
+            created_at=ch.created_at.isoformat() if ch.created_at else None,
+            outline_title=outline_mapping.get(ch.outline_id) if ch.outline_id else None,
+            sub_index=ch.sub_index,
+            expansion_plan=expansion_plan
+        )
     
     @staticmethod
     async def _export_characters(project_id: str, db: AsyncSession) -> List[CharacterExportData]:
@@ -496,21 +664,27 @@ class ImportExportService:
         ]
     
     @staticmethod
-    async def _export_story_memories(project_id: str, db: AsyncSession) -> List[StoryMemoryExportData]:
-        """导出故事记忆"""
-        # 构建章节ID到标题的映射
+    async def _get_chapter_title_mapping(project_id: str, db: AsyncSession) -> Dict[str, str]:
+        """构建章节ID到标题的映射（只查询所需列，不加载正文）"""
         chapter_result = await db.execute(
-            select(Chapter).where(Chapter.project_id == project_id)
+            select(Chapter.id, Chapter.title).where(Chapter.project_id == project_id)
         )
-        chapters = chapter_result.scalars().all()
-        chapter_mapping = {ch.id: ch.title for ch in chapters}
-        
-        # 构建角色ID到名称的映射
+        return {row.id: row.title for row in chapter_result.all()}
+    
+    @staticmethod
+    async def _get_character_name_mapping(project_id: str, db: AsyncSession) -> Dict[str, str]:
+        """构建角色ID到名称的映射（只查询所需列）"""
         char_result = await db.execute(
-            select(Character).where(Character.project_id == project_id)
+            select(Character.id, Character.name).where(Character.project_id == project_id)
         )
-        characters = char_result.scalars().all()
-        char_mapping = {char.id: char.name for char in characters}
+        return {row.id: row.name for row in char_result.all()}
+    
+    @staticmethod
+    async def _export_story_memories(project_id: str, db: AsyncSession) -> List[StoryMemoryExportData]:
+        """导出故事记忆"""
+        # 构建章节ID到标题、角色ID到名称的映射
+        chapter_mapping = await ImportExportService._get_chapter_title_mapping(project_id, db)
+        char_mapping = await ImportExportService._get_character_name_mapping(project_id, db)
         
         result = await db.execute(
             select(StoryMemory)
@@ -519,45 +693,49 @@ class ImportExportService:
         )
         memories = result.scalars().all()
         
-        exported = []
-        for mem in memories:
-            # 将角色ID列表转换为名称列表
-            related_char_names = None
-            if mem.related_characters:
-                related_char_names = [
-                    char_mapping.get(char_id, char_id)
-                    for char_id in mem.related_characters
-                ]
-            
-            exported.append(StoryMemoryExportData(
-                chapter_title=chapter_mapping.get(mem.chapter_id) if mem.chapter_id else None,
-                memory_type=mem.memory_type,
-                title=mem.title,
-                content=mem.content,
-                full_context=mem.full_context,
-                related_characters=related_char_names,
-                related_locations=mem.related_locations,
-                tags=mem.tags,
-                importance_score=mem.importance_score or 0.5,
-                story_timeline=mem.story_timeline,
-                chapter_position=mem.chapter_position or 0,
-                text_length=mem.text_length or 0,
-                is_foreshadow=mem.is_foreshadow or 0,
-                foreshadow_strength=mem.foreshadow_strength,
-                created_at=mem.created_at.isoformat() if mem.created_at else None
-            ))
-        
-        return exported
+        return [
+            ImportExportService._memory_to_export(mem, chapter_mapping, char_mapping)
+            for mem in memories
+        ]
+    
+    @staticmethod
+    def _memory_to_export(
+        mem: StoryMemory,
+        chapter_mapping: Dict[str, str],
+        char_mapping: Dict[str, str]
+    ) -> StoryMemoryExportData:
+        """将故事记忆转换为导出数据"""
+        # 将角色ID列表转换为名称列表
+        related_char_names = None
+        if mem.related_characters:
+            related_char_names = [
+                char_mapping.get(char_id, char_id)
+                for char_id in mem.related_characters
+            ]
+        
+        return StoryMemoryExportData(
+            chapter_title=chapter_mapping.get(mem.chapter_id) if mem.chapter_id else None,
+            memory_type=mem.memory_type,
+            title=mem.title,
+            content=mem.content,
+            full_context=mem.full_context,
+            related_characters=related_char_names,
+            related_locations=mem.related_locations,
+            tags=mem.tags,
+            importance_score=mem.importance_score or 0.5,
+            story_timeline=mem.story_timeline,
+            chapter_position=mem.chapter_position or 0,
+            text_length=mem.text_length or 0,
+            is_foreshadow=mem.is_foreshadow or 0,
+            foreshadow_strength=mem.foreshadow_strength,
+            created_at=mem.created_at.isoformat() if mem.created_at else None
+        )
     
     @staticmethod
     async def _export_plot_analysis(project_id: str, db: AsyncSession) -> List[PlotAnalysisExportData]:
         """导出剧情分析"""
         # 构建章节ID到标题的映射
-        chapter_result = await db.execute(
-            select(Chapter).where(Chapter.project_id == project_id)
-        )
-        chapters = chapter_result.scalars().all()
-        chapter_mapping = {ch.id: ch.title for ch in chapters}
+        chapter_mapping = await ImportExportService._get_chapter_title_mapping(project_id, db)
         
         result = await db.execute(
             select(PlotAnalysis)
@@ -570,40 +748,44 @@ class ImportExportService:
             chapter_title = chapter_mapping.get(analysis.chapter_id)
             if not chapter_title:
                 continue  # 跳过没有关联章节的分析
-            
-            exported.append(PlotAnalysisExportData(
-                chapter_title=chapter_title,
-                plot_stage=analysis.plot_stage,
-                conflict_level=analysis.conflict_level,
-                conflict_types=analysis.conflict_types,
-                emotional_tone=analysis.emotional_tone,
-                emotional_intensity=analysis.emotional_intensity,
-                emotional_curve=analysis.emotional_curve,
-                hooks=analysis.hooks,
-                hooks_count=analysis.hooks_count or 0,
-                hooks_avg_strength=analysis.hooks_avg_strength,
-                foreshadows=analysis.foreshadows,
-                foreshadows_planted=analysis.foreshadows_planted or 0,
-                foreshadows_resolved=analysis.foreshadows_resolved or 0,
-                plot_points=analysis.plot_points,
-                plot_points_count=analysis.plot_points_count or 0,
-                character_states=analysis.character_states,
-                scenes=analysis.scenes,
-                pacing=analysis.pacing,
-                overall_quality_score=analysis.overall_quality_score,
-                pacing_score=analysis.pacing_score,
-                engagement_score=analysis.engagement_score,
-                coherence_score=analysis.coherence_score,
-                analysis_report=analysis.analysis_report,
-                suggestions=analysis.suggestions,
-                word_count=analysis.word_count,
-                dialogue_ratio=analysis.dialogue_ratio,
-                description_ratio=analysis.description_ratio,
-                created_at=analysis.created_at.isoformat() if analysis.created_at else None
-            ))
+            exported.append(ImportExportService._analysis_to_export(analysis, chapter_title))
         
         return exported
     
+    @staticmethod
+    def _analysis_to_export(analysis: PlotAnalysis, chapter_title: str) -> PlotAnalysisExportData:
+        """将剧情分析转换为导出数据"""
+        return PlotAnalysisExportData(
+            chapter_title=chapter_title,
+            plot_stage=analysis.plot_stage,
+            conflict_level=analysis.conflict_level,
+            conflict_types=analysis.conflict_types,
+            emotional_tone=analysis.emotional_tone,
+            emotional_intensity=analysis.emotional_intensity,
+            emotional_curve=analysis.emotional_curve,
+            hooks=analysis.hooks,
+            hooks_count=analysis.hooks_count or 0,
+            hooks_avg_strength=analysis.hooks_avg_strength,
+            foreshadows=analysis.foreshadows,
+            foreshadows_planted=analysis.foreshadows_planted or 0,
+            foreshadows_resolved=analysis.foreshadows_resolved or 0,
+            plot_points=analysis.plot_points,
+            plot_points_count=analysis.plot_points_count or 0,
+            character_states=analysis.character_states,
+            scenes=analysis.scenes,
+            pacing=analysis.pacing,
+            overall_quality_score=analysis.overall_quality_score,
+            pacing_score=analysis.pacing_score,
+            engagement_score=analysis.engagement_score,
+            coherence_score=analysis.coherence_score,
+            analysis_report=analysis.analysis_report,
+            suggestions=analysis.suggestions,
+            word_count=analysis.word_count,
+            dialogue_ratio=analysis.dialogue_ratio,
+            description_ratio=analysis.description_ratio,
+            created_at=analysis.created_at.isoformat() if analysis.created_at else None
+        )
+    
     @staticmethod
     async def _export_project_default_style(project_id: str, db: AsyncSession) -> Optional[ProjectDefaultStyleExportData]:
         """导出项目默认风格"""
@@ -631,24 +813,8 @@ class ImportExportService:
         Returns:
             ImportValidationResult: 验证结果
         """
-        errors = []
-        warnings = []
-        statistics = {}
-        
-        # 检查版本
+        errors, warnings = ImportExportService._validate_header(data)
         version = data.get("version", "")
-        if not version:
-            errors.append("缺少版本信息")
-        elif version not in ImportExportService.SUPPORTED_VERSIONS:
-            warnings.append(f"版本不匹配: 导入文件版本为 {version}, 当前支持版本为 {', '.join(ImportExportService.SUPPORTED_VERSIONS)}")
-        
-        # 检查必需字段
-        if "project" not in data:
-            errors.append("缺少项目信息")
-        else:
-            project = data["project"]
-            if not project.get("title"):
-                errors.append("项目标题不能为空")
         
         # 统计数据（包含新增字段）
         statistics = {
@@ -668,13 +834,122 @@ class ImportExportService:
         }
         
         # 检查数据完整性
+        ImportExportService._check_statistics(statistics, warnings)
+        
+        project_name = data.get("project", {}).get("title", "未知项目")
+        
+        return ImportValidationResult(
+            valid=len(errors) == 0,
+            version=version,
+            project_name=project_name,
+            statistics=statistics,
+            errors=errors,
+            warnings=warnings
+        )
+    
+    @staticmethod
+    def _validate_header(data: Dict) -> Tuple[List[str], List[str]]:
+        """校验版本与项目信息，返回 (errors, warnings)"""
+        errors = []
+        warnings = []
+        
+        # 检查版本
+        version = data.get("version", "")
+        if not version:
+            errors.append("缺少版本信息")
+        elif version not in ImportExportService.SUPPORTED_VERSIONS:
+            warnings.append(f"版本不匹配: 导入文件版本为 {version}, 当前支持版本为 {', '.join(ImportExportService.SUPPORTED_VERSIONS)}")
+        
+        # 检查必需字段
+        if "project" not in data:
+            errors.append("缺少项目信息")
+        else:
+            project = data["project"]
+            if not project.get("title"):
+                errors.append("项目标题不能为空")
+        
+        return errors, warnings
+    
+    @staticmethod
+    def _check_statistics(statistics: Dict[str, Any], warnings: List[str]) -> None:
+        """根据统计数据追加完整性警告"""
         if statistics["chapters"] == 0:
             warnings.append("项目没有章节数据")
         
         if statistics["characters"] == 0:
             warnings.append("项目没有角色数据")
+    
+    @staticmethod
+    async def _iter_ndjson_records(lines: AsyncIterator[Any]) -> AsyncGenerator[Dict[str, Any], None]:
+        """逐行解析NDJSON，跳过空行，行号从1开始"""
+        line_no = 0
+        async for raw in lines:
+            line_no += 1
+            if isinstance(raw, bytes):
+                raw = raw.decode('utf-8')
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                record = json.loads(raw)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"第{line_no}行不是有效的JSON: {str(e)}")
+            if not isinstance(record, dict) or "type" not in record:
+                raise ValueError(f"第{line_no}行缺少记录类型(type)")
+            yield record
+    
+    @staticmethod
+    async def validate_import_ndjson(lines: AsyncIterator[Any]) -> ImportValidationResult:
+        """
+        验证NDJSON格式的导入数据（逐行读取，不整体加载）
         
-        project_name = data.get("project", {}).get("title", "未知项目")
+        Args:
+            lines: 按行产出的文件内容（bytes 或 str）
+            
+        Returns:
+            ImportValidationResult: 验证结果
+        """
+        errors = []
+        warnings = []
+        version = ""
+        project_name = "未知项目"
+        statistics: Dict[str, Any] = {
+            section: 0 for section in ImportExportService.NDJSON_SECTIONS
+            if section != "project_default_style"
+        }
+        statistics["has_default_style"] = False
+        
+        header = None
+        try:
+            async for record in ImportExportService._iter_ndjson_records(lines):
+                record_type = record["type"]
+                if header is None:
+                    if record_type != "header":
+                        errors.append("第一行必须是header记录")
+                        break
+                    header = record
+                    continue
+                
+                if record_type == "project_default_style":
+                    statistics["has_default_style"] = True
+                elif record_type in statistics:
+                    statistics[record_type] += 1
+                else:
+                    warnings.append(f"未知的记录类型: {record_type}")
+        except ValueError as e:
+            errors.append(str(e))
+        
+        if header is None:
+            if not errors:
+                errors.append("文件为空或缺少header记录")
+        else:
+            header_errors, header_warnings = ImportExportService._validate_header(header)
+            errors.extend(header_errors)
+            warnings.extend(header_warnings)
+            version = header.get("version", "")
+            project_name = header.get("project", {}).get("title", "未知项目")
+        
+        ImportExportService._check_statistics(statistics, warnings)
         
         return ImportValidationResult(
             valid=len(errors) == 0,
@@ -721,29 +996,7 @@ class ImportExportService:
             logger.info(f"开始导入项目: {validation.project_name}")
             
             # 创建项目
-            project_data = data["project"]
-            new_project = Project(
-                user_id=user_id,  # 设置为当前用户ID
-                title=project_data.get("title"),
-                description=project_data.get("description"),
-                theme=project_data.get("theme"),
-                genre=project_data.get("genre"),
-                target_words=project_data.get("target_words"),
-                status=project_data.get("status", "planning"),
-                world_time_period=project_data.get("world_time_period"),
-                world_location=project_data.get("world_location"),
-                world_atmosphere=project_data.get("world_atmosphere"),
-                world_rules=project_data.get("world_rules"),
-                chapter_count=project_data.get("chapter_count"),
-                narrative_perspective=project_data.get("narrative_perspective"),
-                character_count=project_data.get("character_count"),
-                outline_mode=project_data.get("outline_mode", "one-to-many"),  # ✅ 导入大纲模式，默认为一对多
-                current_words=project_data.get("current_words", 0),  # 保留原项目的字数
-                wizard_step=4,  # 导入的项目设置为向导完成状态
-                wizard_status="completed"  # 标记向导已完成
-            )
-            db.add(new_project)
-            await db.flush()  # 获取project_id
+            new_project = await ImportExportService._create_project(data["project"], db, user_id)
             
             logger.info(f"创建项目成功: {new_project.id}")
             
@@ -812,15 +1065,7 @@ class ImportExportService:
             
             # 导入故事记忆
             # 需要先构建章节标题到ID的映射（使用章节号+标题组合确保唯一性）
-            chapter_title_to_id = {}
-            chapter_result = await db.execute(
-                select(Chapter).where(Chapter.project_id == new_project.id)
-            )
-            imported_chapters = chapter_result.scalars().all()
-            for ch in imported_chapters:
-                # 使用标题作为key，如果有重复标题则取第一个（已导入的顺序）
-                if ch.title and ch.title not in chapter_title_to_id:
-                    chapter_title_to_id[ch.title] = ch.id
+            chapter_title_to_id = await ImportExportService._build_chapter_title_to_id(new_project.id, db)
             
             memories_count = await ImportExportService._import_story_memories(
                 new_project.id, data.get("story_memories", []), chapter_title_to_id, char_mapping, db
@@ -866,6 +1111,236 @@ class ImportExportService:
                 warnings=warnings
             )
     
+    @staticmethod
+    async def _create_project(project_data: Dict, db: AsyncSession, user_id: str) -> Project:
+        """根据导入的项目信息创建新项目"""
+        new_project = Project(
+            user_id=user_id,  # 设置为当前用户ID
+            title=project_data.get("title"),
+            description=project_data.get("description"),
+            theme=project_data.get("theme"),
+            genre=project_data.get("genre"),
+            target_words=project_data.get("target_words"),
+            status=project_data.get("status", "planning"),
+            world_time_period=project_data.get("world_time_period"),
+            world_location=project_data.get("world_location"),
+            world_atmosphere=project_data.get("world_atmosphere"),
+            world_rules=project_data.get("world_rules"),
+            chapter_count=project_data.get("chapter_count"),
+            narrative_perspective=project_data.get("narrative_perspective"),
+            character_count=project_data.get("character_count"),
+            outline_mode=project_data.get("outline_mode", "one-to-many"),  # ✅ 导入大纲模式，默认为一对多
+            current_words=project_data.get("current_words", 0),  # 保留原项目的字数
+            wizard_step=4,  # 导入的项目设置为向导完成状态
+            wizard_status="completed"  # 标记向导已完成
+        )
+        db.add(new_project)
+        await db.flush()  # 获取project_id
+        return new_project
+    
+    @staticmethod
+    async def _build_chapter_title_to_id(project_id: str, db: AsyncSession) -> Dict[str, str]:
+        """构建已导入章节的标题到ID映射（按章节号，重复标题取第一个）"""
+        chapter_title_to_id = {}
+        chapter_result = await db.execute(
+            select(Chapter.id, Chapter.title)
+            .where(Chapter.project_id == project_id)
+            .order_by(Chapter.chapter_number)
+        )
+        for row in chapter_result.all():
+            if row.title and row.title not in chapter_title_to_id:
+                chapter_title_to_id[row.title] = row.id
+        return chapter_title_to_id
+    
+    @staticmethod
+    async def import_project_ndjson(
+        lines: AsyncIterator[Any],
+        db: AsyncSession,
+        user_id: str
+    ) -> ImportResult:
+        """
+        导入NDJSON格式的项目数据（创建新项目）
+        
+        逐行读取，章节、故事记忆、剧情分析每 NDJSON_BATCH_SIZE 条写入一次并
+        清空会话中的对象，其余分段整段缓冲。分段必须按 NDJSON_SECTIONS 顺序出现
+        （即导出时的顺序），以保证关联对象先于引用方导入。整个导入在一个事务中完成。
+        
+        Args:
+            lines: 按行产出的文件内容（bytes 或 str）
+            db: 数据库会话
+            user_id: 目标用户ID（导入后的项目归属）
+            
+        Returns:
+            ImportResult: 导入结果
+        """
+        warnings = []
+        statistics: Dict[str, int] = {}
+        sections = ImportExportService.NDJSON_SECTIONS
+        batch_size = ImportExportService.NDJSON_BATCH_SIZE
+        
+        # 跨批次共享的名称/标题 -> 新ID 映射
+        ctx: Dict[str, Any] = {
+            "char_mapping": {},
+            "outline_mapping": {},
+            "org_mapping": {},
+            "career_mapping": {},
+            "chapter_title_to_id": None,
+        }
+        
+        async def flush_section(project_id: str, section: str, items: List[Dict]) -> None:
+            """将一个分段（或其中一批）写入数据库"""
+            if not items:
+                return
+            
+            count = 0
+            if section == "characters":
+                mapping = await ImportExportService._import_characters(project_id, items, db)
+                ctx["char_mapping"].update(mapping)
+                count = len(mapping)
+            elif section == "outlines":
+                mapping = await ImportExportService._import_outlines(project_id, items, db)
+                ctx["outline_mapping"].update(mapping)
+                count = len(mapping)
+            elif section == "chapters":
+                count = await ImportExportService._import_chapters(
+                    project_id, items, ctx["outline_mapping"], db
+                )
+            elif section == "relationships":
+                count = await ImportExportService._import_relationships(
+                    project_id, items, ctx["char_mapping"], db
+                )
+            elif section == "organizations":
+                mapping = await ImportExportService._import_organizations(
+                    project_id, items, ctx["char_mapping"], db
+                )
+                ctx["org_mapping"].update(mapping)
+                count = len(mapping)
+            elif section == "organization_members":
+                count = await ImportExportService._import_organization_members(
+                    items, ctx["char_mapping"], ctx["org_mapping"], db
+                )
+            elif section == "writing_styles":
+                count = await ImportExportService._import_writing_styles(project_id, items, db)
+            elif section == "generation_history":
+                return  # 与JSON导入一致，不导入生成历史
+            elif section == "careers":
+                mapping = await ImportExportService._import_careers(project_id, items, db)
+                ctx["career_mapping"].update(mapping)
+                count = len(mapping)
+            elif section == "character_careers":
+                count = await ImportExportService._import_character_careers(
+                    items, ctx["char_mapping"], ctx["career_mapping"], db
+                )
+            elif section in ("story_memories", "plot_analysis"):
+                if ctx["chapter_title_to_id"] is None:
+                    ctx["chapter_title_to_id"] = await ImportExportService._build_chapter_title_to_id(
+                        project_id, db
+                    )
+                if section == "story_memories":
+                    count = await ImportExportService._import_story_memories(
+                        project_id, items, ctx["chapter_title_to_id"], ctx["char_mapping"], db
+                    )
+                else:
+                    count = await ImportExportService._import_plot_analysis(
+                        project_id, items, ctx["chapter_title_to_id"], db, user_id
+                    )
+            elif section == "project_default_style":
+                imported = await ImportExportService._import_project_default_style(
+                    project_id, items[-1], db
+                )
+                count = 1 if imported else 0
+            
+            statistics[section] = statistics.get(section, 0) + count
+            
+            # 写入并释放已持久化的对象，保持会话内存占用稳定
+            await db.flush()
+            db.expunge_all()
+        
+        try:
+            project_id = None
+            current_section = None
+            buffer: List[Dict] = []
+            
+            async for record in ImportExportService._iter_ndjson_records(lines):
+                record_type = record["type"]
+                
+                if project_id is None:
+                    if record_type != "header":
+                        raise ValueError("第一行必须是header记录")
+                    errors, header_warnings = ImportExportService._validate_header(record)
+                    if errors:
+                        return ImportResult(
+                            success=False,
+                            message=f"数据验证失败: {', '.join(errors)}",
+                            statistics={},
+                            warnings=header_warnings
+                        )
+                    warnings.extend(header_warnings)
+                    logger.info(f"开始导入项目(NDJSON): {record['project'].get('title')}")
+                    
+                    new_project = await ImportExportService._create_project(record["project"], db, user_id)
+                    project_id = new_project.id
+                    logger.info(f"创建项目成功: {project_id}")
+                    continue
+                
+                if record_type not in sections:
+                    warnings.append(f"跳过未知的记录类型: {record_type}")
+                    continue
+                
+                if record_type != current_section:
+                    if current_section is not None and sections.index(record_type) < sections.index(current_section):
+                        raise ValueError(f"记录顺序错误: {record_type} 不能出现在 {current_section} 之后")
+                    await flush_section(project_id, current_section, buffer)
+                    current_section = record_type
+                    buffer = []
+                
+                buffer.append(record.get("data") or {})
+                if record_type in ImportExportService.NDJSON_STREAMED_SECTIONS and len(buffer) >= batch_size:
+                    await flush_section(project_id, current_section, buffer)
+                    buffer = []
+            
+            if project_id is None:
+                raise ValueError("文件为空或缺少header记录")
+            
+            await flush_section(project_id, current_section, buffer)
+            
+            # 提交事务
+            await db.commit()
+            
+            for section, count in statistics.items():
+                logger.info(f"导入 {section}: {count}")
+            logger.info(f"项目导入完成(NDJSON): {project_id}")
+            
+            return ImportResult(
+                success=True,
+                project_id=project_id,
+                message="项目导入成功",
+                statistics=statistics,
+                warnings=warnings
+            )
+            
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"导入项目失败: {str(e)}", exc_info=True)
+            return ImportResult(
+                success=False,
+                message=f"导入失败: {str(e)}",
+                statistics=statistics,
+                warnings=warnings
+            )
+    
+    @staticmethod
+    def _new_id() -> str:
+        """预先生成主键，导入时据此直接建立名称到ID的映射，无需逐行flush"""
+        return str(uuid.uuid4())
+    
+    @staticmethod
+    async def _bulk_insert(db: AsyncSession, model: Any, rows: List[Dict[str, Any]]) -> None:
+        """按批执行多行INSERT，不经过ORM工作单元（rows 的键必须一致）"""
+        batch_size = ImportExportService.IMPORT_BATCH_SIZE
+        for start in range(0, len(rows), batch_size):
+            await db.execute(insert(model), rows[start:start + batch_size])
+    
     @staticmethod
     async def _import_chapters(
         project_id: str,
@@ -874,7 +1349,7 @@ class ImportExportService:
         db: AsyncSession
     ) -> int:
         """导入章节"""
-        count = 0
+        rows = []
         for ch_data in chapters_data:
             # 根据大纲标题查找对应的新大纲ID
             outline_id = None
@@ -887,22 +1362,22 @@ class ImportExportService:
             if expansion_plan and isinstance(expansion_plan, dict):
                 expansion_plan = json.dumps(expansion_plan, ensure_ascii=False)
             
-            chapter = Chapter(
-                project_id=project_id,
-                title=ch_data.get("title"),
-                content=ch_data.get("content"),
-                summary=ch_data.get("summary"),
-                chapter_number=ch_data.get("chapter_number"),
-                word_count=ch_data.get("word_count", 0),
-                status=ch_data.get("status", "draft"),
-                outline_id=outline_id,
-                sub_index=ch_data.get("sub_index"),
-                expansion_plan=expansion_plan
-            )
-            db.add(chapter)
-            count += 1
-        
-        return count
+            rows.append({
+                "id": ImportExportService._new_id(),
+                "project_id": project_id,
+                "title": ch_data.get("title"),
+                "content": ch_data.get("content"),
+                "summary": ch_data.get("summary"),
+                "chapter_number": ch_data.get("chapter_number"),
+                "word_count": ch_data.get("word_count", 0),
+                "status": ch_data.get("status", "draft"),
+                "outline_id": outline_id,
+                "sub_index": ch_data.get("sub_index"),
+                "expansion_plan": expansion_plan,
+            })
+        
+        await ImportExportService._bulk_insert(db, Chapter, rows)
+        return len(rows)
     
     @staticmethod
     async def _import_characters(
@@ -912,6 +1387,7 @@ class ImportExportService:
     ) -> Dict[str, str]:
         """导入角色，返回名称到ID的映射"""
         char_mapping = {}
+        rows = []
         
         for char_data in characters_data:
             # 处理traits
@@ -919,24 +1395,25 @@ class ImportExportService:
             if isinstance(traits, list):
                 traits = json.dumps(traits, ensure_ascii=False)
             
-            character = Character(
-                project_id=project_id,
-                name=char_data.get("name"),
-                age=char_data.get("age"),
-                gender=char_data.get("gender"),
-                is_organization=char_data.get("is_organization", False),
-                role_type=char_data.get("role_type"),
-                personality=char_data.get("personality"),
-                background=char_data.get("background"),
-                appearance=char_data.get("appearance"),
-                traits=traits,
-                organization_type=char_data.get("organization_type"),
-                organization_purpose=char_data.get("organization_purpose")
-            )
-            db.add(character)
-            await db.flush()  # 获取ID
-            char_mapping[char_data.get("name")] = character.id
+            char_id = ImportExportService._new_id()
+            rows.append({
+                "id": char_id,
+                "project_id": project_id,
+                "name": char_data.get("name"),
+                "age": char_data.get("age"),
+                "gender": char_data.get("gender"),
+                "is_organization": char_data.get("is_organization", False),
+                "role_type": char_data.get("role_type"),
+                "personality": char_data.get("personality"),
+                "background": char_data.get("background"),
+                "appearance": char_data.get("appearance"),
+                "traits": traits,
+                "organization_type": char_data.get("organization_type"),
+                "organization_purpose": char_data.get("organization_purpose"),
+            })
+            char_mapping[char_data.get("name")] = char_id
         
+        await ImportExportService._bulk_insert(db, Character, rows)
         return char_mapping
     
     @staticmethod
@@ -947,19 +1424,21 @@ class ImportExportService:
     ) -> Dict[str, str]:
         """导入大纲，返回标题到ID的映射"""
         outline_mapping = {}
+        rows = []
         
         for ol_data in outlines_data:
-            outline = Outline(
-                project_id=project_id,
-                title=ol_data.get("title"),
-                content=ol_data.get("content"),
-                structure=ol_data.get("structure"),
-                order_index=ol_data.get("order_index")
-            )
-            db.add(outline)
-            await db.flush()  # 获取ID
-            outline_mapping[ol_data.get("title")] = outline.id
-        
+            outline_id = ImportExportService._new_id()
+            rows.append({
+                "id": outline_id,
+                "project_id": project_id,
+                "title": ol_data.get("title"),
+                "content": ol_data.get("content"),
+                "structure": ol_data.get("structure"),
+                "order_index": ol_data.get("order_index"),
+            })
+            outline_mapping[ol_data.get("title")] = outline_id
+        
+        await ImportExportService._bulk_insert(db, Outline, rows)
         return outline_mapping
     
     @staticmethod
@@ -970,30 +1449,27 @@ class ImportExportService:
         db: AsyncSession
     ) -> int:
         """导入关系"""
-        count = 0
+        rows = []
         for rel_data in relationships_data:
-            source_name = rel_data.get("source_name")
-            target_name = rel_data.get("target_name")
-            
             # 查找角色ID
-            source_id = char_mapping.get(source_name)
-            target_id = char_mapping.get(target_name)
+            source_id = char_mapping.get(rel_data.get("source_name"))
+            target_id = char_mapping.get(rel_data.get("target_name"))
             
             if source_id and target_id:
-                relationship = CharacterRelationship(
-                    project_id=project_id,
-                    character_from_id=source_id,
-                    character_to_id=target_id,
-                    relationship_name=rel_data.get("relationship_name"),
-                    intimacy_level=rel_data.get("intimacy_level", 50),
-                    status=rel_data.get("status", "active"),
-                    description=rel_data.get("description"),
-                    started_at=rel_data.get("started_at")
-                )
-                db.add(relationship)
-                count += 1
-        
-        return count
+                rows.append({
+                    "id": ImportExportService._new_id(),
+                    "project_id": project_id,
+                    "character_from_id": source_id,
+                    "character_to_id": target_id,
+                    "relationship_name": rel_data.get("relationship_name"),
+                    "intimacy_level": rel_data.get("intimacy_level", 50),
+                    "status": rel_data.get("status", "active"),
+                    "description": rel_data.get("description"),
+                    "started_at": rel_data.get("started_at"),
+                })
+        
+        await ImportExportService._bulk_insert(db, CharacterRelationship, rows)
+        return len(rows)
     
     @staticmethod
     async def _import_organizations(
@@ -1004,44 +1480,40 @@ class ImportExportService:
     ) -> Dict[str, str]:
         """导入组织详情，返回名称到ID的映射"""
         org_mapping = {}
+        rows = []
+        parent_names = []
         
-        # 第一遍：创建所有组织（不设置父组织）
-        temp_orgs = []
+        # 第一遍：生成所有组织（不设置父组织）
         for org_data in organizations_data:
             char_name = org_data.get("character_name")
             char_id = char_mapping.get(char_name)
             
             if char_id:
-                organization = Organization(
-                    project_id=project_id,
-                    character_id=char_id,
-                    power_level=org_data.get("power_level", 50),
-                    member_count=org_data.get("member_count", 0),
-                    location=org_data.get("location"),
-                    motto=org_data.get("motto"),
-                    color=org_data.get("color")
-                )
-                db.add(organization)
-                temp_orgs.append((organization, org_data.get("parent_org_name")))
-        
-        await db.flush()  # 获取所有组织的ID
-        
-        # 建立名称到ID的映射
-        for org, _ in temp_orgs:
-            # 通过character_id查找角色名
-            result = await db.execute(
-                select(Character).where(Character.id == org.character_id)
-            )
-            char = result.scalar_one_or_none()
-            if char:
-                org_mapping[char.name] = org.id
-        
-        # 第二遍：设置父组织关系
-        for org, parent_name in temp_orgs:
+                org_id = ImportExportService._new_id()
+                rows.append({
+                    "id": org_id,
+                    "project_id": project_id,
+                    "character_id": char_id,
+                    "power_level": org_data.get("power_level", 50),
+                    "member_count": org_data.get("member_count", 0),
+                    "location": org_data.get("location"),
+                    "motto": org_data.get("motto"),
+                    "color": org_data.get("color"),
+                })
+                parent_names.append(org_data.get("parent_org_name"))
+                org_mapping[char_name] = org_id
+        
+        await ImportExportService._bulk_insert(db, Organization, rows)
+        
+        # 第二遍：设置父组织关系（父组织可能排在子组织之后，插入完成后再更新）
+        parent_updates = []
+        for row, parent_name in zip(rows, parent_names):
             if parent_name:
                 parent_id = org_mapping.get(parent_name)
                 if parent_id:
-                    org.parent_org_id = parent_id
+                    parent_updates.append({"id": row["id"], "parent_org_id": parent_id})
+        if parent_updates:
+            await db.execute(update(Organization), parent_updates)
         
         return org_mapping
     
@@ -1053,30 +1525,27 @@ class ImportExportService:
         db: AsyncSession
     ) -> int:
         """导入组织成员"""
-        count = 0
+        rows = []
         for member_data in org_members_data:
-            org_name = member_data.get("organization_name")
-            char_name = member_data.get("character_name")
-            
-            org_id = org_mapping.get(org_name)
-            char_id = char_mapping.get(char_name)
+            org_id = org_mapping.get(member_data.get("organization_name"))
+            char_id = char_mapping.get(member_data.get("character_name"))
             
             if org_id and char_id:
-                member = OrganizationMember(
-                    organization_id=org_id,
-                    character_id=char_id,
-                    position=member_data.get("position"),
-                    rank=member_data.get("rank", 0),
-                    status=member_data.get("status", "active"),
-                    joined_at=member_data.get("joined_at"),
-                    loyalty=member_data.get("loyalty", 50),
-                    contribution=member_data.get("contribution", 0),
-                    notes=member_data.get("notes")
-                )
-                db.add(member)
-                count += 1
-        
-        return count
+                rows.append({
+                    "id": ImportExportService._new_id(),
+                    "organization_id": org_id,
+                    "character_id": char_id,
+                    "position": member_data.get("position"),
+                    "rank": member_data.get("rank", 0),
+                    "status": member_data.get("status", "active"),
+                    "joined_at": member_data.get("joined_at"),
+                    "loyalty": member_data.get("loyalty", 50),
+                    "contribution": member_data.get("contribution", 0),
+                    "notes": member_data.get("notes"),
+                })
+        
+        await ImportExportService._bulk_insert(db, OrganizationMember, rows)
+        return len(rows)
     
     @staticmethod
     async def _import_writing_styles(
@@ -1085,41 +1554,47 @@ class ImportExportService:
         db: AsyncSession
     ) -> int:
         """导入写作风格（用户自定义风格）"""
+        if not styles_data:
+            return 0
+        
         # 获取项目所属用户
         project_result = await db.execute(
-            select(Project).where(Project.id == project_id)
+            select(Project.user_id).where(Project.id == project_id)
         )
-        project = project_result.scalar_one_or_none()
-        if not project:
+        user_id = project_result.scalar_one_or_none()
+        if not user_id:
             return 0
         
-        count = 0
-        for style_data in styles_data:
-            # 检查是否已存在同名风格（避免重复导入）
-            existing = await db.execute(
-                select(WritingStyle).where(
-                    WritingStyle.user_id == project.user_id,
-                    WritingStyle.name == style_data.get("name")
-                )
-            )
-            # 使用 first() 避免多行时报错
-            if existing.first():
-                logger.debug(f"风格 {style_data.get('name')} 已存在，跳过导入")
-                continue
-            
-            style = WritingStyle(
-                user_id=project.user_id,  # 使用 user_id 而不是 project_id
-                name=style_data.get("name"),
-                style_type=style_data.get("style_type"),
-                preset_id=style_data.get("preset_id"),
-                description=style_data.get("description"),
-                prompt_content=style_data.get("prompt_content"),
-                order_index=style_data.get("order_index", 0)
+        # 一次查询已存在的同名风格（避免重复导入）
+        names = [style_data.get("name") for style_data in styles_data]
+        existing_result = await db.execute(
+            select(WritingStyle.name).where(
+                WritingStyle.user_id == user_id,
+                WritingStyle.name.in_(names)
             )
-            db.add(style)
-            count += 1
+        )
+        seen_names = set(existing_result.scalars().all())
         
-        return count
+        rows = []
+        for style_data in styles_data:
+            name = style_data.get("name")
+            if name in seen_names:
+                logger.debug(f"风格 {name} 已存在，跳过导入")
+                continue
+            seen_names.add(name)
+            
+            rows.append({
+                "user_id": user_id,  # 使用 user_id 而不是 project_id
+                "name": name,
+                "style_type": style_data.get("style_type"),
+                "preset_id": style_data.get("preset_id"),
+                "description": style_data.get("description"),
+                "prompt_content": style_data.get("prompt_content"),
+                "order_index": style_data.get("order_index", 0),
+            })
+        
+        await ImportExportService._bulk_insert(db, WritingStyle, rows)
+        return len(rows)
     
     @staticmethod
     async def _import_careers(
@@ -1129,26 +1604,28 @@ class ImportExportService:
     ) -> Dict[str, str]:
         """导入职业，返回名称到ID的映射"""
         career_mapping = {}
+        rows = []
         
         for career_data in careers_data:
-            career = Career(
-                project_id=project_id,
-                name=career_data.get("name"),
-                type=career_data.get("type", "main"),
-                description=career_data.get("description"),
-                category=career_data.get("category"),
-                stages=career_data.get("stages", "[]"),
-                max_stage=career_data.get("max_stage", 10),
-                requirements=career_data.get("requirements"),
-                special_abilities=career_data.get("special_abilities"),
-                worldview_rules=career_data.get("worldview_rules"),
-                attribute_bonuses=career_data.get("attribute_bonuses"),
-                source=career_data.get("source", "ai")
-            )
-            db.add(career)
-            await db.flush()
-            career_mapping[career_data.get("name")] = career.id
-        
+            career_id = ImportExportService._new_id()
+            rows.append({
+                "id": career_id,
+                "project_id": project_id,
+                "name": career_data.get("name"),
+                "type": career_data.get("type", "main"),
+                "description": career_data.get("description"),
+                "category": career_data.get("category"),
+                "stages": career_data.get("stages", "[]"),
+                "max_stage": career_data.get("max_stage", 10),
+                "requirements": career_data.get("requirements"),
+                "special_abilities": career_data.get("special_abilities"),
+                "worldview_rules": career_data.get("worldview_rules"),
+                "attribute_bonuses": career_data.get("attribute_bonuses"),
+                "source": career_data.get("source", "ai"),
+            })
+            career_mapping[career_data.get("name")] = career_id
+        
+        await ImportExportService._bulk_insert(db, Career, rows)
         return career_mapping
     
     @staticmethod
@@ -1159,49 +1636,56 @@ class ImportExportService:
         db: AsyncSession
     ) -> int:
         """导入角色职业关联"""
-        count = 0
+        resolved = []
         for cc_data in character_careers_data:
-            char_name = cc_data.get("character_name")
-            career_name = cc_data.get("career_name")
-            
-            char_id = char_mapping.get(char_name)
-            career_id = career_mapping.get(career_name)
-            
+            char_id = char_mapping.get(cc_data.get("character_name"))
+            career_id = career_mapping.get(cc_data.get("career_name"))
             if char_id and career_id:
-                # 检查是否已存在（使用 first() 避免多行时报错）
-                existing = await db.execute(
-                    select(CharacterCareer).where(
-                        CharacterCareer.character_id == char_id,
-                        CharacterCareer.career_id == career_id
-                    )
-                )
-                if existing.first():
-                    continue
-                
-                char_career = CharacterCareer(
-                    character_id=char_id,
-                    career_id=career_id,
-                    career_type=cc_data.get("career_type", "main"),
-                    current_stage=cc_data.get("current_stage", 1),
-                    stage_progress=cc_data.get("stage_progress", 0),
-                    started_at=cc_data.get("started_at"),
-                    reached_current_stage_at=cc_data.get("reached_current_stage_at"),
-                    notes=cc_data.get("notes")
-                )
-                db.add(char_career)
-                count += 1
-                
-                # 同时更新角色的主职业信息
-                if cc_data.get("career_type") == "main":
-                    char_result = await db.execute(
-                        select(Character).where(Character.id == char_id)
-                    )
-                    char = char_result.scalar_one_or_none()
-                    if char:
-                        char.main_career_id = career_id
-                        char.main_career_stage = cc_data.get("current_stage", 1)
+                resolved.append((char_id, career_id, cc_data))
         
-        return count
+        if not resolved:
+            return 0
+        
+        # 一次查询已存在的关联，跳过重复项
+        existing_result = await db.execute(
+            select(CharacterCareer.character_id, CharacterCareer.career_id).where(
+                CharacterCareer.character_id.in_({char_id for char_id, _, _ in resolved})
+            )
+        )
+        seen_pairs = {(row.character_id, row.career_id) for row in existing_result.all()}
+        
+        rows = []
+        main_career_updates = {}
+        for char_id, career_id, cc_data in resolved:
+            if (char_id, career_id) in seen_pairs:
+                continue
+            seen_pairs.add((char_id, career_id))
+            
+            rows.append({
+                "id": ImportExportService._new_id(),
+                "character_id": char_id,
+                "career_id": career_id,
+                "career_type": cc_data.get("career_type", "main"),
+                "current_stage": cc_data.get("current_stage", 1),
+                "stage_progress": cc_data.get("stage_progress", 0),
+                "started_at": cc_data.get("started_at"),
+                "reached_current_stage_at": cc_data.get("reached_current_stage_at"),
+                "notes": cc_data.get("notes"),
+            })
+            
+            # 同时更新角色的主职业信息
+            if cc_data.get("career_type") == "main":
+                main_career_updates[char_id] = {
+                    "id": char_id,
+                    "main_career_id": career_id,
+                    "main_career_stage": cc_data.get("current_stage", 1),
+                }
+        
+        await ImportExportService._bulk_insert(db, CharacterCareer, rows)
+        if main_career_updates:
+            await db.execute(update(Character), list(main_career_updates.values()))
+        
+        return len(rows)
     
     @staticmethod
     async def _import_story_memories(
@@ -1212,7 +1696,7 @@ class ImportExportService:
         db: AsyncSession
     ) -> int:
         """导入故事记忆"""
-        count = 0
+        rows = []
         for mem_data in memories_data:
             # 将章节标题转换为ID
             chapter_id = None
@@ -1230,27 +1714,27 @@ class ImportExportService:
                     if char_mapping.get(name)
                 ]
             
-            memory = StoryMemory(
-                project_id=project_id,
-                chapter_id=chapter_id,
-                memory_type=mem_data.get("memory_type"),
-                title=mem_data.get("title"),
-                content=mem_data.get("content"),
-                full_context=mem_data.get("full_context"),
-                related_characters=related_char_ids,
-                related_locations=mem_data.get("related_locations"),
-                tags=mem_data.get("tags"),
-                importance_score=mem_data.get("importance_score", 0.5),
-                story_timeline=mem_data.get("story_timeline", 0),
-                chapter_position=mem_data.get("chapter_position", 0),
-                text_length=mem_data.get("text_length", 0),
-                is_foreshadow=mem_data.get("is_foreshadow", 0),
-                foreshadow_strength=mem_data.get("foreshadow_strength")
-            )
-            db.add(memory)
-            count += 1
-        
-        return count
+            rows.append({
+                "id": ImportExportService._new_id(),
+                "project_id": project_id,
+                "chapter_id": chapter_id,
+                "memory_type": mem_data.get("memory_type"),
+                "title": mem_data.get("title"),
+                "content": mem_data.get("content"),
+                "full_context": mem_data.get("full_context"),
+                "related_characters": related_char_ids,
+                "related_locations": mem_data.get("related_locations"),
+                "tags": mem_data.get("tags"),
+                "importance_score": mem_data.get("importance_score", 0.5),
+                "story_timeline": mem_data.get("story_timeline", 0),
+                "chapter_position": mem_data.get("chapter_position", 0),
+                "text_length": mem_data.get("text_length", 0),
+                "is_foreshadow": mem_data.get("is_foreshadow", 0),
+                "foreshadow_strength": mem_data.get("foreshadow_strength"),
+            })
+        
+        await ImportExportService._bulk_insert(db, StoryMemory, rows)
+        return len(rows)
     
     @staticmethod
     async def _import_plot_analysis(
@@ -1261,72 +1745,80 @@ class ImportExportService:
         user_id: str = None
     ) -> int:
         """导入剧情分析，同时创建已完成的分析任务记录"""
-        from datetime import datetime
-        
-        count = 0
+        resolved = []
         for analysis_data in plot_data:
-            chapter_title = analysis_data.get("chapter_title")
-            chapter_id = chapter_mapping.get(chapter_title)
-            
-            if not chapter_id:
-                continue  # 跳过找不到章节的分析
-            
-            # 检查是否已存在该章节的分析（使用 first() 避免多行时报错）
-            existing = await db.execute(
-                select(PlotAnalysis).where(PlotAnalysis.chapter_id == chapter_id)
+            chapter_id = chapter_mapping.get(analysis_data.get("chapter_title"))
+            if chapter_id:
+                resolved.append((chapter_id, analysis_data))
+            # 跳过找不到章节的分析
+        
+        if not resolved:
+            return 0
+        
+        # 一次查询已有分析的章节，每个章节只保留一条分析
+        existing_result = await db.execute(
+            select(PlotAnalysis.chapter_id).where(
+                PlotAnalysis.chapter_id.in_({chapter_id for chapter_id, _ in resolved})
             )
-            if existing.first():
+        )
+        analyzed_chapter_ids = set(existing_result.scalars().all())
+        
+        now = datetime.utcnow()
+        rows = []
+        task_rows = []
+        for chapter_id, analysis_data in resolved:
+            if chapter_id in analyzed_chapter_ids:
                 continue
-            
-            analysis = PlotAnalysis(
-                project_id=project_id,
-                chapter_id=chapter_id,
-                plot_stage=analysis_data.get("plot_stage"),
-                conflict_level=analysis_data.get("conflict_level"),
-                conflict_types=analysis_data.get("conflict_types"),
-                emotional_tone=analysis_data.get("emotional_tone"),
-                emotional_intensity=analysis_data.get("emotional_intensity"),
-                emotional_curve=analysis_data.get("emotional_curve"),
-                hooks=analysis_data.get("hooks"),
-                hooks_count=analysis_data.get("hooks_count", 0),
-                hooks_avg_strength=analysis_data.get("hooks_avg_strength"),
-                foreshadows=analysis_data.get("foreshadows"),
-                foreshadows_planted=analysis_data.get("foreshadows_planted", 0),
-                foreshadows_resolved=analysis_data.get("foreshadows_resolved", 0),
-                plot_points=analysis_data.get("plot_points"),
-                plot_points_count=analysis_data.get("plot_points_count", 0),
-                character_states=analysis_data.get("character_states"),
-                scenes=analysis_data.get("scenes"),
-                pacing=analysis_data.get("pacing"),
-                overall_quality_score=analysis_data.get("overall_quality_score"),
-                pacing_score=analysis_data.get("pacing_score"),
-                engagement_score=analysis_data.get("engagement_score"),
-                coherence_score=analysis_data.get("coherence_score"),
-                analysis_report=analysis_data.get("analysis_report"),
-                suggestions=analysis_data.get("suggestions"),
-                word_count=analysis_data.get("word_count"),
-                dialogue_ratio=analysis_data.get("dialogue_ratio"),
-                description_ratio=analysis_data.get("description_ratio")
-            )
-            db.add(analysis)
+            analyzed_chapter_ids.add(chapter_id)
+            
+            rows.append({
+                "id": ImportExportService._new_id(),
+                "project_id": project_id,
+                "chapter_id": chapter_id,
+                "plot_stage": analysis_data.get("plot_stage"),
+                "conflict_level": analysis_data.get("conflict_level"),
+                "conflict_types": analysis_data.get("conflict_types"),
+                "emotional_tone": analysis_data.get("emotional_tone"),
+                "emotional_intensity": analysis_data.get("emotional_intensity"),
+                "emotional_curve": analysis_data.get("emotional_curve"),
+                "hooks": analysis_data.get("hooks"),
+                "hooks_count": analysis_data.get("hooks_count", 0),
+                "hooks_avg_strength": analysis_data.get("hooks_avg_strength"),
+                "foreshadows": analysis_data.get("foreshadows"),
+                "foreshadows_planted": analysis_data.get("foreshadows_planted", 0),
+                "foreshadows_resolved": analysis_data.get("foreshadows_resolved", 0),
+                "plot_points": analysis_data.get("plot_points"),
+                "plot_points_count": analysis_data.get("plot_points_count", 0),
+                "character_states": analysis_data.get("character_states"),
+                "scenes": analysis_data.get("scenes"),
+                "pacing": analysis_data.get("pacing"),
+                "overall_quality_score": analysis_data.get("overall_quality_score"),
+                "pacing_score": analysis_data.get("pacing_score"),
+                "engagement_score": analysis_data.get("engagement_score"),
+                "coherence_score": analysis_data.get("coherence_score"),
+                "analysis_report": analysis_data.get("analysis_report"),
+                "suggestions": analysis_data.get("suggestions"),
+                "word_count": analysis_data.get("word_count"),
+                "dialogue_ratio": analysis_data.get("dialogue_ratio"),
+                "description_ratio": analysis_data.get("description_ratio"),
+            })
             
             # 同时创建已完成的分析任务记录，这样章节管理页面会显示"已分析"状态
             if user_id:
-                now = datetime.utcnow()
-                analysis_task = AnalysisTask(
-                    chapter_id=chapter_id,
-                    user_id=user_id,
-                    project_id=project_id,
-                    status='completed',
-                    progress=100,
-                    started_at=now,
-                    completed_at=now
-                )
-                db.add(analysis_task)
-            
-            count += 1
-        
-        return count
+                task_rows.append({
+                    "id": ImportExportService._new_id(),
+                    "chapter_id": chapter_id,
+                    "user_id": user_id,
+                    "project_id": project_id,
+                    "status": 'completed',
+                    "progress": 100,
+                    "started_at": now,
+                    "completed_at": now,
+                })
+        
+        await ImportExportService._bulk_insert(db, PlotAnalysis, rows)
+        await ImportExportService._bulk_insert(db, AnalysisTask, task_rows)
+        return len(rows)
     
     @staticmethod
     async def _import_project_default_style(
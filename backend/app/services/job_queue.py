@@ -0,0 +1,401 @@
+"""持久化后台任务队列
+
+批量生成、章节分析等长任务登记在 generation_jobs 表中，由 worker 领取执行，
+Web进程重启或发布时任务不会丢失：
+- PostgreSQL 使用 SELECT ... FOR UPDATE SKIP LOCKED 领取，多个worker互不阻塞
+- SQLite 不支持行锁，按状态条件更新（乐观领取）并定期轮询
+- 领取后持有租约并定期心跳续约；租约过期（worker崩溃）的任务重新入队，超过最大次数则标记失败
+- 每个用户同时执行的任务数受上限约束，单个用户的大批量任务不会占满所有worker
+
+worker 可以运行在Web进程内（JOB_WORKER_EMBEDDED），也可以通过 scripts/run_job_worker.py 独立部署，
+生成吞吐量随worker进程数扩展，与API进程数无关。
+"""
+import asyncio
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import background_session
+from app.logger import get_logger
+from app.models.analysis_task import AnalysisTask
+from app.models.batch_generation_task import BatchGenerationTask
+from app.models.generation_job import GenerationJob
+from app.services.ai_clients.rate_limiter import set_current_user_id, reset_current_user_id
+
+logger = get_logger(__name__)
+
+# 任务类型
+JOB_BATCH_GENERATION = "batch_generation"
+JOB_CHAPTER_ANALYSIS = "chapter_analysis"
+
+# 任务类型对应的业务任务表（任务最终失败时同步更新其状态，避免停留在 running）
+_TASK_MODELS = {
+    JOB_BATCH_GENERATION: BatchGenerationTask,
+    JOB_CHAPTER_ANALYSIS: AnalysisTask,
+}
+
+# 队列表位于共享数据库，worker 不属于任何用户，使用固定标识获取会话
+_QUEUE_SESSION_KEY = "_job_queue_"
+
+_is_sqlite = 'sqlite' in settings.database_url.lower()
+
+JobHandler = Callable[[GenerationJob], Awaitable[None]]
+
+# 本进程内运行的worker的唤醒事件（入队后立即领取，无需等待下一次轮询）
+_wakeup_events: Set[asyncio.Event] = set()
+
+
+def notify_job_enqueued() -> None:
+    """唤醒本进程内的worker"""
+    for event in _wakeup_events:
+        event.set()
+
+
+def _get_job_handlers() -> Dict[str, JobHandler]:
+    """任务类型与执行函数的映射（延迟导入，避免与API模块循环依赖）"""
+    from app.api.chapters import run_batch_generation_job, run_chapter_analysis_job
+    return {
+        JOB_BATCH_GENERATION: run_batch_generation_job,
+        JOB_CHAPTER_ANALYSIS: run_chapter_analysis_job,
+    }
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    job_type: str,
+    user_id: str,
+    task_id: str,
+    project_id: Optional[str] = None,
+    payload: Optional[Dict[str, Any]] = None
+) -> GenerationJob:
+    """
+    登记后台任务并提交
+
+    与调用方会话中尚未提交的业务任务记录（如 AnalysisTask）在同一事务中提交，
+    不会出现任务记录已创建、队列中却没有对应任务的情况。
+
+    Args:
+        db: 调用方的数据库会话
+        job_type: 任务类型
+        user_id: 用户ID
+        task_id: 关联的业务任务ID
+        project_id: 项目ID
+        payload: 执行参数（需可JSON序列化）
+    """
+    job = GenerationJob(
+        job_type=job_type,
+        user_id=user_id,
+        project_id=project_id,
+        task_id=task_id,
+        payload=payload or {},
+        status='queued',
+        attempts=0,
+        max_attempts=max(settings.job_max_attempts, 1),
+        available_at=datetime.now()
+    )
+    db.add(job)
+    await db.commit()
+    notify_job_enqueued()
+    logger.info(f"📥 任务已入队: {job_type} {task_id} (队列任务: {job.id})")
+    return job
+
+
+async def _fail_task(db: AsyncSession, job: GenerationJob, message: str) -> None:
+    """将关联的业务任务标记为失败（仅限未结束的任务）"""
+    model = _TASK_MODELS.get(job.job_type)
+    if model is None:
+        return
+    await db.execute(
+        update(model)
+        .where(model.id == job.task_id)
+        .where(model.status.in_(['pending', 'running']))
+        .values(status='failed', error_message=message[:500], completed_at=datetime.now())
+    )
+
+
+async def claim_job(worker_id: str) -> Optional[GenerationJob]:
+    """
+    领取一个可执行的任务
+
+    跳过同时执行任务数已达上限的用户。多个worker同时领取同一用户的任务时，
+    上限可能被短暂超出（软上限）。
+
+    Returns:
+        领取到的任务（已持有租约），队列为空时返回None
+    """
+    now = datetime.now()
+    busy_users = (
+        select(GenerationJob.user_id)
+        .where(GenerationJob.status == 'running')
+        .group_by(GenerationJob.user_id)
+        .having(func.count() >= max(settings.job_max_running_per_user, 1))
+    )
+    stmt = (
+        select(GenerationJob)
+        .where(GenerationJob.status == 'queued')
+        .where(GenerationJob.available_at <= now)
+        .where(GenerationJob.user_id.not_in(busy_users))
+        .order_by(GenerationJob.available_at, GenerationJob.created_at)
+        .limit(1)
+    )
+    if not _is_sqlite:
+        # 已被其他worker锁定的行直接跳过，并发领取互不等待
+        stmt = stmt.with_for_update(skip_locked=True)
+
+    async with background_session(_QUEUE_SESSION_KEY) as db:
+        job = (await db.execute(stmt)).scalar_one_or_none()
+        if job is None:
+            return None
+
+        # 条件更新：SQLite下若已被其他worker抢先领取则影响0行
+        result = await db.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id == job.id)
+            .where(GenerationJob.status == 'queued')
+            .values(
+                status='running',
+                worker_id=worker_id,
+                attempts=GenerationJob.attempts + 1,
+                started_at=now,
+                heartbeat_at=now,
+                lease_expires_at=now + timedelta(seconds=settings.job_lease_seconds),
+                finished_at=None
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            await db.rollback()
+            return None
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+
+async def renew_lease(job_id: str, worker_id: str) -> bool:
+    """心跳续约，返回False表示租约已失效（任务已被回收或重新分配）"""
+    now = datetime.now()
+    async with background_session(_QUEUE_SESSION_KEY) as db:
+        result = await db.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id == job_id)
+            .where(GenerationJob.worker_id == worker_id)
+            .where(GenerationJob.status == 'running')
+            .values(heartbeat_at=now, lease_expires_at=now + timedelta(seconds=settings.job_lease_seconds))
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+
+async def complete_job(job_id: str, worker_id: str) -> None:
+    """标记任务执行完成"""
+    async with background_session(_QUEUE_SESSION_KEY) as db:
+        await db.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id == job_id)
+            .where(GenerationJob.worker_id == worker_id)
+            .values(status='completed', finished_at=datetime.now(), lease_expires_at=None)
+        )
+        await db.commit()
+
+
+async def retry_or_fail_job(job: GenerationJob, worker_id: str, error: str) -> None:
+    """执行异常：未达最大次数时延迟重新入队，否则标记任务及关联业务任务失败"""
+    now = datetime.now()
+    async with background_session(_QUEUE_SESSION_KEY) as db:
+        if job.attempts < job.max_attempts:
+            delay = min(10 * 2 ** (job.attempts - 1), 300)
+            values = dict(status='queued', available_at=now + timedelta(seconds=delay))
+            logger.warning(f"⏳ 任务执行失败，{delay}秒后重试: {job.id} ({job.attempts}/{job.max_attempts})")
+        else:
+            values = dict(status='failed', finished_at=now)
+            await _fail_task(db, job, f"任务执行失败: {error}")
+            logger.error(f"❌ 任务已达最大执行次数，标记失败: {job.id}")
+        await db.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id == job.id)
+            .where(GenerationJob.worker_id == worker_id)
+            .values(worker_id=None, lease_expires_at=None, error_message=error[:2000], **values)
+        )
+        await db.commit()
+
+
+async def release_job(job_id: str, worker_id: str) -> None:
+    """worker正常停止时归还任务（不计入执行次数），由其他worker或重启后的worker继续执行"""
+    async with background_session(_QUEUE_SESSION_KEY) as db:
+        await db.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id == job_id)
+            .where(GenerationJob.worker_id == worker_id)
+            .where(GenerationJob.status == 'running')
+            .values(
+                status='queued',
+                attempts=GenerationJob.attempts - 1,
+                available_at=datetime.now(),
+                worker_id=None,
+                lease_expires_at=None
+            )
+        )
+        await db.commit()
+
+
+async def recover_expired_jobs() -> int:
+    """
+    回收租约过期的任务（worker崩溃或被强制终止）
+
+    未达最大次数的重新入队，否则标记任务及关联业务任务失败。
+
+    Returns:
+        回收的任务数
+    """
+    now = datetime.now()
+    stmt = (
+        select(GenerationJob)
+        .where(GenerationJob.status == 'running')
+        .where(GenerationJob.lease_expires_at < now)
+    )
+    if not _is_sqlite:
+        stmt = stmt.with_for_update(skip_locked=True)
+
+    async with background_session(_QUEUE_SESSION_KEY) as db:
+        expired = (await db.execute(stmt)).scalars().all()
+        for job in expired:
+            logger.warning(f"⚠️ 任务租约过期（worker {job.worker_id} 失联）: {job.job_type} {job.id}")
+            job.worker_id = None
+            job.lease_expires_at = None
+            if job.attempts >= job.max_attempts:
+                job.status = 'failed'
+                job.finished_at = now
+                job.error_message = "worker中断次数过多，任务终止"
+                await _fail_task(db, job, f"任务执行中断（已执行{job.attempts}次）")
+            else:
+                job.status = 'queued'
+                job.available_at = now
+        if expired:
+            await db.commit()
+        return len(expired)
+
+
+async def get_queue_stats() -> Dict[str, Any]:
+    """按状态统计队列任务数"""
+    async with background_session(_QUEUE_SESSION_KEY) as db:
+        result = await db.execute(
+            select(GenerationJob.status, func.count()).group_by(GenerationJob.status)
+        )
+        return {status: count for status, count in result.all()}
+
+
+class JobWorker:
+    """
+    任务队列worker：循环领取任务并在本进程内并发执行
+
+    用法:
+        worker = JobWorker()
+        task = asyncio.create_task(worker.run())
+        ...
+        await worker.stop()
+    """
+
+    def __init__(self, worker_id: Optional[str] = None, concurrency: Optional[int] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.concurrency = max(concurrency or settings.job_worker_concurrency, 1)
+        self._running: Dict[str, asyncio.Task] = {}
+        self._lost_leases: Set[str] = set()
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._last_recover = 0.0
+
+    async def run(self) -> None:
+        """主循环：回收过期租约、领取任务，直到 stop() 被调用"""
+        _wakeup_events.add(self._wakeup)
+        logger.info(f"🧵 任务队列worker已启动: {self.worker_id}，并发: {self.concurrency}")
+        try:
+            while not self._stopping:
+                try:
+                    if time.monotonic() - self._last_recover >= settings.job_heartbeat_interval:
+                        self._last_recover = time.monotonic()
+                        await recover_expired_jobs()
+
+                    while not self._stopping and len(self._running) < self.concurrency:
+                        job = await claim_job(self.worker_id)
+                        if job is None:
+                            break
+                        self._start(job)
+                except Exception as e:
+                    logger.error(f"❌ 任务队列轮询失败: {str(e)}")
+
+                # 等待新任务入队、任务结束或轮询间隔到期
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.job_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+        finally:
+            _wakeup_events.discard(self._wakeup)
+            logger.info(f"🧵 任务队列worker已停止: {self.worker_id}")
+
+    async def stop(self) -> None:
+        """停止领取新任务，中断执行中的任务并归还（批量生成在下次执行时从最后完成的章节恢复）"""
+        self._stopping = True
+        self._wakeup.set()
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            logger.info(f"🛑 正在归还 {len(tasks)} 个执行中的任务...")
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _start(self, job: GenerationJob) -> None:
+        task = asyncio.create_task(self._execute(job))
+        self._running[job.id] = task
+
+        def on_done(_task: asyncio.Task) -> None:
+            self._running.pop(job.id, None)
+            self._lost_leases.discard(job.id)
+            self._wakeup.set()
+
+        task.add_done_callback(on_done)
+
+    async def _heartbeat(self, job: GenerationJob, runner: asyncio.Task) -> None:
+        """定期续约；租约已被回收时中断执行，避免与接手的worker重复执行"""
+        while True:
+            await asyncio.sleep(settings.job_heartbeat_interval)
+            try:
+                if not await renew_lease(job.id, self.worker_id):
+                    logger.warning(f"⚠️ 任务租约已失效，停止执行: {job.id}")
+                    self._lost_leases.add(job.id)
+                    runner.cancel()
+                    return
+            except Exception as e:
+                logger.warning(f"⚠️ 任务心跳失败: {job.id}: {str(e)}")
+
+    async def _execute(self, job: GenerationJob) -> None:
+        """执行单个任务，AI请求按任务所属用户公平排队"""
+        token = set_current_user_id(job.user_id)
+        heartbeat = asyncio.create_task(self._heartbeat(job, asyncio.current_task()))
+        try:
+            handler = _get_job_handlers().get(job.job_type)
+            if handler is None:
+                raise ValueError(f"未知的任务类型: {job.job_type}")
+
+            logger.info(f"▶️ 开始执行任务: {job.job_type} {job.task_id}（第{job.attempts}次）")
+            await handler(job)
+        except asyncio.CancelledError:
+            if job.id not in self._lost_leases and self._stopping:
+                await release_job(job.id, self.worker_id)
+            raise
+        except Exception as e:
+            logger.error(f"❌ 任务执行异常: {job.job_type} {job.task_id}: {str(e)}", exc_info=True)
+            await retry_or_fail_job(job, self.worker_id, str(e))
+        else:
+            await complete_job(job.id, self.worker_id)
+            logger.info(f"✅ 任务执行结束: {job.job_type} {job.task_id}")
+        finally:
+            heartbeat.cancel()
+            reset_current_user_id(token)
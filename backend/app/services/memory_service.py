@@ -1,15 +1,34 @@
 """向量记忆服务 - 基于ChromaDB实现长期记忆和语义检索"""
 import chromadb
-from sentence_transformers import SentenceTransformer
 from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import json
+import threading
+import time
 from datetime import datetime
+from app.config import settings
 from app.logger import get_logger
 import os
 import hashlib
 
 logger = get_logger(__name__)
 
+# Embedding执行器统计（用于监控推理排队和耗时）
+_embedding_stats = {
+    "queued": 0,  # 已提交但尚未开始推理的任务数
+    "running": 0,  # 正在推理的任务数
+    "completed": 0,
+    "errors": 0,
+    "texts_encoded": 0,
+    "total_encode_seconds": 0.0,
+    "max_encode_seconds": 0.0,
+    "last_encode_seconds": 0.0,
+    "total_wait_seconds": 0.0,
+}
+_embedding_stats_lock = threading.Lock()
+
 # 配置模型缓存目录
 # 优先使用 backend/embedding 目录（打包后的实际位置）
 import sys
@@ -72,6 +91,11 @@ class MemoryService:
     _instance = None
     _initialized = False
     
+    # 多查询检索时每个查询的候选预取倍数
+    MULTI_QUERY_OVERFETCH = 5
+    # 统计记忆时每页读取的元数据条数
+    STATS_PAGE_SIZE = 1000
+    
     def __new__(cls):
         """单例模式"""
         if cls._instance is None:
@@ -79,7 +103,7 @@ class MemoryService:
         return cls._instance
     
     def __init__(self):
-        """初始化ChromaDB和Embedding模型"""
+        """初始化ChromaDB客户端和Embedding执行器（模型延迟加载）"""
         if self._initialized:
             return
             
@@ -91,147 +115,429 @@ class MemoryService:
             # 初始化ChromaDB客户端(使用新API - PersistentClient)
             self.client = chromadb.PersistentClient(path=chroma_dir)
             
-            # 初始化多语言embedding模型(支持中文)
-            logger.info("🔄 正在加载Embedding模型...")
+            # Embedding模型延迟加载：首次使用或后台预热(warmup)时才加载，
+            # 避免导入本模块时阻塞应用启动
+            self._embedding_model = None
+            self._model_lock = threading.Lock()
+            self._model_state = "not_loaded"  # not_loaded / loading / ready / failed
+            self._model_error: Optional[str] = None
+            self._model_load_seconds: Optional[float] = None
             
-            # 使用环境变量中配置的模型目录
-            model_cache_dir = os.environ.get('SENTENCE_TRANSFORMERS_HOME', 'embedding')
-            os.makedirs(model_cache_dir, exist_ok=True)
-            logger.info(f"📂 使用模型缓存目录: {os.path.abspath(model_cache_dir)}")
+            # Embedding推理专用线程池：模型推理是CPU密集型同步调用，
+            # 放到线程池中执行，避免阻塞uvicorn事件循环（SSE流等）
+            self._embedding_executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.embedding_executor_workers),
+                thread_name_prefix="embedding"
+            )
             
-            # 调试信息：打印环境变量和路径
-            logger.info(f"📂 当前工作目录: {os.getcwd()}")
-            logger.info(f"📂 模型缓存目录: {os.path.abspath(model_cache_dir)}")
-            logger.info(f"🔧 SENTENCE_TRANSFORMERS_HOME: {os.environ.get('SENTENCE_TRANSFORMERS_HOME', '未设置')}")
-            logger.info(f"🔧 TRANSFORMERS_OFFLINE: {os.environ.get('TRANSFORMERS_OFFLINE', '未设置')}")
-            logger.info(f"🔧 HF_HUB_OFFLINE: {os.environ.get('HF_HUB_OFFLINE', '未设置')}")
+            # Collection句柄缓存：key为(user_id, project_id)，避免热路径上重复
+            # 计算哈希和 get_or_create_collection 的元数据查询
+            self._collection_cache: Dict[tuple, Any] = {}
             
-            # 检查模型目录内容
-            abs_cache_dir = os.path.abspath(model_cache_dir)
-            logger.info(f"📂 检查模型缓存目录: {abs_cache_dir}")
+            # 查询向量LRU缓存：key为查询文本的SHA256，避免重复编码固定查询和同一大纲
+            self._query_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+            self._query_cache_hits = 0
+            self._query_cache_misses = 0
+            
+            self._initialized = True
+            logger.info("✅ MemoryService初始化成功")
+            logger.info(f"  - ChromaDB目录: {chroma_dir}")
+            logger.info(f"  - Embedding模型: paraphrase-multilingual-MiniLM-L12-v2 (延迟加载)")
+            logger.info(f"  - Embedding线程池: {settings.embedding_executor_workers}")
             
-            if os.path.exists(abs_cache_dir):
-                logger.info(f"📁 模型目录存在，检查内容...")
+        except Exception as e:
+            logger.error(f"❌ MemoryService初始化失败: {str(e)}")
+            raise
+    
+    @property
+    def embedding_model(self):
+        """
+        Embedding模型(首次访问时加载，线程安全)
+        
+        应在Embedding线程池中访问，避免在事件循环中触发耗时的模型加载。
+        """
+        if self._embedding_model is not None:
+            return self._embedding_model
+        
+        with self._model_lock:
+            if self._embedding_model is None:
+                self._model_state = "loading"
+                self._model_error = None
+                started_at = time.perf_counter()
                 try:
-                    items = os.listdir(abs_cache_dir)
-                    logger.info(f"📁 模型目录内容 ({len(items)} 项): {items}")
-                    
-                    # 检查是否有预期的模型文件夹
-                    expected_model_dir = os.path.join(abs_cache_dir, 'models--sentence-transformers--paraphrase-multilingual-MiniLM-L12-v2')
-                    logger.info(f"🔍 检查预期路径: {expected_model_dir}")
-                    
-                    if os.path.exists(expected_model_dir):
-                        logger.info(f"✅ 找到本地模型目录!")
-                        # 检查快照目录
-                        snapshots_dir = os.path.join(expected_model_dir, 'snapshots')
-                        if os.path.exists(snapshots_dir):
-                            snapshots = os.listdir(snapshots_dir)
-                            logger.info(f"📁 模型快照 ({len(snapshots)} 个): {snapshots}")
-                            # 检查是否有有效的快照
-                            if snapshots:
-                                logger.info(f"✅ 发现有效快照，可以使用离线模式")
-                    else:
-                        logger.warning(f"⚠️ 未找到本地模型目录")
-                        logger.warning(f"   预期位置: {expected_model_dir}")
+                    self._embedding_model = self._load_embedding_model()
                 except Exception as e:
-                    logger.error(f"❌ 检查模型目录失败: {str(e)}")
-                    import traceback
-                    logger.error(f"   堆栈: {traceback.format_exc()}")
-            else:
-                logger.warning(f"⚠️ 模型目录不存在: {abs_cache_dir}")
-            
+                    self._model_state = "failed"
+                    self._model_error = str(e)
+                    raise
+                self._model_load_seconds = time.perf_counter() - started_at
+                self._model_state = "ready"
+                logger.info(f"✅ Embedding模型就绪，耗时 {self._model_load_seconds:.2f}s")
+        return self._embedding_model
+    
+    async def warmup(self):
+        """在Embedding线程池中预热模型（应用启动后后台调用，不阻塞服务）"""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._embedding_executor, lambda: self.embedding_model)
+        except Exception as e:
+            logger.error(f"❌ Embedding模型预热失败: {str(e)}")
+    
+    def get_model_status(self) -> Dict[str, Any]:
+        """
+        获取Embedding模型加载状态
+        
+        Returns:
+            包含state(not_loaded/loading/ready/failed)、ready、error、load_seconds的字典
+        """
+        return {
+            "state": self._model_state,
+            "ready": self._model_state == "ready",
+            "error": self._model_error,
+            "load_seconds": self._model_load_seconds
+        }
+    
+    def _load_embedding_model(self):
+        """
+        加载多语言Embedding模型(支持中文)
+        
+        同步且耗时(可能需要联网下载)，只应通过 embedding_model 属性在首次使用时
+        或 warmup() 在后台线程中调用，不在模块导入/应用启动时阻塞。
+        
+        Returns:
+            SentenceTransformer模型实例
+        """
+        from sentence_transformers import SentenceTransformer
+        
+        logger.info("🔄 正在加载Embedding模型...")
+        
+        # 使用环境变量中配置的模型目录
+        model_cache_dir = os.environ.get('SENTENCE_TRANSFORMERS_HOME', 'embedding')
+        os.makedirs(model_cache_dir, exist_ok=True)
+        logger.info(f"📂 使用模型缓存目录: {os.path.abspath(model_cache_dir)}")
+        
+        # 调试信息：打印环境变量和路径
+        logger.info(f"📂 当前工作目录: {os.getcwd()}")
+        logger.info(f"📂 模型缓存目录: {os.path.abspath(model_cache_dir)}")
+        logger.info(f"🔧 SENTENCE_TRANSFORMERS_HOME: {os.environ.get('SENTENCE_TRANSFORMERS_HOME', '未设置')}")
+        logger.info(f"🔧 TRANSFORMERS_OFFLINE: {os.environ.get('TRANSFORMERS_OFFLINE', '未设置')}")
+        logger.info(f"🔧 HF_HUB_OFFLINE: {os.environ.get('HF_HUB_OFFLINE', '未设置')}")
+        
+        # 检查模型目录内容
+        abs_cache_dir = os.path.abspath(model_cache_dir)
+        logger.info(f"📂 检查模型缓存目录: {abs_cache_dir}")
+        
+        if os.path.exists(abs_cache_dir):
+            logger.info(f"📁 模型目录存在，检查内容...")
             try:
-                logger.info("🔄 尝试加载主模型: sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
-                
-                # 使用绝对路径检查本地模型
-                abs_cache_dir = os.path.abspath(model_cache_dir)
-                local_model_path = os.path.join(
-                    abs_cache_dir,
-                    'models--sentence-transformers--paraphrase-multilingual-MiniLM-L12-v2'
-                )
+                items = os.listdir(abs_cache_dir)
+                logger.info(f"📁 模型目录内容 ({len(items)} 项): {items}")
                 
-                logger.info(f"🔍 检查本地模型路径: {local_model_path}")
-                logger.info(f"🔍 路径存在检查: {os.path.exists(local_model_path)}")
+                # 检查是否有预期的模型文件夹
+                expected_model_dir = os.path.join(abs_cache_dir, 'models--sentence-transformers--paraphrase-multilingual-MiniLM-L12-v2')
+                logger.info(f"🔍 检查预期路径: {expected_model_dir}")
                 
-                # 检查快照目录是否存在且有内容
-                snapshots_dir = os.path.join(local_model_path, 'snapshots')
-                has_valid_model = False
-                if os.path.exists(snapshots_dir):
-                    try:
+                if os.path.exists(expected_model_dir):
+                    logger.info(f"✅ 找到本地模型目录!")
+                    # 检查快照目录
+                    snapshots_dir = os.path.join(expected_model_dir, 'snapshots')
+                    if os.path.exists(snapshots_dir):
                         snapshots = os.listdir(snapshots_dir)
+                        logger.info(f"📁 模型快照 ({len(snapshots)} 个): {snapshots}")
+                        # 检查是否有有效的快照
                         if snapshots:
-                            logger.info(f"✅ 发现本地模型快照: {snapshots}")
-                            has_valid_model = True
-                    except Exception as e:
-                        logger.warning(f"⚠️ 检查快照失败: {e}")
-                
-                # 优先尝试从本地路径加载
-                if has_valid_model:
-                    logger.info(f"✅ 检测到完整本地模型，使用离线模式加载")
-                    try:
-                        self.embedding_model = SentenceTransformer(
-                            'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2',
-                            cache_folder=abs_cache_dir,
-                            device='cpu',
-                            trust_remote_code=True,
-                            local_files_only=True  # 强制使用本地文件
-                        )
-                        logger.info("✅ Embedding模型加载成功 (离线模式)")
-                    except Exception as local_err:
-                        logger.warning(f"⚠️ 离线模式加载失败: {str(local_err)}")
-                        logger.info("🔄 尝试在线模式...")
-                        raise local_err
+                            logger.info(f"✅ 发现有效快照，可以使用离线模式")
                 else:
-                    logger.info("📥 本地模型不完整或不存在，将联网下载...")
-                    logger.info(f"   下载后将保存到: {abs_cache_dir}")
-                    self.embedding_model = SentenceTransformer(
-                        'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2',
-                        cache_folder=abs_cache_dir,
-                        device='cpu',
-                        trust_remote_code=True,
-                        local_files_only=False  # 允许联网下载
-                    )
-                    logger.info("✅ Embedding模型加载成功 (在线下载)")
+                    logger.warning(f"⚠️ 未找到本地模型目录")
+                    logger.warning(f"   预期位置: {expected_model_dir}")
             except Exception as e:
-                logger.warning(f"⚠️ 无法加载多语言模型: {str(e)}")
-                logger.error(f"❌ 详细错误: {repr(e)}")
+                logger.error(f"❌ 检查模型目录失败: {str(e)}")
                 import traceback
-                logger.error(f"❌ 错误堆栈:\n{traceback.format_exc()}")
-                logger.info("🔄 尝试使用备用模型: sentence-transformers/all-MiniLM-L6-v2")
-                try:
-                    # 降级到更小的模型作为备选
-                    self.embedding_model = SentenceTransformer(
-                        'sentence-transformers/all-MiniLM-L6-v2',
-                        cache_folder=model_cache_dir,
-                        device='cpu',
-                        trust_remote_code=False
-                    )
-                    logger.info("✅ 使用备用Embedding模型 (all-MiniLM-L6-v2)")
-                except Exception as e2:
-                    logger.error(f"❌ 所有模型加载失败: {str(e2)}")
-                    logger.error(f"❌ 详细错误: {repr(e2)}")
-                    import traceback
-                    logger.error(f"❌ 错误堆栈:\n{traceback.format_exc()}")
-                    logger.error("💡 模型首次使用需要联网下载（约420MB）")
-                    logger.error("   或手动下载模型文件到 embedding 目录")
-                    logger.error(f"💡 期望的模型目录结构:")
-                    logger.error(f"   {os.path.abspath(model_cache_dir)}/models--sentence-transformers--paraphrase-multilingual-MiniLM-L12-v2/")
-                    raise RuntimeError("无法加载任何Embedding模型")
+                logger.error(f"   堆栈: {traceback.format_exc()}")
+        else:
+            logger.warning(f"⚠️ 模型目录不存在: {abs_cache_dir}")
+        
+        try:
+            logger.info("🔄 尝试加载主模型: sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
             
-            self._initialized = True
-            logger.info("✅ MemoryService初始化成功")
-            logger.info(f"  - ChromaDB目录: {chroma_dir}")
-            logger.info(f"  - Embedding模型: paraphrase-multilingual-MiniLM-L12-v2")
+            # 使用绝对路径检查本地模型
+            abs_cache_dir = os.path.abspath(model_cache_dir)
+            local_model_path = os.path.join(
+                abs_cache_dir,
+                'models--sentence-transformers--paraphrase-multilingual-MiniLM-L12-v2'
+            )
+            
+            logger.info(f"🔍 检查本地模型路径: {local_model_path}")
+            logger.info(f"🔍 路径存在检查: {os.path.exists(local_model_path)}")
             
+            # 检查快照目录是否存在且有内容
+            snapshots_dir = os.path.join(local_model_path, 'snapshots')
+            has_valid_model = False
+            if os.path.exists(snapshots_dir):
+                try:
+                    snapshots = os.listdir(snapshots_dir)
+                    if snapshots:
+                        logger.info(f"✅ 发现本地模型快照: {snapshots}")
+                        has_valid_model = True
+                except Exception as e:
+                    logger.warning(f"⚠️ 检查快照失败: {e}")
+            
+            # 优先尝试从本地路径加载
+            if has_valid_model:
+                logger.info(f"✅ 检测到完整本地模型，使用离线模式加载")
+                try:
+                    model = self._create_primary_model(
+                        abs_cache_dir,
+                        local_files_only=True  # 强制使用本地文件
+                    )
+                    logger.info("✅ Embedding模型加载成功 (离线模式)")
+                except Exception as local_err:
+                    logger.warning(f"⚠️ 离线模式加载失败: {str(local_err)}")
+                    logger.info("🔄 尝试在线模式...")
+                    raise local_err
+            else:
+                logger.info("📥 本地模型不完整或不存在，将联网下载...")
+                logger.info(f"   下载后将保存到: {abs_cache_dir}")
+                model = self._create_primary_model(
+                    abs_cache_dir,
+                    local_files_only=False  # 允许联网下载
+                )
+                logger.info("✅ Embedding模型加载成功 (在线下载)")
         except Exception as e:
-            logger.error(f"❌ MemoryService初始化失败: {str(e)}")
+            logger.warning(f"⚠️ 无法加载多语言模型: {str(e)}")
+            logger.error(f"❌ 详细错误: {repr(e)}")
+            import traceback
+            logger.error(f"❌ 错误堆栈:\n{traceback.format_exc()}")
+            logger.info("🔄 尝试使用备用模型: sentence-transformers/all-MiniLM-L6-v2")
+            try:
+                # 降级到更小的模型作为备选
+                model = SentenceTransformer(
+                    'sentence-transformers/all-MiniLM-L6-v2',
+                    cache_folder=model_cache_dir,
+                    device='cpu',
+                    trust_remote_code=False
+                )
+                logger.info("✅ 使用备用Embedding模型 (all-MiniLM-L6-v2)")
+            except Exception as e2:
+                logger.error(f"❌ 所有模型加载失败: {str(e2)}")
+                logger.error(f"❌ 详细错误: {repr(e2)}")
+                import traceback
+                logger.error(f"❌ 错误堆栈:\n{traceback.format_exc()}")
+                logger.error("💡 模型首次使用需要联网下载（约420MB）")
+                logger.error("   或手动下载模型文件到 embedding 目录")
+                logger.error(f"💡 期望的模型目录结构:")
+                logger.error(f"   {os.path.abspath(model_cache_dir)}/models--sentence-transformers--paraphrase-multilingual-MiniLM-L12-v2/")
+                raise RuntimeError("无法加载任何Embedding模型")
+        
+        return model
+    
+    @staticmethod
+    def _create_primary_model(cache_folder: str, local_files_only: bool):
+        """
+        按配置的推理后端创建主Embedding模型
+        
+        embedding_backend 为 onnx/openvino 时使用 ONNX Runtime/OpenVINO 运行同一模型，
+        可通过 embedding_model_file 指定量化版本(如 onnx/model_qint8_avx2.onnx)；
+        后端不可用(未安装optimum或模型文件缺失)时回退到PyTorch，保证向量空间一致。
+        
+        Args:
+            cache_folder: 模型缓存目录
+            local_files_only: 是否只使用本地文件
+        
+        Returns:
+            SentenceTransformer模型实例
+        """
+        from sentence_transformers import SentenceTransformer
+        
+        model_kwargs = dict(
+            cache_folder=cache_folder,
+            device='cpu',
+            trust_remote_code=True,
+            local_files_only=local_files_only
+        )
+        
+        backend = (settings.embedding_backend or "torch").lower()
+        if backend != "torch":
+            backend_kwargs: Dict[str, Any] = {"backend": backend}
+            if settings.embedding_model_file:
+                backend_kwargs["model_kwargs"] = {"file_name": settings.embedding_model_file}
+            try:
+                model = SentenceTransformer(
+                    'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2',
+                    **model_kwargs,
+                    **backend_kwargs
+                )
+                logger.info(f"✅ 使用 {backend} 推理后端 (模型文件: {settings.embedding_model_file or '默认'})")
+                return model
+            except Exception as e:
+                logger.warning(f"⚠️ {backend} 推理后端加载失败，回退到PyTorch: {str(e)}")
+        
+        return SentenceTransformer(
+            'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2',
+            **model_kwargs
+        )
+    
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        生成文本向量（在Embedding专用线程池中执行，不阻塞事件循环）
+        
+        Args:
+            texts: 文本列表
+        
+        Returns:
+            与texts一一对应的向量列表
+        """
+        if not texts:
+            return []
+        
+        submitted_at = time.perf_counter()
+        
+        def _encode() -> List[List[float]]:
+            started_at = time.perf_counter()
+            with _embedding_stats_lock:
+                _embedding_stats["queued"] -= 1
+                _embedding_stats["running"] += 1
+                _embedding_stats["total_wait_seconds"] += started_at - submitted_at
+            try:
+                return self._encode_bucketed(texts)
+            finally:
+                elapsed = time.perf_counter() - started_at
+                with _embedding_stats_lock:
+                    _embedding_stats["running"] -= 1
+                    _embedding_stats["total_encode_seconds"] += elapsed
+                    _embedding_stats["last_encode_seconds"] = elapsed
+                    _embedding_stats["max_encode_seconds"] = max(_embedding_stats["max_encode_seconds"], elapsed)
+        
+        with _embedding_stats_lock:
+            _embedding_stats["queued"] += 1
+        loop = asyncio.get_running_loop()
+        try:
+            embeddings = await loop.run_in_executor(self._embedding_executor, _encode)
+        except Exception:
+            with _embedding_stats_lock:
+                _embedding_stats["errors"] += 1
             raise
+        
+        with _embedding_stats_lock:
+            _embedding_stats["completed"] += 1
+            _embedding_stats["texts_encoded"] += len(texts)
+        return embeddings
+    
+    async def embed_query(self, query: str) -> List[float]:
+        """
+        生成查询向量（带LRU缓存）
+        
+        同一查询文本（如固定的情节点查询、重复生成时的同一大纲）只编码一次。
+        
+        Args:
+            query: 查询文本
+        
+        Returns:
+            查询向量
+        """
+        return (await self.embed_queries([query]))[0]
+    
+    async def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        批量生成查询向量（带LRU缓存，未命中的查询合并为一次编码）
+        
+        Args:
+            queries: 查询文本列表
+        
+        Returns:
+            与queries一一对应的查询向量列表
+        """
+        cache_size = settings.embedding_query_cache_size
+        if cache_size <= 0:
+            return await self.embed(queries)
+        
+        cache_keys = [hashlib.sha256(q.encode('utf-8')).hexdigest() for q in queries]
+        embeddings: List[Optional[List[float]]] = [None] * len(queries)
+        missing: Dict[str, List[int]] = {}
+        
+        for i, cache_key in enumerate(cache_keys):
+            cached = self._query_cache.get(cache_key)
+            if cached is not None:
+                self._query_cache.move_to_end(cache_key)
+                self._query_cache_hits += 1
+                embeddings[i] = cached
+            else:
+                missing.setdefault(cache_key, []).append(i)
+        
+        if missing:
+            self._query_cache_misses += len(missing)
+            encoded = await self.embed([queries[indexes[0]] for indexes in missing.values()])
+            for (cache_key, indexes), embedding in zip(missing.items(), encoded):
+                self._query_cache[cache_key] = embedding
+                for i in indexes:
+                    embeddings[i] = embedding
+            while len(self._query_cache) > cache_size:
+                self._query_cache.popitem(last=False)
+        
+        return embeddings
+    
+    def get_query_cache_stats(self) -> Dict[str, Any]:
+        """获取查询向量缓存统计"""
+        total = self._query_cache_hits + self._query_cache_misses
+        return {
+            "size": len(self._query_cache),
+            "max_size": settings.embedding_query_cache_size,
+            "hits": self._query_cache_hits,
+            "misses": self._query_cache_misses,
+            "hit_rate": self._query_cache_hits / total if total else 0.0
+        }
+    
+    def _encode_bucketed(self, texts: List[str]) -> List[List[float]]:
+        """
+        按长度分桶批量编码（在线程池中同步执行）
+        
+        先按文本长度排序再切成 embedding_batch_size 大小的批次，
+        同一批次内长度接近，padding最少；结果按原顺序返回。
+        """
+        batch_size = max(1, settings.embedding_batch_size)
+        if len(texts) <= batch_size:
+            return self.embedding_model.encode(texts, batch_size=batch_size).tolist()
+        
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        for start in range(0, len(order), batch_size):
+            bucket = order[start:start + batch_size]
+            vectors = self.embedding_model.encode(
+                [texts[i] for i in bucket],
+                batch_size=batch_size
+            ).tolist()
+            for i, vector in zip(bucket, vectors):
+                embeddings[i] = vector
+        return embeddings
+    
+    def get_embedding_stats(self) -> Dict[str, Any]:
+        """
+        获取Embedding执行器统计信息
+        
+        Returns:
+            包含排队深度、推理耗时等指标的字典
+        """
+        with _embedding_stats_lock:
+            stats = dict(_embedding_stats)
+        completed = stats["completed"]
+        return {
+            **stats,
+            "workers": self._embedding_executor._max_workers,
+            "avg_encode_seconds": stats["total_encode_seconds"] / max(completed, 1),
+            "avg_wait_seconds": stats["total_wait_seconds"] / max(completed, 1),
+        }
+    
+    def shutdown_executor(self):
+        """关闭Embedding线程池（应用关闭时调用）"""
+        self._embedding_executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("✅ Embedding线程池已关闭")
     
     def get_collection(self, user_id: str, project_id: str):
         """
         获取或创建项目的记忆集合
         
-        每个用户的每个项目有独立的collection,实现数据隔离
+        每个用户的每个项目有独立的collection,实现数据隔离；
+        句柄在进程内缓存，删除项目记忆时失效
         
         Args:
             user_id: 用户ID
@@ -240,21 +546,15 @@ class MemoryService:
         Returns:
             ChromaDB Collection对象
         """
-        # ChromaDB collection命名规则：
-        # 1. 3-63字符（最重要！）
-        # 2. 开头和结尾必须是字母或数字
-        # 3. 只能包含字母、数字、下划线或短横线
-        # 4. 不能包含连续的点(..)
-        # 5. 不能是有效的IPv4地址
+        cache_key = (user_id, project_id)
+        collection = self._collection_cache.get(cache_key)
+        if collection is not None:
+            return collection
         
-        # 使用SHA256哈希压缩ID长度，确保不超过63字符
-        # 格式: u_{user_hash}_p_{project_hash} (约30字符)
-        user_hash = hashlib.sha256(user_id.encode()).hexdigest()[:8]
-        project_hash = hashlib.sha256(project_id.encode()).hexdigest()[:8]
-        collection_name = f"u_{user_hash}_p_{project_hash}"
+        collection_name = self._get_collection_name(user_id, project_id)
         
         try:
-            return self.client.get_or_create_collection(
+            collection = self.client.get_or_create_collection(
                 name=collection_name,
                 metadata={
                     "user_id": user_id,
@@ -265,6 +565,27 @@ class MemoryService:
         except Exception as e:
             logger.error(f"❌ 获取collection失败: {str(e)}")
             raise
+        
+        self._collection_cache[cache_key] = collection
+        return collection
+    
+    @staticmethod
+    def _get_collection_name(user_id: str, project_id: str) -> str:
+        """
+        生成项目记忆集合名称
+        
+        使用SHA256哈希压缩ID长度，确保不超过63字符
+        格式: u_{user_hash}_p_{project_hash} (约30字符)
+        """
+        # ChromaDB collection命名规则：
+        # 1. 3-63字符（最重要！）
+        # 2. 开头和结尾必须是字母或数字
+        # 3. 只能包含字母、数字、下划线或短横线
+        # 4. 不能包含连续的点(..)
+        # 5. 不能是有效的IPv4地址
+        user_hash = hashlib.sha256(user_id.encode()).hexdigest()[:8]
+        project_hash = hashlib.sha256(project_id.encode()).hexdigest()[:8]
+        return f"u_{user_hash}_p_{project_hash}"
     
     async def add_memory(
         self,
@@ -293,7 +614,7 @@ class MemoryService:
             collection = self.get_collection(user_id, project_id)
             
             # 生成文本的向量表示
-            embedding = self.embedding_model.encode(content).tolist()
+            embedding = (await self.embed([content]))[0]
             
             # 准备元数据(ChromaDB要求所有值为基础类型)
             chroma_metadata = {
@@ -355,17 +676,12 @@ class MemoryService:
             ids = []
             documents = []
             metadatas = []
-            embeddings = []
             
             # 批量准备数据
             for mem in memories:
                 ids.append(mem['id'])
                 documents.append(mem['content'])
                 
-                # 生成embedding
-                embedding = self.embedding_model.encode(mem['content']).tolist()
-                embeddings.append(embedding)
-                
                 # 准备元数据
                 metadata = mem.get('metadata', {})
                 chroma_metadata = {
@@ -380,6 +696,9 @@ class MemoryService:
                 }
                 metadatas.append(chroma_metadata)
             
+            # 一次性批量生成embedding(按长度分桶,避免逐条前向推理)
+            embeddings = await self.embed(documents)
+            
             # 批量添加
             collection.add(
                 ids=ids,
@@ -424,27 +743,10 @@ class MemoryService:
             collection = self.get_collection(user_id, project_id)
             
             # 生成查询向量
-            query_embedding = self.embedding_model.encode(query).tolist()
-            
-            # 构建过滤条件 - ChromaDB要求使用$and组合多个条件
-            where_filter = None
-            conditions = []
-            
-            if memory_types:
-                conditions.append({"memory_type": {"$in": memory_types}})
-            if min_importance > 0:
-                conditions.append({"importance": {"$gte": min_importance}})
-            if chapter_range:
-                conditions.append({"chapter_number": {"$gte": chapter_range[0]}})
-                conditions.append({"chapter_number": {"$lte": chapter_range[1]}})
-            
-            # 根据条件数量选择合适的格式
-            if len(conditions) == 0:
-                where_filter = None
-            elif len(conditions) == 1:
-                where_filter = conditions[0]
-            else:
-                where_filter = {"$and": conditions}
+            query_embedding = await self.embed_query(query)
+            
+            # 构建过滤条件
+            where_filter = self._build_where_filter(memory_types, min_importance, chapter_range)
             
             # 执行向量相似度搜索
             results = collection.query(
@@ -472,6 +774,131 @@ class MemoryService:
             logger.error(f"❌ 搜索记忆失败: {str(e)}")
             return []
     
+    async def search_memories_multi(
+        self,
+        user_id: str,
+        project_id: str,
+        queries: List[Dict[str, Any]]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        多查询语义搜索 - 批量编码所有查询、一次向量查询，再按各自的过滤条件分发结果
+        
+        先不带过滤条件多取若干候选(limit * MULTI_QUERY_OVERFETCH)，在内存中按
+        search_memories 相同的规则过滤；若某项过滤后不足limit且候选被截断，
+        则回退为该项单独查询，保证结果与 search_memories 一致。
+        
+        Args:
+            user_id: 用户ID
+            project_id: 项目ID
+            queries: 查询列表,每项包含query,可选memory_types、limit、min_importance、chapter_range
+        
+        Returns:
+            与queries一一对应的记忆列表,各自按相似度排序
+        """
+        if not queries:
+            return []
+        
+        try:
+            collection = self.get_collection(user_id, project_id)
+            total = collection.count()
+            if total == 0:
+                return [[] for _ in queries]
+            
+            query_embeddings = await self.embed_queries([q['query'] for q in queries])
+            
+            max_limit = max(q.get('limit', 10) for q in queries)
+            n_results = min(total, max_limit * self.MULTI_QUERY_OVERFETCH)
+            results = collection.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results
+            )
+            truncated = n_results < total
+            
+            sections = []
+            for i, q in enumerate(queries):
+                limit = q.get('limit', 10)
+                memory_types = q.get('memory_types')
+                min_importance = q.get('min_importance', 0.0)
+                chapter_range = q.get('chapter_range')
+                
+                memories = []
+                for j in range(len(results['ids'][i])):
+                    metadata = results['metadatas'][i][j]
+                    if not self._match_filter(metadata, memory_types, min_importance, chapter_range):
+                        continue
+                    distance = results['distances'][i][j]
+                    memories.append({
+                        "id": results['ids'][i][j],
+                        "content": results['documents'][i][j],
+                        "metadata": metadata,
+                        "similarity": 1 - distance,
+                        "distance": distance
+                    })
+                    if len(memories) >= limit:
+                        break
+                
+                if len(memories) < limit and truncated:
+                    # 候选不足,回退为带过滤条件的单独查询
+                    memories = await self.search_memories(
+                        user_id=user_id,
+                        project_id=project_id,
+                        query=q['query'],
+                        memory_types=memory_types,
+                        limit=limit,
+                        min_importance=min_importance,
+                        chapter_range=chapter_range
+                    )
+                sections.append(memories)
+            
+            logger.info(f"🔍 多查询语义搜索完成: {len(queries)}个查询, 各找到{[len(m) for m in sections]}条记忆")
+            return sections
+            
+        except Exception as e:
+            logger.error(f"❌ 多查询搜索记忆失败: {str(e)}")
+            return [[] for _ in queries]
+    
+    @staticmethod
+    def _build_where_filter(
+        memory_types: Optional[List[str]] = None,
+        min_importance: float = 0.0,
+        chapter_range: Optional[tuple] = None
+    ) -> Optional[Dict[str, Any]]:
+        """构建ChromaDB过滤条件 - ChromaDB要求使用$and组合多个条件"""
+        conditions = []
+        
+        if memory_types:
+            conditions.append({"memory_type": {"$in": memory_types}})
+        if min_importance > 0:
+            conditions.append({"importance": {"$gte": min_importance}})
+        if chapter_range:
+            conditions.append({"chapter_number": {"$gte": chapter_range[0]}})
+            conditions.append({"chapter_number": {"$lte": chapter_range[1]}})
+        
+        # 根据条件数量选择合适的格式
+        if len(conditions) == 0:
+            return None
+        elif len(conditions) == 1:
+            return conditions[0]
+        return {"$and": conditions}
+    
+    @staticmethod
+    def _match_filter(
+        metadata: Dict[str, Any],
+        memory_types: Optional[List[str]] = None,
+        min_importance: float = 0.0,
+        chapter_range: Optional[tuple] = None
+    ) -> bool:
+        """在内存中判断元数据是否满足过滤条件(与_build_where_filter语义一致)"""
+        if memory_types and metadata.get('memory_type') not in memory_types:
+            return False
+        if min_importance > 0 and float(metadata.get('importance', 0)) < min_importance:
+            return False
+        if chapter_range:
+            chapter_number = int(metadata.get('chapter_number', 0))
+            if chapter_number < chapter_range[0] or chapter_number > chapter_range[1]:
+                return False
+        return True
+    
     async def get_recent_memories(
         self,
         user_id: str,
@@ -620,58 +1047,32 @@ class MemoryService:
             recent_count=3, min_importance=0.5
         )
         
-        # 2. 语义搜索相关记忆
-        relevant = await self.search_memories(
-            user_id=user_id,
-            project_id=project_id,
-            query=chapter_outline,
-            limit=10,
-            min_importance=0.4
-        )
-        
-        # 3. 查找未完结伏笔
+        # 2. 查找未完结伏笔
         foreshadows = await self.find_unresolved_foreshadows(
             user_id, project_id, current_chapter
         )
         
-        # 4. 如果有指定角色,获取角色相关记忆
-        character_memories = []
+        # 3. 语义检索: 相关记忆、角色相关记忆(如有指定角色)、重要情节点
+        #    合并为一次批量编码和一次向量查询
+        queries = [
+            {"query": chapter_outline, "limit": 10, "min_importance": 0.4},
+            {
+                "query": "重要 转折 高潮 关键",
+                "memory_types": ["plot_point", "hook"],
+                "limit": 5,
+                "min_importance": 0.7
+            }
+        ]
         if character_names:
-            character_query = " ".join(character_names) + " 角色 状态 关系"
-            character_memories = await self.search_memories(
-                user_id=user_id,
-                project_id=project_id,
-                query=character_query,
-                memory_types=["character_event", "plot_point"],
-                limit=8
-            )
+            queries.append({
+                "query": " ".join(character_names) + " 角色 状态 关系",
+                "memory_types": ["character_event", "plot_point"],
+                "limit": 8
+            })
         
-        # 5. 获取重要情节点
-        # 注意：ChromaDB的where条件需要特殊处理，不能同时使用多个顶层条件
-        try:
-            plot_points = await self.search_memories(
-                user_id=user_id,
-                project_id=project_id,
-                query="重要 转折 高潮 关键",
-                memory_types=["plot_point", "hook"],
-                limit=5,
-                min_importance=0.7
-            )
-        except Exception as e:
-            logger.error(f"❌ 搜索记忆失败: {str(e)}")
-            # 降级处理：分别查询
-            plot_points = []
-            try:
-                plot_points = await self.search_memories(
-                    user_id=user_id,
-                    project_id=project_id,
-                    query="重要 转折 高潮 关键",
-                    memory_types=["plot_point", "hook"],
-                    limit=5
-                )
-            except Exception as e2:
-                logger.warning(f"⚠️ 降级查询也失败: {str(e2)}")
-                plot_points = []
+        sections = await self.search_memories_multi(user_id, project_id, queries)
+        relevant, plot_points = sections[0], sections[1]
+        character_memories = sections[2] if character_names else []
         
         context = {
             "recent_context": self._format_memories(recent, "最近章节记忆"),
@@ -778,9 +1179,10 @@ class MemoryService:
         """
         try:
             # 生成collection名称
-            user_hash = hashlib.sha256(user_id.encode()).hexdigest()[:8]
-            project_hash = hashlib.sha256(project_id.encode()).hexdigest()[:8]
-            collection_name = f"u_{user_hash}_p_{project_hash}"
+            collection_name = self._get_collection_name(user_id, project_id)
+            
+            # 先失效句柄缓存，避免后续操作使用已删除的collection
+            self._collection_cache.pop((user_id, project_id), None)
             
             # 删除整个collection(这会清理所有向量数据)
             try:
@@ -827,7 +1229,7 @@ class MemoryService:
             
             if content:
                 # 重新生成embedding
-                embedding = self.embedding_model.encode(content).tolist()
+                embedding = (await self.embed([content]))[0]
                 update_data['embeddings'] = [embedding]
                 update_data['documents'] = [content]
             
@@ -874,39 +1276,56 @@ class MemoryService:
         try:
             collection = self.get_collection(user_id, project_id)
             
-            # 获取所有记忆
-            all_memories = collection.get()
-            
-            if not all_memories['ids']:
-                return {
-                    "total_count": 0,
-                    "by_type": {},
-                    "by_chapter": {},
-                    "foreshadow_count": 0
-                }
-            
-            # 统计各类型数量
+            # 分页只读取元数据做流式聚合，不加载文档和向量，内存占用与项目规模无关
             type_counts = {}
             chapter_counts = {}
             foreshadow_count = 0
+            foreshadow_resolved = 0
+            total_count = 0
+            offset = 0
             
-            for i, meta in enumerate(all_memories['metadatas']):
-                mem_type = meta.get('memory_type', 'unknown')
-                chapter_num = meta.get('chapter_number', 0)
-                is_foreshadow = meta.get('is_foreshadow', 0)
+            while True:
+                page = collection.get(
+                    include=['metadatas'],
+                    limit=self.STATS_PAGE_SIZE,
+                    offset=offset
+                )
+                page_metadatas = page['metadatas'] or []
                 
-                type_counts[mem_type] = type_counts.get(mem_type, 0) + 1
-                chapter_counts[str(chapter_num)] = chapter_counts.get(str(chapter_num), 0) + 1
+                for meta in page_metadatas:
+                    mem_type = meta.get('memory_type', 'unknown')
+                    chapter_num = meta.get('chapter_number', 0)
+                    is_foreshadow = meta.get('is_foreshadow', 0)
+                    
+                    type_counts[mem_type] = type_counts.get(mem_type, 0) + 1
+                    chapter_counts[str(chapter_num)] = chapter_counts.get(str(chapter_num), 0) + 1
+                    
+                    if is_foreshadow == 1:
+                        foreshadow_count += 1
+                    elif is_foreshadow == 2:
+                        foreshadow_resolved += 1
                 
-                if is_foreshadow == 1:
-                    foreshadow_count += 1
+                total_count += len(page_metadatas)
+                if len(page_metadatas) < self.STATS_PAGE_SIZE:
+                    break
+                offset += self.STATS_PAGE_SIZE
+            
+            if total_count == 0:
+                return {
+                    "total_count": 0,
+                    "by_type": {},
+                    "by_chapter": {},
+                    "foreshadow_count": 0,
+                    "query_cache": self.get_query_cache_stats()
+                }
             
             stats = {
-                "total_count": len(all_memories['ids']),
+                "total_count": total_count,
                 "by_type": type_counts,
                 "by_chapter": chapter_counts,
                 "foreshadow_count": foreshadow_count,
-                "foreshadow_resolved": sum(1 for m in all_memories['metadatas'] if m.get('is_foreshadow') == 2)
+                "foreshadow_resolved": foreshadow_resolved,
+                "query_cache": self.get_query_cache_stats()
             }
             
             logger.info(f"📊 记忆统计: 总计{stats['total_count']}条, 伏笔{foreshadow_count}个")
@@ -1,5 +1,7 @@
 """大纲剧情展开服务 - 将大纲节点展开为多个章节"""
-from typing import List, Dict, Any, Optional
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, AsyncGenerator, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 import json
@@ -10,11 +12,26 @@ from app.models.character import Character
 from app.models.chapter import Chapter
 from app.services.ai_service import AIService
 from app.services.prompt_service import prompt_service, PromptService
+from app.utils.concurrency import BoundedResult, bounded_map
+from app.config import settings as app_settings
 from app.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+@dataclass
+class ExpansionContext:
+    """
+    批量展开共享的项目上下文
+    
+    在并发展开前一次性查询，各展开任务只读使用，AI调用阶段不再访问数据库。
+    """
+    characters_info: str
+    outline_contexts: Dict[str, str]
+    single_template: str
+    multi_template: str
+
+
 class PlotExpansionService:
     """大纲剧情展开服务"""
     
@@ -32,7 +49,8 @@ class PlotExpansionService:
         provider: Optional[str] = None,
         model: Optional[str] = None,
         batch_size: int = 5,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        expansion_context: Optional[ExpansionContext] = None
     ) -> List[Dict[str, Any]]:
         """
         分析单个大纲,生成多章节规划（支持分批生成）
@@ -48,6 +66,7 @@ class PlotExpansionService:
             model: AI模型
             batch_size: 每批生成的章节数（默认5章）
             progress_callback: 进度回调函数(可选)
+            expansion_context: 预先查询的共享上下文(可选，传入时不再访问数据库)
             
         Returns:
             章节规划列表
@@ -64,7 +83,8 @@ class PlotExpansionService:
                 expansion_strategy=expansion_strategy,
                 enable_scene_analysis=enable_scene_analysis,
                 provider=provider,
-                model=model
+                model=model,
+                expansion_context=expansion_context
             )
         
         # 章节数较多，分批生成
@@ -79,7 +99,8 @@ class PlotExpansionService:
             provider=provider,
             model=model,
             batch_size=batch_size,
-            progress_callback=progress_callback
+            progress_callback=progress_callback,
+            expansion_context=expansion_context
         )
     
     async def _generate_chapters_single_batch(
@@ -91,25 +112,21 @@ class PlotExpansionService:
         expansion_strategy: str,
         enable_scene_analysis: bool,
         provider: Optional[str],
-        model: Optional[str]
+        model: Optional[str],
+        expansion_context: Optional[ExpansionContext] = None
     ) -> List[Dict[str, Any]]:
         """单批次生成章节规划"""
-        # 获取角色信息
-        characters_result = await db.execute(
-            select(Character).where(Character.project_id == project.id)
-        )
-        characters = characters_result.scalars().all()
-        characters_info = "\n".join([
-            f"- {char.name} ({'组织' if char.is_organization else '角色'}, {char.role_type}): "
-            f"{char.personality[:100] if char.personality else '暂无描述'}"
-            for char in characters
-        ])
-        
-        # 获取大纲上下文（前后大纲）
-        context_info = await self._get_outline_context(outline, project.id, db)
-        
-        # 获取自定义提示词模板
-        template = await PromptService.get_template("OUTLINE_EXPAND_SINGLE", project.user_id, db)
+        if expansion_context:
+            characters_info = expansion_context.characters_info
+            context_info = expansion_context.outline_contexts.get(outline.id, "（无前后文）")
+            template = expansion_context.single_template
+        else:
+            # 获取角色信息
+            characters_info = await self._get_characters_info(project.id, db)
+            # 获取大纲上下文（前后大纲）
+            context_info = await self._get_outline_context(outline, project.id, db)
+            # 获取自定义提示词模板
+            template = await PromptService.get_template("OUTLINE_EXPAND_SINGLE", project.user_id, db)
         # 格式化提示词
         prompt = PromptService.format_prompt(
             template,
@@ -161,26 +178,23 @@ class PlotExpansionService:
         provider: Optional[str],
         model: Optional[str],
         batch_size: int,
-        progress_callback: Optional[callable]
+        progress_callback: Optional[callable],
+        expansion_context: Optional[ExpansionContext] = None
     ) -> List[Dict[str, Any]]:
         """分批生成章节规划（增强差异化版本）"""
         # 计算批次数
         total_batches = (target_chapter_count + batch_size - 1) // batch_size
         logger.info(f"分批生成计划: 总共{target_chapter_count}章，分{total_batches}批，每批{batch_size}章")
         
-        # 获取角色信息（所有批次共用）
-        characters_result = await db.execute(
-            select(Character).where(Character.project_id == project.id)
-        )
-        characters = characters_result.scalars().all()
-        characters_info = "\n".join([
-            f"- {char.name} ({'组织' if char.is_organization else '角色'}, {char.role_type}): "
-            f"{char.personality[:100] if char.personality else '暂无描述'}"
-            for char in characters
-        ])
-        
-        # 获取大纲上下文
-        context_info = await self._get_outline_context(outline, project.id, db)
+        # 角色信息、大纲上下文与模板（所有批次共用）
+        if expansion_context:
+            characters_info = expansion_context.characters_info
+            context_info = expansion_context.outline_contexts.get(outline.id, "（无前后文）")
+            template = expansion_context.multi_template
+        else:
+            characters_info = await self._get_characters_info(project.id, db)
+            context_info = await self._get_outline_context(outline, project.id, db)
+            template = await PromptService.get_template("OUTLINE_EXPAND_MULTI", project.user_id, db)
         
         all_chapter_plans = []
         
@@ -234,8 +248,6 @@ class PlotExpansionService:
    3. 结尾悬念（不同类型的钩子）
 ⚠️ 新章节的key_events不得与上面【已使用的关键事件】中的任何事件相同或相似
 """
-            # 获取自定义提示词模板
-            template = await PromptService.get_template("OUTLINE_EXPAND_MULTI", project.user_id, db)
             # 格式化提示词
             prompt = PromptService.format_prompt(
                 template,
@@ -287,6 +299,94 @@ class PlotExpansionService:
         logger.info(f"分批生成完成，共生成 {len(all_chapter_plans)} 个章节规划")
         return all_chapter_plans
     
+    async def prepare_expansion_context(
+        self,
+        project: Project,
+        db: AsyncSession
+    ) -> ExpansionContext:
+        """
+        一次性查询批量展开所需的共享上下文
+        
+        包括角色信息、每个大纲的前后大纲摘要以及展开提示词模板，
+        替代逐个大纲（及逐批次）的重复查询。
+        """
+        characters_info = await self._get_characters_info(project.id, db)
+        
+        outlines_result = await db.execute(
+            select(Outline)
+            .where(Outline.project_id == project.id)
+            .order_by(Outline.order_index)
+        )
+        all_outlines = outlines_result.scalars().all()
+        order_indexes = [o.order_index for o in all_outlines]
+        outline_contexts = {}
+        for outline in all_outlines:
+            # 与 _get_outline_context 一致：order_index 严格小于/大于的最近大纲
+            prev_pos = bisect_left(order_indexes, outline.order_index) - 1
+            next_pos = bisect_right(order_indexes, outline.order_index)
+            outline_contexts[outline.id] = self._format_outline_context(
+                all_outlines[prev_pos] if prev_pos >= 0 else None,
+                all_outlines[next_pos] if next_pos < len(all_outlines) else None
+            )
+        
+        return ExpansionContext(
+            characters_info=characters_info,
+            outline_contexts=outline_contexts,
+            single_template=await PromptService.get_template("OUTLINE_EXPAND_SINGLE", project.user_id, db),
+            multi_template=await PromptService.get_template("OUTLINE_EXPAND_MULTI", project.user_id, db)
+        )
+    
+    async def iter_expand_outlines(
+        self,
+        outlines: Sequence[Outline],
+        project: Project,
+        db: AsyncSession,
+        target_chapter_count: int = 3,
+        expansion_strategy: str = "balanced",
+        enable_scene_analysis: bool = True,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        ordered: bool = False
+    ) -> AsyncGenerator[BoundedResult, None]:
+        """
+        并发展开多个大纲，每完成一个产出一个结果
+        
+        共享上下文在开始前一次性查询，并发任务不访问数据库会话；
+        调用方可在产出结果后使用同一会话保存（如按大纲顺序创建章节）。
+        
+        Args:
+            outlines: 要展开的大纲（按 order_index 排序）
+            concurrency: 并发数（默认使用配置 OUTLINE_EXPAND_MAX_CONCURRENCY，且不超过该值）
+            ordered: True 按输入顺序产出；False 按完成顺序产出
+            
+        Yields:
+            BoundedResult（index 为大纲在 outlines 中的位置，result 为章节规划列表）
+        """
+        limit = max(1, app_settings.outline_expand_max_concurrency)
+        concurrency = min(concurrency, limit) if concurrency else limit
+        
+        expansion_context = await self.prepare_expansion_context(project, db)
+        # MCP工具加载会使用数据库会话，并发前预加载一次
+        await self.ai_service.preload_mcp_tools()
+        
+        async def expand(index: int, outline: Outline) -> List[Dict[str, Any]]:
+            return await self.analyze_outline_for_chapters(
+                outline=outline,
+                project=project,
+                db=db,
+                target_chapter_count=target_chapter_count,
+                expansion_strategy=expansion_strategy,
+                enable_scene_analysis=enable_scene_analysis,
+                provider=provider,
+                model=model,
+                expansion_context=expansion_context
+            )
+        
+        logger.info(f"并发展开 {len(outlines)} 个大纲（并发 {concurrency}）")
+        async for outcome in bounded_map(outlines, expand, concurrency, ordered=ordered):
+            yield outcome
+    
     async def batch_expand_outlines(
         self,
         project_id: str,
@@ -295,10 +395,11 @@ class PlotExpansionService:
         target_chapters_per_outline: int = 3,
         expansion_strategy: str = "balanced",
         provider: Optional[str] = None,
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        concurrency: Optional[int] = None
     ) -> Dict[str, Any]:
         """
-        批量展开所有大纲为章节
+        批量展开所有大纲为章节（并发执行，结果按大纲顺序返回）
         
         Returns:
             {
@@ -333,22 +434,24 @@ class PlotExpansionService:
                 "expansions": []
             }
         
-        # 逐个展开大纲
+        # 并发展开大纲
         expansions = []
         total_chapters = 0
         
-        for outline in outlines:
-            try:
-                chapter_plans = await self.analyze_outline_for_chapters(
-                    outline=outline,
-                    project=project,
-                    db=db,
-                    target_chapter_count=target_chapters_per_outline,
-                    expansion_strategy=expansion_strategy,
-                    provider=provider,
-                    model=model
-                )
-                
+        async for outcome in self.iter_expand_outlines(
+            outlines=outlines,
+            project=project,
+            db=db,
+            target_chapter_count=target_chapters_per_outline,
+            expansion_strategy=expansion_strategy,
+            provider=provider,
+            model=model,
+            concurrency=concurrency,
+            ordered=True
+        ):
+            outline = outlines[outcome.index]
+            if outcome.ok:
+                chapter_plans = outcome.result
                 expansions.append({
                     "outline_id": outline.id,
                     "outline_title": outline.title,
@@ -358,13 +461,12 @@ class PlotExpansionService:
                 
                 total_chapters += len(chapter_plans)
                 logger.info(f"大纲 {outline.title} 展开为 {len(chapter_plans)} 章")
-                
-            except Exception as e:
-                logger.error(f"展开大纲 {outline.id} 失败: {str(e)}")
+            else:
+                logger.error(f"展开大纲 {outline.id} 失败: {str(outcome.error)}")
                 expansions.append({
                     "outline_id": outline.id,
                     "outline_title": outline.title,
-                    "error": str(e),
+                    "error": str(outcome.error),
                     "chapter_count": 0
                 })
         
@@ -480,6 +582,18 @@ class PlotExpansionService:
         
         return chapters
     
+    async def _get_characters_info(self, project_id: str, db: AsyncSession) -> str:
+        """获取项目角色信息（提示词格式）"""
+        characters_result = await db.execute(
+            select(Character).where(Character.project_id == project_id)
+        )
+        characters = characters_result.scalars().all()
+        return "\n".join([
+            f"- {char.name} ({'组织' if char.is_organization else '角色'}, {char.role_type}): "
+            f"{char.personality[:100] if char.personality else '暂无描述'}"
+            for char in characters
+        ])
+    
     async def _get_outline_context(
         self,
         outline: Outline,
@@ -511,6 +625,14 @@ class PlotExpansionService:
         )
         next_outline = next_result.scalar_one_or_none()
         
+        return self._format_outline_context(prev_outline, next_outline)
+    
+    @staticmethod
+    def _format_outline_context(
+        prev_outline: Optional[Outline],
+        next_outline: Optional[Outline]
+    ) -> str:
+        """格式化前后大纲上下文"""
         context = ""
         if prev_outline:
             context += f"【前一节】{prev_outline.title}: {prev_outline.content[:200]}...\n\n"
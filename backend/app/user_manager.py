@@ -2,10 +2,12 @@
 用户管理模块 - 使用数据库存储
 """
 import asyncio
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Tuple
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from app.config import settings
 
@@ -28,20 +30,60 @@ class UserManager:
     
     def __init__(self):
         """初始化用户管理器"""
-        pass
+        # 用户信息缓存（TTL + LRU）：user_id -> (过期时间, User)
+        # 认证中间件每个请求都会查询用户，命中缓存时不访问数据库
+        self._user_cache: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
+    
+    def _cache_get(self, user_id: str) -> Optional[User]:
+        """从缓存读取用户（过期则移除）"""
+        entry = self._user_cache.get(user_id)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            self._user_cache.pop(user_id, None)
+            return None
+        self._user_cache.move_to_end(user_id)
+        return user
+    
+    def _cache_put(self, user: User) -> None:
+        """写入缓存，超过容量时淘汰最久未使用的条目"""
+        ttl = settings.USER_CACHE_TTL_SECONDS
+        if ttl <= 0:
+            return
+        self._user_cache[user.user_id] = (time.monotonic() + ttl, user)
+        self._user_cache.move_to_end(user.user_id)
+        while len(self._user_cache) > settings.USER_CACHE_MAX_SIZE:
+            self._user_cache.popitem(last=False)
+    
+    def invalidate_user(self, user_id: str) -> None:
+        """使指定用户的缓存失效（用户信息、状态、权限或密码变更后调用）"""
+        self._user_cache.pop(user_id, None)
+    
+    def clear_cache(self) -> None:
+        """清空用户缓存"""
+        self._user_cache.clear()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取用户缓存统计"""
+        total = self._cache_hits + self._cache_misses
+        return {
+            "size": len(self._user_cache),
+            "max_size": settings.USER_CACHE_MAX_SIZE,
+            "ttl_seconds": settings.USER_CACHE_TTL_SECONDS,
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "hit_rate": round(self._cache_hits / total, 4) if total else 0.0,
+        }
     
     async def _get_session(self) -> AsyncSession:
         """获取数据库会话 - 使用共享的PostgreSQL引擎"""
-        from app.database import get_engine
+        from app.database import get_session_factory
         
         # 使用共享的PostgreSQL引擎（user_id使用特殊标识）
-        engine = await get_engine("_global_users_")
-        
-        session_maker = async_sessionmaker(
-            engine,
-            class_=AsyncSession,
-            expire_on_commit=False
-        )
+        session_maker = await get_session_factory("_global_users_")
         
         return session_maker()
     
@@ -116,12 +158,19 @@ class UserManager:
             await session.commit()
             await session.refresh(user)
             
+            self.invalidate_user(user_id)
             return User(**user.to_dict())
     
     async def get_user(self, user_id: str) -> Optional[User]:
-        """获取用户"""
+        """获取用户（优先读取缓存，返回副本以免调用方修改缓存对象）"""
         from app.models.user import User as UserModel
         
+        cached = self._cache_get(user_id)
+        if cached is not None:
+            self._cache_hits += 1
+            return cached.model_copy()
+        self._cache_misses += 1
+        
         async with await self._get_session() as session:
             result = await session.execute(
                 select(UserModel).where(UserModel.user_id == user_id)
@@ -129,7 +178,9 @@ class UserManager:
             user = result.scalar_one_or_none()
             
             if user:
-                return User(**user.to_dict())
+                user_dto = User(**user.to_dict())
+                self._cache_put(user_dto)
+                return user_dto.model_copy()
             return None
     
     async def get_all_users(self) -> List[User]:
@@ -177,6 +228,7 @@ class UserManager:
             user.is_admin = is_admin
             await session.commit()
             
+            self.invalidate_user(user_id)
             return True
     
     async def delete_user(self, user_id: str) -> bool:
@@ -207,6 +259,7 @@ class UserManager:
             await session.delete(user)
             await session.commit()
             
+            self.invalidate_user(user_id)
             return True
     
     async def is_admin(self, user_id: str) -> bool:
@@ -0,0 +1,82 @@
+"""有界并发执行辅助函数"""
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncGenerator, Awaitable, Callable, Generic, Optional, Sequence, TypeVar
+
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class BoundedResult(Generic[R]):
+    """单个任务的执行结果"""
+    index: int
+    result: Optional[R] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def bounded_map(
+    items: Sequence[T],
+    worker: Callable[[int, T], Awaitable[R]],
+    concurrency: int,
+    ordered: bool = False,
+) -> AsyncGenerator[BoundedResult[R], None]:
+    """
+    以有限并发执行任务，并在每个任务完成时产出结果
+
+    单个任务失败不会影响其他任务，异常通过 BoundedResult.error 返回。
+    生成器被提前关闭（如SSE客户端断开）时取消尚未完成的任务。
+
+    Args:
+        items: 待处理的数据
+        worker: 处理函数，参数为 (索引, 数据)
+        concurrency: 最大并发数
+        ordered: True 按输入顺序产出；False 按完成顺序产出
+
+    Yields:
+        BoundedResult（index 为输入中的位置）
+    """
+    if not items:
+        return
+
+    semaphore = asyncio.Semaphore(max(1, min(concurrency, len(items))))
+    done_queue: "asyncio.Queue[BoundedResult[R]]" = asyncio.Queue()
+
+    async def run(index: int, item: T) -> None:
+        async with semaphore:
+            try:
+                outcome = BoundedResult(index=index, result=await worker(index, item))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ 并发任务 {index} 失败: {e}")
+                outcome = BoundedResult(index=index, error=e)
+        done_queue.put_nowait(outcome)
+
+    tasks = [asyncio.create_task(run(i, item)) for i, item in enumerate(items)]
+    try:
+        pending: dict = {}
+        next_index = 0
+        for _ in range(len(items)):
+            outcome = await done_queue.get()
+            if not ordered:
+                yield outcome
+                continue
+            # 按输入顺序产出：缓存提前完成的结果，直到前面的任务完成
+            pending[outcome.index] = outcome
+            while next_index in pending:
+                yield pending.pop(next_index)
+                next_index += 1
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,150 @@
+"""项目级数据库写入锁
+
+同一项目的并发写入（批量生成、后台分析等）按项目串行，不同项目互不影响：
+- PostgreSQL：进程内锁 + pg_advisory_lock，多个uvicorn worker/任务队列进程之间同样生效
+- SQLite：进程内锁 + 文件锁（fcntl；不支持的平台仅使用进程内锁）
+
+进程内锁没有持有者引用时自动回收，不会随项目数量无限增长。
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+import weakref
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import settings
+from app.database import get_engine
+from app.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = get_logger(__name__)
+
+_is_sqlite = 'sqlite' in settings.database_url.lower()
+
+# 锁连接位于共享数据库，不属于任何用户，使用固定标识获取引擎
+_LOCK_ENGINE_KEY = "_project_lock_"
+
+# SQLite 文件锁目录与获取锁的轮询间隔（秒）
+_LOCK_DIR = Path(tempfile.gettempdir()) / "mumuai_project_locks"
+_FILE_LOCK_POLL_INTERVAL = 0.05
+
+# 进程内锁：同一进程内只有一个协程去争用数据库/文件锁，避免占用多个数据库连接等待
+_local_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _lock_key(project_id: str) -> int:
+    """项目ID映射为 pg_advisory_lock 使用的64位有符号整数"""
+    digest = hashlib.blake2b(f"project_write:{project_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class ProjectWriteLock:
+    """
+    按项目的写入锁（异步上下文管理器，不可重入）
+
+    同一实例可以在多个协程间共享（如流水线模式下的生成与分析），
+    持有状态只属于当前持有者，由进程内锁保证互斥。
+
+    用法:
+        write_lock = project_write_lock(project_id)
+        async with write_lock:
+            ...
+            await db.commit()
+    """
+
+    def __init__(self, project_id: str):
+        self.project_id = project_id
+        self._key = _lock_key(project_id)
+        local_lock = _local_locks.get(project_id)
+        if local_lock is None:
+            local_lock = asyncio.Lock()
+            _local_locks[project_id] = local_lock
+        self._local = local_lock
+        self._conn: Optional[AsyncConnection] = None
+        self._fd: Optional[int] = None
+
+    async def __aenter__(self) -> "ProjectWriteLock":
+        await self._local.acquire()
+        try:
+            if _is_sqlite:
+                await self._acquire_file()
+            else:
+                await self._acquire_advisory()
+        except BaseException:
+            self._local.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            if self._conn is not None:
+                await self._release_advisory()
+            if self._fd is not None:
+                self._release_file()
+        finally:
+            self._local.release()
+
+    async def _acquire_advisory(self) -> None:
+        """在独立连接上获取会话级咨询锁（与业务会话的事务提交互不影响）"""
+        engine = await get_engine(_LOCK_ENGINE_KEY)
+        conn = await engine.connect()
+        try:
+            await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": self._key})
+            await conn.commit()
+        except BaseException:
+            # 等待中被取消时锁可能已在服务端获得，作废物理连接以确保释放
+            await conn.invalidate()
+            await conn.close()
+            raise
+        self._conn = conn
+
+    async def _release_advisory(self) -> None:
+        conn, self._conn = self._conn, None
+        try:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self._key})
+            await conn.commit()
+        except BaseException as e:
+            logger.warning(f"⚠️ 释放项目写入锁失败，关闭连接以释放: {self.project_id}: {str(e)}")
+            await conn.invalidate()
+            raise
+        finally:
+            await conn.close()
+
+    async def _acquire_file(self) -> None:
+        """非阻塞文件锁 + 轮询（可被取消，不占用线程）"""
+        if fcntl is None:
+            return
+        _LOCK_DIR.mkdir(parents=True, exist_ok=True)
+        fd = os.open(_LOCK_DIR / f"{self._key & 0xFFFFFFFFFFFFFFFF:016x}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    await asyncio.sleep(_FILE_LOCK_POLL_INTERVAL)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    def _release_file(self) -> None:
+        fd, self._fd = self._fd, None
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+def project_write_lock(project_id: str) -> ProjectWriteLock:
+    """获取项目的数据库写入锁"""
+    return ProjectWriteLock(project_id)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Embedding推理后端对比脚本
+对比 PyTorch 与 ONNX Runtime / int8量化 后端的向量一致性和单核吞吐
+
+用法:
+    python scripts/benchmark_embedding.py                       # 对比 torch 与 onnx(默认模型文件)
+    python scripts/benchmark_embedding.py --quantize avx2       # 先导出int8量化ONNX模型再对比
+    python scripts/benchmark_embedding.py --backend onnx --file onnx/model_qint8_avx2.onnx
+
+依赖: pip install "optimum[onnxruntime]"
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# 添加项目路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+
+# 导入 memory_service 以复用其模型目录(SENTENCE_TRANSFORMERS_HOME)探测逻辑
+import app.services.memory_service  # noqa: F401
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+MODEL_NAME = 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
+
+SAMPLE_TEXTS = [
+    "林凡在山门前驻足良久，终于下定决心踏入宗门。",
+    "这枚玉佩的来历，似乎与三年前那场大火有关。",
+    "重要 转折 高潮 关键",
+    "苏婉儿 林凡 角色 状态 关系",
+    "第十二章：夜探藏经阁，意外发现失传已久的剑谱残页，却惊动了守阁长老。",
+    "The old man smiled and handed him a sealed letter.",
+    "师父临终前留下的话：'不要相信任何人，尤其是你的师兄。'",
+    "两大宗门的矛盾终于在比武大会上彻底爆发，各方势力暗中布局。",
+]
+
+
+def load_model(backend: str, file_name: str = None):
+    """加载指定后端的模型"""
+    from sentence_transformers import SentenceTransformer
+
+    kwargs = dict(
+        cache_folder=os.environ.get('SENTENCE_TRANSFORMERS_HOME', 'embedding'),
+        device='cpu',
+    )
+    if backend != "torch":
+        kwargs["backend"] = backend
+        if file_name:
+            kwargs["model_kwargs"] = {"file_name": file_name}
+    return SentenceTransformer(MODEL_NAME, **kwargs)
+
+
+def export_quantized(config: str) -> str:
+    """导出int8动态量化ONNX模型到模型快照目录，返回模型文件相对路径"""
+    from huggingface_hub import snapshot_download
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    snapshot_dir = snapshot_download(
+        MODEL_NAME,
+        cache_dir=os.environ.get('SENTENCE_TRANSFORMERS_HOME', 'embedding'),
+    )
+    onnx_model = load_model("onnx")
+    export_dynamic_quantized_onnx_model(onnx_model, config, snapshot_dir)
+    file_name = f"onnx/model_qint8_{config}.onnx"
+    logger.info(f"✅ 已导出量化模型: {Path(snapshot_dir) / file_name}")
+    return file_name
+
+
+def benchmark(model, texts: list, batch_size: int, rounds: int) -> float:
+    """返回吞吐(条/秒)"""
+    model.encode(texts[:batch_size], batch_size=batch_size)  # 预热
+    start = time.perf_counter()
+    for _ in range(rounds):
+        model.encode(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    return len(texts) * rounds / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding推理后端一致性与吞吐对比")
+    parser.add_argument("--backend", default="onnx", choices=["onnx", "openvino"], help="对比的后端")
+    parser.add_argument("--file", default=None, help="后端模型文件(相对模型目录)")
+    parser.add_argument("--quantize", default=None, help="先导出int8量化ONNX模型，如 avx2 / avx512 / avx512_vnni / arm64")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="一致性阈值(逐条余弦相似度最小值)")
+    args = parser.parse_args()
+
+    import torch
+    threads = torch.get_num_threads()
+
+    file_name = args.file
+    if args.quantize:
+        file_name = export_quantized(args.quantize)
+        args.backend = "onnx"
+
+    texts = SAMPLE_TEXTS * 16
+
+    torch_model = load_model("torch")
+    other_model = load_model(args.backend, file_name)
+
+    # 向量一致性
+    ref = torch_model.encode(SAMPLE_TEXTS, normalize_embeddings=True)
+    got = other_model.encode(SAMPLE_TEXTS, normalize_embeddings=True)
+    cosines = np.sum(ref * got, axis=1)
+
+    # 吞吐
+    torch_tps = benchmark(torch_model, texts, args.batch_size, args.rounds)
+    other_tps = benchmark(other_model, texts, args.batch_size, args.rounds)
+
+    label = f"{args.backend}({file_name or '默认'})"
+    print(f"\n📊 Embedding后端对比 (线程数: {threads}, batch_size: {args.batch_size})")
+    print(f"   ├─ 余弦相似度: min={cosines.min():.4f}, mean={cosines.mean():.4f}")
+    print(f"   ├─ torch 吞吐: {torch_tps:.1f} 条/秒 ({torch_tps / threads:.1f} 条/秒/核)")
+    print(f"   ├─ {label} 吞吐: {other_tps:.1f} 条/秒 ({other_tps / threads:.1f} 条/秒/核)")
+    print(f"   └─ 加速比: {other_tps / torch_tps:.2f}x")
+
+    if cosines.min() < args.min_cosine:
+        logger.error(f"❌ 向量一致性不达标: min={cosines.min():.4f} < {args.min_cosine}")
+        sys.exit(1)
+    logger.info("✅ 向量一致性检查通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+中间件开销基准脚本
+对比 纯ASGI中间件（当前实现）与 BaseHTTPMiddleware 包装 的请求吞吐和SSE数据块延迟
+
+直接以 ASGI 协议调用应用（不经过网络与服务器），只测量中间件栈本身的开销。
+未携带 Cookie，AuthMiddleware 不会访问数据库。
+
+用法:
+    python scripts/benchmark_middleware.py
+    python scripts/benchmark_middleware.py --requests 20000 --chunks 500
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# 添加项目路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware import RequestIDMiddleware
+from app.middleware.auth_middleware import AuthMiddleware
+
+
+class PassthroughHTTPMiddleware(BaseHTTPMiddleware):
+    """BaseHTTPMiddleware 基线：dispatch 只调用 call_next，用于衡量其固有开销"""
+
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+def build_app(mode: str, chunk_count: int) -> FastAPI:
+    """构建与 main.py 相同中间件顺序的测试应用"""
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    @app.get("/sse")
+    async def sse():
+        async def generate():
+            for _ in range(chunk_count):
+                # 数据块中携带产生时间，客户端据此计算到达延迟
+                yield f"data: {time.perf_counter()}\n\n"
+                await asyncio.sleep(0)
+        return StreamingResponse(generate(), media_type="text/event-stream")
+
+    if mode == "asgi":
+        app.add_middleware(RequestIDMiddleware)
+        app.add_middleware(AuthMiddleware)
+    else:
+        # 两层 BaseHTTPMiddleware 叠加在纯ASGI实现之上，模拟改造前的每请求开销
+        app.add_middleware(RequestIDMiddleware)
+        app.add_middleware(PassthroughHTTPMiddleware)
+        app.add_middleware(AuthMiddleware)
+        app.add_middleware(PassthroughHTTPMiddleware)
+    return app
+
+
+def make_scope(path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("bench", 80),
+    }
+
+
+async def call(app, path: str, on_body=None) -> None:
+    """以ASGI协议发送一次GET请求"""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if on_body and message["type"] == "http.response.body" and message.get("body"):
+            on_body(message["body"])
+
+    await app(make_scope(path), receive, send)
+
+
+async def bench_requests(app, total: int, concurrency: int) -> float:
+    """返回 /ping 的请求吞吐（次/秒）"""
+    await call(app, "/ping")  # 预热
+    per_worker = total // concurrency
+
+    async def worker():
+        for _ in range(per_worker):
+            await call(app, "/ping")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return per_worker * concurrency / (time.perf_counter() - start)
+
+
+async def bench_sse(app) -> list:
+    """返回每个SSE数据块从产生到送达 send 的延迟（微秒）"""
+    latencies = []
+
+    def on_body(body: bytes):
+        received = time.perf_counter()
+        for line in body.decode().splitlines():
+            if line.startswith("data: "):
+                latencies.append((received - float(line[6:])) * 1_000_000)
+
+    await call(app, "/sse", on_body)
+    return latencies
+
+
+async def run(args) -> None:
+    results = {}
+    for mode in ("base_http", "asgi"):
+        app = build_app(mode, args.chunks)
+        rps = await bench_requests(app, args.requests, args.concurrency)
+        latencies = await bench_sse(app)
+        results[mode] = (rps, latencies)
+
+    print(f"\n📊 中间件开销对比 (请求数: {args.requests}, 并发: {args.concurrency}, SSE数据块: {args.chunks})")
+    for mode, label in (("base_http", "BaseHTTPMiddleware"), ("asgi", "纯ASGI")):
+        rps, latencies = results[mode]
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0.0
+        print(f"   ├─ {label}: {rps:.0f} 次/秒, SSE延迟 中位数={statistics.median(latencies):.1f}µs p99={p99:.1f}µs")
+    print(f"   └─ 吞吐提升: {results['asgi'][0] / results['base_http'][0]:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="中间件开销基准")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--chunks", type=int, default=200, help="SSE响应的数据块数")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+批量生成流水线中断复现脚本
+验证任务队列中断批量生成（租约失效/worker停止）时，后台分析中的上一章被一同取消，
+不会在任务重新执行（从该章重新生成）期间继续写入分析结果
+
+在临时SQLite库中创建项目、章节和批量任务；章节生成与分析替换为可控的模拟实现
+（生成耗时0.3秒，分析耗时远长于生成），在第2章生成期间取消批量任务。
+
+用法:
+    python scripts/repro_batch_pipeline_cancel.py
+"""
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import suppress
+from pathlib import Path
+
+# 使用临时SQLite库（需在导入 app 之前设置）
+tmp_dir = tempfile.mkdtemp(prefix="mumu_pipeline_cancel_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tmp_dir, 'repro.db')}"
+
+# 添加项目路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import select
+
+from app.api import chapters
+from app.database import Base, background_session, close_db, get_engine
+from app.models import BatchGenerationTask, Chapter, Project
+
+REPRO_USER_ID = "repro_user"
+
+
+class FakeAIService:
+    """模拟AI服务（生成与分析已被替换，不会发起请求）"""
+
+    async def preload_mcp_tools(self) -> None:
+        pass
+
+
+async def prepare() -> str:
+    """创建项目、3个章节和启用流水线分析的批量任务，返回批量任务ID"""
+    engine = await get_engine(REPRO_USER_ID)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with background_session(REPRO_USER_ID) as db:
+        project = Project(user_id=REPRO_USER_ID, title="流水线中断复现")
+        db.add(project)
+        await db.flush()
+        chapter_list = [
+            Chapter(project_id=project.id, chapter_number=i, title=f"第{i}章")
+            for i in range(1, 4)
+        ]
+        db.add_all(chapter_list)
+        await db.flush()
+        task = BatchGenerationTask(
+            project_id=project.id,
+            user_id=REPRO_USER_ID,
+            start_chapter_number=1,
+            chapter_count=len(chapter_list),
+            chapter_ids=[ch.id for ch in chapter_list],
+            enable_analysis=True,
+            status='pending',
+            total_chapters=len(chapter_list),
+            completed_chapters=0,
+            failed_chapters=[],
+            max_retries=0
+        )
+        db.add(task)
+        await db.commit()
+        return task.id
+
+
+async def run() -> bool:
+    batch_id = await prepare()
+
+    running_analyses = set()
+    second_chapter_started = asyncio.Event()
+
+    async def fake_check_prerequisites(db, chapter):
+        return True, "", []
+
+    async def fake_generate(db_session, chapter, **kwargs):
+        if chapter.chapter_number == 2:
+            second_chapter_started.set()
+        await asyncio.sleep(0.3)
+        chapter.content = f"第{chapter.chapter_number}章正文"
+        await db_session.commit()
+        return f"第{chapter.chapter_number}章摘要"
+
+    async def fake_analysis(chapter_id, chapter_number, **kwargs):
+        running_analyses.add(chapter_number)
+        try:
+            await asyncio.sleep(30)
+            return None
+        finally:
+            running_analyses.discard(chapter_number)
+
+    chapters.check_prerequisites = fake_check_prerequisites
+    chapters.generate_single_chapter_for_batch = fake_generate
+    chapters.run_batch_chapter_analysis = fake_analysis
+
+    handler = asyncio.create_task(chapters.execute_batch_generation_in_order(
+        batch_id=batch_id,
+        user_id=REPRO_USER_ID,
+        ai_service=FakeAIService(),
+        pipeline_analysis=True
+    ))
+
+    # 第1章生成完成、其分析在后台进行时，第2章开始生成
+    await asyncio.wait_for(second_chapter_started.wait(), timeout=10)
+    print(f"▶️ 第2章生成中，后台分析中的章节: {sorted(running_analyses)}")
+
+    # 模拟任务队列中断（租约失效 / worker停止）
+    handler.cancel()
+    with suppress(asyncio.CancelledError):
+        await handler
+
+    await asyncio.sleep(0)
+    leftover_tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    async with background_session(REPRO_USER_ID) as db:
+        task = (await db.execute(
+            select(BatchGenerationTask).where(BatchGenerationTask.id == batch_id)
+        )).scalar_one()
+
+    print(f"📋 批量任务状态: {task.status}, 已完成: {task.completed_chapters}/{task.total_chapters}")
+    print(f"   ├─ 仍在执行的分析: {sorted(running_analyses) or '无'}")
+    print(f"   └─ 残留的后台协程: {len(leftover_tasks)}")
+
+    return not running_analyses and not leftover_tasks and task.status == 'running'
+
+
+async def main_async() -> bool:
+    try:
+        return await run()
+    finally:
+        await close_db()
+
+
+def main():
+    try:
+        ok = asyncio.run(main_async())
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if ok:
+        print("✅ 中断批量任务后没有遗留的后台分析，任务保持 running 等待队列重新执行")
+    else:
+        print("❌ 中断批量任务后仍有后台分析在执行")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
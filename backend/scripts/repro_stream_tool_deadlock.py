@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+流式工具调用限流死锁复现脚本
+并发上限为1时，流式请求返回工具调用后，提供商会发起下一轮流式请求；
+若上一轮仍持有限流额度，下一轮将永远等待（持有并等待）。
+
+使用模拟传输层（不访问网络）：第一轮响应返回工具调用，第二轮返回正文；
+MCP 工具调用替换为固定结果。超时未完成即判定为死锁。
+
+用法:
+    python scripts/repro_stream_tool_deadlock.py
+    python scripts/repro_stream_tool_deadlock.py --streams 4 --timeout 10
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# 添加项目路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+
+from app.mcp import mcp_client
+from app.services.ai_clients.openai_client import OpenAIClient
+from app.services.ai_config import AIClientConfig, RateLimitConfig
+from app.services.ai_providers.openai_provider import OpenAIProvider
+
+TOOLS = [{
+    "type": "function",
+    "function": {
+        "name": "web_search",
+        "description": "搜索参考资料",
+        "parameters": {"type": "object", "properties": {"query": {"type": "string"}}},
+    },
+}]
+
+
+def sse(*events: dict) -> bytes:
+    lines = [f"data: {json.dumps(event, ensure_ascii=False)}\n\n" for event in events]
+    lines.append("data: [DONE]\n\n")
+    return "".join(lines).encode()
+
+
+async def handle(request: httpx.Request) -> httpx.Response:
+    """第一轮（消息中没有工具结果）返回工具调用，之后返回正文"""
+    payload = json.loads(request.content)
+    has_tool_result = any("工具查询结果" in (m.get("content") or "") for m in payload["messages"])
+    if not has_tool_result:
+        body = sse({"choices": [{"delta": {"tool_calls": [{
+            "index": 0,
+            "id": "call_1",
+            "type": "function",
+            "function": {"name": "web_search", "arguments": "{\"query\": \"宗门\"}"},
+        }]}}]})
+    else:
+        body = sse({"choices": [{"delta": {"content": "基于查询结果的正文。"}}]})
+    return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=body)
+
+
+async def fake_batch_call_tools(user_id, tool_calls):
+    return [{"tool_call_id": tc.get("id"), "content": "宗门资料"} for tc in tool_calls]
+
+
+def fake_build_tool_context(tool_results, format="markdown"):
+    return "\n".join(str(r["content"]) for r in tool_results)
+
+
+async def consume(provider: OpenAIProvider) -> str:
+    chunks = []
+    async for chunk in provider.generate_stream(
+        prompt="介绍一下宗门",
+        model="repro-model",
+        temperature=0.7,
+        max_tokens=256,
+        tools=TOOLS,
+        user_id="repro_user",
+    ):
+        chunks.append(chunk)
+    return "".join(chunks)
+
+
+async def run(args) -> bool:
+    mcp_client.batch_call_tools = fake_batch_call_tools
+    mcp_client.build_tool_context = fake_build_tool_context
+
+    config = AIClientConfig(rate_limit=RateLimitConfig(max_concurrent_requests=1))
+    client = OpenAIClient(api_key="repro-key", base_url="http://repro.invalid/v1", config=config)
+    client.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+    provider = OpenAIProvider(client)
+
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(*(consume(provider) for _ in range(args.streams))),
+            timeout=args.timeout,
+        )
+    except asyncio.TimeoutError:
+        print(f"❌ {args.timeout}秒内未完成，限流额度死锁 (并发上限=1, 流数={args.streams})")
+        print(f"   └─ 限流器状态: {client.limiter.get_stats()}")
+        return False
+    finally:
+        await client.http_client.aclose()
+
+    print(f"✅ {args.streams} 个带工具调用的流式请求全部完成 (并发上限=1)")
+    print(f"   ├─ 输出: {results[0]}")
+    print(f"   └─ 限流器状态: {client.limiter.get_stats()}")
+    return all(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="流式工具调用限流死锁复现")
+    parser.add_argument("--streams", type=int, default=3, help="并发的流式请求数")
+    parser.add_argument("--timeout", type=float, default=5.0, help="判定死锁的超时秒数")
+    if not asyncio.run(run(parser.parse_args())):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
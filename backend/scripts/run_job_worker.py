@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+后台任务队列worker
+独立于Web进程执行批量生成、章节分析等长任务，可按需启动多个进程横向扩展
+
+任务持久化在数据库中：worker重启后执行中的任务会被重新领取，批量生成从最后完成的章节继续。
+独立部署worker时，建议在Web进程的环境变量中设置 JOB_WORKER_EMBEDDED=false。
+
+用法:
+    python scripts/run_job_worker.py
+    python scripts/run_job_worker.py --concurrency 8 --worker-id gen-worker-1
+"""
+import argparse
+import asyncio
+import signal
+import sys
+from pathlib import Path
+
+# 添加项目路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.config import settings
+from app.database import close_db
+from app.logger import setup_logging, get_logger
+from app.services.job_queue import JobWorker
+
+setup_logging(
+    level=settings.log_level,
+    log_to_file=settings.log_to_file,
+    log_file_path=settings.log_file_path,
+    max_bytes=settings.log_max_bytes,
+    backup_count=settings.log_backup_count
+)
+logger = get_logger(__name__)
+
+
+async def run(args) -> None:
+    worker = JobWorker(worker_id=args.worker_id, concurrency=args.concurrency)
+    worker_task = asyncio.create_task(worker.run())
+
+    # 收到终止信号时归还执行中的任务后退出
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            pass  # Windows 不支持，依赖 KeyboardInterrupt
+
+    try:
+        await stop_event.wait()
+    finally:
+        logger.info("🛑 收到停止信号，正在停止worker...")
+        await worker.stop()
+        await worker_task
+
+        from app.mcp import mcp_client
+        from app.services.ai_service import cleanup_http_clients
+        await mcp_client.cleanup()
+        await cleanup_http_clients()
+        await close_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="后台任务队列worker")
+    parser.add_argument("--concurrency", type=int, default=None, help="同时执行的任务数（默认 JOB_WORKER_CONCURRENCY）")
+    parser.add_argument("--worker-id", default=None, help="worker标识（默认 主机名:进程号:随机后缀）")
+    try:
+        asyncio.run(run(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1121,10 +1121,10 @@ export default function ProjectList() {
         <Space direction="vertical" size={16} style={{ width: '100%' }}>
           <div>
             <p style={{ marginBottom: '12px', color: '#666' }}>
-              选择之前导出的 JSON 格式项目文件
+              选择之前导出的 JSON / NDJSON 格式项目文件
             </p>
             <Upload
-              accept=".json"
+              accept=".json,.ndjson,.jsonl"
               beforeUpload={handleFileSelect}
               maxCount={1}
               onRemove={() => {
@@ -299,6 +299,7 @@ export const projectApi = {
     include_careers?: boolean;
     include_memories?: boolean;
     include_plot_analysis?: boolean;
+    format?: 'json' | 'ndjson';
   }) => {
     const response = await axios.post(
       `/api/projects/${id}/export-data`,
@@ -588,8 +589,20 @@ export const chapterApi = {
   getChapters: (projectId: string) =>
     api.get<unknown, { total: number; items: Chapter[] }>(`/chapters/project/${projectId}`).then(res => res.items),
 
+  // 轻量章节列表（默认不含正文，按 (chapter_number, id) 游标分页，after 传上一页的 next_cursor）
+  getChapterList: (projectId: string, params?: { fields?: string; after?: string; limit?: number }) =>
+    api.get<unknown, { total: number; items: Partial<Chapter>[]; next_cursor?: string | null }>(
+      `/chapters/project/${projectId}/list`,
+      { params }
+    ),
+
   getChapter: (id: string) => api.get<unknown, Chapter>(`/chapters/${id}`),
 
+  getChapterContent: (id: string) =>
+    api.get<unknown, { id: string; chapter_number: number; content?: string; word_count: number; expansion_plan?: string }>(
+      `/chapters/${id}/content`
+    ),
+
   createChapter: (data: ChapterCreate) => api.post<unknown, Chapter>('/chapters', data),
 
   updateChapter: (id: string, data: ChapterUpdate) =>